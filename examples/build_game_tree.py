@@ -0,0 +1,61 @@
+''' Build the public betting tree of a spot and write it for the solvers
+'''
+import argparse
+
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game_tree import build_game_tree
+
+def build(args):
+    board = [card_to_int(args.board[i:i + 2].upper()) for i in range(0, len(args.board), 2)]
+    state = FlatNolimitholdemState.from_spot(
+        args.stacks,
+        args.in_chips,
+        board=board,
+        big_blind=args.big_blind,
+    )
+    tree = build_game_tree(state, max_nodes=args.max_nodes)
+    tree.save(args.path)
+    print('Wrote', args.path)
+    for key, value in tree.stats().items():
+        print(key, value)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Public game tree of a spot")
+    parser.add_argument(
+        '--stacks',
+        type=int,
+        nargs='+',
+        default=[190, 190],
+    )
+    parser.add_argument(
+        '--in_chips',
+        type=int,
+        nargs='+',
+        default=[10, 10],
+    )
+    parser.add_argument(
+        '--board',
+        type=str,
+        default='SAHTD2',
+        help='Board cards as suit and rank pairs, e.g. SAHTD2',
+    )
+    parser.add_argument(
+        '--big_blind',
+        type=int,
+        default=2,
+    )
+    parser.add_argument(
+        '--max_nodes',
+        type=int,
+        default=10000000,
+    )
+    parser.add_argument(
+        '--path',
+        type=str,
+        default='game_tree.bin',
+    )
+
+    args = parser.parse_args()
+
+    build(args)
@@ -0,0 +1,45 @@
+''' Build the preflop all-in equity table used by NolimitholdemGame and the driver
+'''
+import argparse
+
+from rlcard_fork.games.nolimitholdem.preflop_equity import (
+    DEFAULT_PATH,
+    generate_preflop_table,
+)
+
+def generate(args):
+    table = generate_preflop_table(
+        args.path,
+        num_boards=args.num_boards,
+        include_combos=not args.classes_only,
+        seed=args.seed,
+    )
+    print('Wrote', table.path)
+    for hero, villain in [('AA', 'KK'), ('AKs', 'QQ'), ('72o', None)]:
+        print(hero, 'vs', villain or 'random', table.class_equity(hero, villain))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Preflop equity table")
+    parser.add_argument(
+        '--path',
+        type=str,
+        default=DEFAULT_PATH,
+    )
+    parser.add_argument(
+        '--num_boards',
+        type=int,
+        default=50000,
+    )
+    parser.add_argument(
+        '--classes_only',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+    )
+
+    args = parser.parse_args()
+
+    generate(args)
@@ -6,8 +6,11 @@ import argparse
 import rlcard_fork
 from rlcard_fork.agents import (
     CFRAgent,
+    MCCFRAgent,
+    ParallelMCCFRAgent,
     RandomAgent,
 )
+from rlcard_fork.agents.best_response import leduc_exploitability
 from rlcard_fork.utils import (
     set_seed,
     tournament,
@@ -30,18 +33,29 @@ def train(args):
             'seed': 0,
         }
     )
+    # The best responses walk their own env
+    best_response_env = rlcard_fork.make(
+        'leduc-holdem',
+        config={
+            'allow_step_back': True,
+        }
+    )
 
     # Seed numpy, torch, random
     set_seed(args.seed)
 
-    # Initilize CFR Agent
-    agent = CFRAgent(
-        env,
-        os.path.join(
-            args.log_dir,
-            'cfr_model',
-        ),
+    # Initilize CFR Agent, Monte Carlo CFR samples the actions
+    model_path = os.path.join(
+        args.log_dir,
+        'cfr_model',
     )
+    if args.sampling == 'chance':
+        agent = CFRAgent(env, model_path)
+    elif args.num_workers > 1:
+        agent = ParallelMCCFRAgent(env, model_path, num_workers=args.num_workers, sampling=args.sampling,
+                                   seed=args.seed)
+    else:
+        agent = MCCFRAgent(env, model_path, sampling=args.sampling, seed=args.seed)
     agent.load()  # If we have saved model, we first load the model
 
     # Evaluate CFR against random
@@ -65,11 +79,17 @@ def train(args):
                         args.num_eval_games
                     )[0]
                 )
+                exploitability = leduc_exploitability(best_response_env, agent)
+                logger.log('  exploitability |  {:.1f} mbb/g'.format(exploitability))
+                if args.target_exploitability and exploitability <= args.target_exploitability:
+                    break
 
         # Get the paths
         csv_path, fig_path = logger.csv_path, logger.fig_path
     # Plot the learning curve
     plot_curve(csv_path, fig_path, 'cfr')
+    if isinstance(agent, ParallelMCCFRAgent):
+        agent.close()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser("CFR example in RLCard")
@@ -78,6 +98,18 @@ if __name__ == '__main__':
         type=int,
         default=42,
     )
+    parser.add_argument(
+        '--sampling',
+        type=str,
+        default='chance',
+        choices=['chance', 'external', 'outcome'],
+    )
+    parser.add_argument(
+        '--num_workers',
+        type=int,
+        default=1,
+        help='Worker processes of Monte Carlo CFR',
+    )
     parser.add_argument(
         '--num_episodes',
         type=int,
@@ -93,6 +125,12 @@ if __name__ == '__main__':
         type=int,
         default=100,
     )
+    parser.add_argument(
+        '--target_exploitability',
+        type=float,
+        default=None,
+        help='Stop when the exploitability is below, in mbb/g',
+    )
     parser.add_argument(
         '--log_dir',
         type=str,
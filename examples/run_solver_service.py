@@ -0,0 +1,104 @@
+''' Run a solver service answering the strategy queries of the driver, GUIs and scripts on a Unix socket
+'''
+import argparse
+import asyncio
+import functools
+
+from rlcard_fork.agents.solver_service import DEFAULT_SOCKET, SolverService, load_solved_spot, serve
+from rlcard_fork.agents.spot_cache import SpotCache
+
+def run(args):
+    cache = SpotCache(
+        capacity=args.cache_capacity,
+        max_bytes=None if args.cache_mb is None else int(args.cache_mb * 2 ** 20),
+        directory=args.cache_dir,
+        disk_capacity=args.disk_capacity,
+        load=functools.partial(load_solved_spot, rule=args.rule),
+    )
+    service = SolverService(num_iterations=args.num_iterations, rule=args.rule, max_nodes=args.max_nodes,
+                            max_bytes=None if args.max_mb is None else int(args.max_mb * 2 ** 20),
+                            stack_bucket=args.stack_bucket, cache=cache, depth_limited=args.depth_limited,
+                            time_budget=args.time_budget)
+    print('Serving on {}'.format(args.socket))
+    try:
+        asyncio.run(serve(service, args.socket))
+    except KeyboardInterrupt:
+        print(service.stats())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Solver query service")
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=DEFAULT_SOCKET,
+    )
+    parser.add_argument(
+        '--num_iterations',
+        type=int,
+        default=200,
+        help='CFR iterations of a new spot, unless the query says',
+    )
+    parser.add_argument(
+        '--rule',
+        type=str,
+        default='dcfr',
+        choices=['cfr', 'cfr+', 'linear', 'dcfr'],
+    )
+    parser.add_argument(
+        '--max_nodes',
+        type=int,
+        default=1000000,
+        help='Refuse to solve larger trees',
+    )
+    parser.add_argument(
+        '--max_mb',
+        type=float,
+        default=1024,
+        help='Refuse to solve spots whose regrets take more megabytes',
+    )
+    parser.add_argument(
+        '--depth_limited',
+        action='store_true',
+        help='Solve only to the end of the street of the query, checking down the leaves',
+    )
+    parser.add_argument(
+        '--time_budget',
+        type=float,
+        default=None,
+        help='Seconds of a query unless the query says, the strategy reached is returned when they run out',
+    )
+
+    parser.add_argument(
+        '--stack_bucket',
+        type=float,
+        default=None,
+        help='Round the effective stacks to this many big blinds, exact stacks by default',
+    )
+    parser.add_argument(
+        '--cache_capacity',
+        type=int,
+        default=64,
+        help='Solved spots kept in memory',
+    )
+    parser.add_argument(
+        '--cache_mb',
+        type=float,
+        default=None,
+        help='Megabytes of solved spots kept in memory, unbounded by default',
+    )
+    parser.add_argument(
+        '--cache_dir',
+        type=str,
+        default=None,
+        help='Directory of the solved spots kept on disk, none by default',
+    )
+    parser.add_argument(
+        '--disk_capacity',
+        type=int,
+        default=1024,
+        help='Solved spots kept on disk',
+    )
+
+    args = parser.parse_args()
+
+    run(args)
@@ -0,0 +1,114 @@
+''' An example of solving a heads up postflop spot with vector-form CFR
+'''
+import argparse
+import time
+
+import numpy as np
+
+from rlcard_fork.agents import VectorCFRSolver
+from rlcard_fork.agents.regret_pruning import RegretPruning
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import COMBO_CLASSES, HAND_CLASSES, Range
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game_tree import build_game_tree
+
+def solve(args):
+    board = [card_to_int(args.board[i:i + 2].upper()) for i in range(0, len(args.board), 2)]
+    state = FlatNolimitholdemState.from_spot(
+        [args.stack, args.stack],
+        [args.pot // 2, args.pot // 2],
+        board=board,
+    )
+    tree = build_game_tree(state)
+    print('Tree', tree.stats())
+    solver = VectorCFRSolver(
+        tree,
+        board,
+        [Range.from_string(args.oop_range), Range.from_string(args.ip_range)],
+        rule=args.rule,
+        pruning=RegretPruning(args.prune_threshold),
+    )
+
+    start = time.time()
+    for iteration in range(args.num_iterations):
+        solver.train()
+        print('\rIteration {} ({:.1f}s)'.format(iteration + 1, time.time() - start), end='')
+        if (iteration + 1) % args.evaluate_every == 0:
+            exploitability = solver.exploitability()
+            print(' exploitability {:.1f} mbb/g'.format(exploitability))
+            if exploitability <= args.target_exploitability:
+                break
+    print()
+    print('Pruned {:.1%} of the children of the walked nodes'.format(solver.pruning.pruned_fraction()),
+          solver.pruning.counters)
+
+    # Strategy of the first player at the root, averaged over the combos of each hand class
+    strategy = solver.get_average_strategy(0)
+    weights = solver.ranges[0][0]
+    labels = [tree.action_label(child) for child in tree.children(0)]
+    for hand_class in np.unique(COMBO_CLASSES[weights > 0]):
+        combos = (COMBO_CLASSES == hand_class) & (weights > 0)
+        frequencies = strategy[:, combos] @ weights[combos] / weights[combos].sum()
+        print(HAND_CLASSES[hand_class], ' '.join('{} {:.2f}'.format(label, frequency)
+                                                 for label, frequency in zip(labels, frequencies)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser("Vector-form CFR on a postflop spot")
+    parser.add_argument(
+        '--board',
+        type=str,
+        default='C2D3H7S9CK',
+        help='Board cards as suit and rank pairs, 3 to 5 of them',
+    )
+    parser.add_argument(
+        '--pot',
+        type=int,
+        default=20,
+    )
+    parser.add_argument(
+        '--stack',
+        type=int,
+        default=90,
+    )
+    parser.add_argument(
+        '--oop_range',
+        type=str,
+        default='AA,KK,77,AK,KQ,QJ,JT,T8',
+    )
+    parser.add_argument(
+        '--ip_range',
+        type=str,
+        default='QQ,JJ,TT,99,AK,AQ,KJ',
+    )
+    parser.add_argument(
+        '--rule',
+        type=str,
+        default='dcfr',
+        choices=['cfr', 'cfr+', 'linear', 'dcfr'],
+    )
+    parser.add_argument(
+        '--prune_threshold',
+        type=float,
+        default=None,
+        help='Prune the actions of a regret below, none by default',
+    )
+    parser.add_argument(
+        '--num_iterations',
+        type=int,
+        default=500,
+    )
+    parser.add_argument(
+        '--evaluate_every',
+        type=int,
+        default=50,
+    )
+    parser.add_argument(
+        '--target_exploitability',
+        type=float,
+        default=0.0,
+        help='Stop when the exploitability is below, in mbb/g',
+    )
+
+    args = parser.parse_args()
+
+    solve(args)
@@ -10,6 +10,13 @@ if 'torch' in installed_packages:
     from rlcard_fork.agents.nfsp_agent import NFSPAgent as NFSPAgent
 
 from rlcard_fork.agents.cfr_agent import CFRAgent
+from rlcard_fork.agents.mccfr_agent import MCCFRAgent
+from rlcard_fork.agents.parallel_cfr_agent import ParallelMCCFRAgent
+from rlcard_fork.agents.vector_cfr_solver import VectorCFRSolver
+from rlcard_fork.agents.best_response import LeducBestResponse
+from rlcard_fork.agents.solver_service import SolverClient, SolverService
+from rlcard_fork.agents.spot_cache import SpotCache
+from rlcard_fork.agents.range_tracker import RangeTracker
 from rlcard_fork.agents.human_agents.limit_holdem_human_agent import HumanAgent as LimitholdemHumanAgent
 from rlcard_fork.agents.human_agents.nolimit_holdem_human_agent import HumanAgent as NolimitholdemHumanAgent
 from rlcard_fork.agents.human_agents.leduc_holdem_human_agent import HumanAgent as LeducholdemHumanAgent
@@ -0,0 +1,161 @@
+''' Exact best response and exploitability of a Leduc Hold'em policy
+
+tournament() only samples games against a fixed opponent. A best response
+instead walks the betting tree of the game once per player, with the hand of
+the best responding player and the hand of the opponent as the two axes of a
+reach matrix: the opponent's policy is queried once per hand at each of its
+nodes, the public card and the small blind are enumerated, and at each of its
+nodes the best responding player picks the action of highest value for each
+of its hands. The exploitability is the mean value of the best responses,
+0 for a Nash equilibrium.
+
+The heads up no limit spots of VectorCFRSolver have their own best response,
+see VectorCFRSolver.exploitability.
+'''
+import numpy as np
+
+from rlcard_fork.agents.cfr_agent import state_key
+from rlcard_fork.games.leducholdem import Dealer
+
+
+def average_policy(agent):
+    ''' Get the average policy of a CFR agent as a function of the states of an env
+
+    Args:
+        agent (CFRAgent): A CFRAgent, MCCFRAgent or ParallelMCCFRAgent
+
+    Returns:
+        (function): state -> probability of each action, the policy of agent.eval_step
+    '''
+    def policy(state):
+        return agent.action_probs(state_key(state), list(state['legal_actions'].keys()), agent.average_policy)
+    return policy
+
+
+class LeducBestResponse:
+    ''' Best responses to a policy playing both seats of heads up Leduc Hold'em
+    '''
+
+    def __init__(self, env, policy):
+        ''' Set up the best responses
+
+        Args:
+            env (Env): A heads up Leduc Hold'em env with allow_step_back, reset by the walks
+            policy (function): state -> probability of each action, see average_policy
+        '''
+        if env.num_players != 2:
+            raise ValueError('The best response is for heads up Leduc Hold\'em')
+        if not env.allow_step_back:
+            raise ValueError('The env should allow step back')
+        self.env = env
+        self.policy = policy
+        self.cards = sorted(Dealer(np.random.RandomState()).deck, key=lambda card: card.get_index())
+
+    def value(self, player):
+        ''' Get the value of the best response of a player
+
+        Args:
+            player (int): The best responding player, the policy plays the other
+
+        Returns:
+            (float): The expected payoff of the best response, in big blinds per game
+        '''
+        num_cards = len(self.cards)
+        total = 0.0
+        for small_blind in range(2):
+            self._start(small_blind)
+            # reach[hand, opponent hand] of the opponent and chance, the two hands are different cards
+            reach = 1.0 - np.eye(num_cards)
+            total += self._walk(player, reach).sum()
+        return total / (2 * num_cards * (num_cards - 1))
+
+    def exploitability(self):
+        ''' Get the exploitability of the policy
+
+        Returns:
+            (float): The mean value of the best responses of the two players, in milli big blinds per game
+        '''
+        return (self.value(0) + self.value(1)) / 2 * 1000
+
+    def _start(self, small_blind):
+        ''' Start a game where small_blind posts the small blind, the hands are set by the walk
+        '''
+        self.env.reset()
+        game = self.env.game
+        for player in game.players:
+            player.in_chips = game.big_blind
+        game.players[small_blind].in_chips = game.small_blind
+        game.game_pointer = small_blind
+        game.round.start_new_round(game_pointer=small_blind, raised=[player.in_chips for player in game.players])
+
+    def _walk(self, player, reach):
+        ''' Get the value of each hand of the best responding player
+
+        Args:
+            player (int): The best responding player
+            reach (numpy.array): The reach of each pair of hands, shape (cards, cards)
+
+        Returns:
+            (numpy.array): The values of the hands, weighted by the reach of the opponent hands
+        '''
+        if self.env.is_over():
+            return self._terminal_values(player, reach)
+
+        current_player = self.env.get_player_id()
+        legal_actions = list(self.env.get_state(current_player)['legal_actions'].keys())
+        if current_player != player:
+            probs = np.zeros((len(self.cards), self.env.num_actions))
+            for hand, card in enumerate(self.cards):
+                self.env.game.players[current_player].hand = card
+                probs[hand] = self.policy(self.env.get_state(current_player))
+
+        action_values = []
+        for action in legal_actions:
+            child_reach = reach if current_player == player else reach * probs[:, action]
+            dealing = self.env.game.public_card is None
+            self.env.step(action)
+            if dealing and self.env.game.public_card is not None and not self.env.is_over():
+                action_values.append(self._deal(player, child_reach))
+            else:
+                action_values.append(self._walk(player, child_reach))
+            self.env.step_back()
+
+        if current_player != player:
+            return sum(action_values)
+        return np.max(action_values, axis=0)
+
+    def _deal(self, player, reach):
+        ''' Average the values over the public cards, each pair of hands leaves cards - 2 of them
+        '''
+        values = 0.0
+        for public, card in enumerate(self.cards):
+            self.env.game.public_card = card
+            child_reach = reach.copy()
+            child_reach[public, :] = 0
+            child_reach[:, public] = 0
+            values = values + self._walk(player, child_reach)
+        return values / (len(self.cards) - 2)
+
+    def _terminal_values(self, player, reach):
+        players = self.env.game.players
+        if any(other.status == 'folded' for other in players):
+            return reach.sum(axis=1) * self.env.get_payoffs()[player]
+        values = np.zeros(len(self.cards))
+        for hand, opponent_hand in zip(*np.nonzero(reach)):
+            players[player].hand = self.cards[hand]
+            players[1 - player].hand = self.cards[opponent_hand]
+            values[hand] += reach[hand, opponent_hand] * self.env.get_payoffs()[player]
+        return values
+
+
+def leduc_exploitability(env, agent):
+    ''' Get the exploitability of the average policy of a CFR agent on Leduc Hold'em
+
+    Args:
+        env (Env): A heads up Leduc Hold'em env with allow_step_back, not the env the agent trains on
+        agent (CFRAgent): The agent
+
+    Returns:
+        (float): The exploitability in milli big blinds per game
+    '''
+    return LeducBestResponse(env, average_policy(agent)).exploitability()
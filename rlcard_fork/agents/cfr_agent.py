@@ -1,33 +1,78 @@
 import numpy as np
-import collections
 
 import os
 import pickle
 
+from rlcard_fork.agents.cfr_rules import get_cfr_rule
+from rlcard_fork.agents.infoset_table import INFOSETS_FILE, InfosetTable, load_infoset_table
+from rlcard_fork.agents.regret_pruning import RegretPruning
 from rlcard_fork.utils.utils import *
 
+def match_regrets(regrets):
+    ''' Regret matching on the last axis, uniform over all the actions when no regret is positive
+
+    Args:
+        regrets (numpy.array): Regrets of shape (..., actions)
+
+    Returns:
+        (numpy.array): The strategies, same shape
+    '''
+    positive = np.maximum(regrets, 0.0)
+    total = positive.sum(axis=-1, keepdims=True)
+    return np.where(total > 0, positive / np.where(total > 0, total, 1.0), 1.0 / regrets.shape[-1])
+
+def state_key(state):
+    ''' Get the state_str of a state, the key of its infoset in the tables
+
+    Args:
+        state (dict): A state of an env
+
+    Returns:
+        (bytes): The bytes of the observation, the same as the former obs.tostring()
+    '''
+    return state['obs'].tobytes()
+
 class CFRAgent():
     ''' Implement CFR (chance sampling) algorithm
     '''
 
-    def __init__(self, env, model_path='./cfr_model'):
+    def __init__(self, env, model_path='./cfr_model', rule='cfr', pruning=None):
         ''' Initilize Agent
 
         Args:
             env (Env): Env class
+            rule (str or CFR): The update rule of the regrets and average policy, 'cfr', 'cfr+',
+                'linear' or 'dcfr', see cfr_rules
+            pruning (RegretPruning): The regret-based pruning and its counters, only the unreached
+                subtrees are skipped if None
         '''
         self.use_raw = False
         self.env = env
         self.model_path = model_path
+        self.rule = get_cfr_rule(rule)
+        self.pruning = RegretPruning() if pruning is None else pruning
 
-        # A policy is a dict state_str -> action probabilities
-        self.policy = collections.defaultdict(list)
-        self.average_policy = collections.defaultdict(np.array)
-
-        # Regret is a dict state_str -> action regrets
-        self.regrets = collections.defaultdict(np.array)
+        # The rows of the policy (action probabilities), average policy and regrets of each infoset
+        self.use_infosets(InfosetTable(env.num_actions, {
+            'policy': 1.0 / env.num_actions,
+            'average_policy': 0.0,
+            'regrets': 0.0,
+        }))
 
         self.iteration = 0
+        # The regrets of the current iteration of the infosets met so far, id -> regrets, see apply_regrets
+        self.instant_regrets = {}
+
+    def use_infosets(self, infosets):
+        ''' Set the tables, and the read-only state_str -> row mappings of them
+
+        Args:
+            infosets (InfosetTable): The tables
+        '''
+        self.infosets = infosets
+        self.policy = infosets.view('policy')
+        self.average_policy = infosets.view('average_policy')
+        self.regrets = infosets.view('regrets')
 
     def train(self):
         ''' Do one iteration of CFR
@@ -39,10 +84,36 @@ class CFRAgent():
             self.env.reset()
             probs = np.ones(self.env.num_players)
             self.traverse_tree(probs, player_id)
+        self.apply_regrets()
 
         # Update policy
         self.update_policy()
 
+    def add_regrets(self, index, regrets):
+        ''' Add regrets of an infoset to those of the iteration
+
+        Args:
+            index (int): The id of the infoset
+            regrets (numpy.array): The regrets of a visit of the infoset
+        '''
+        if index in self.instant_regrets:
+            self.instant_regrets[index] += regrets
+        else:
+            self.instant_regrets[index] = regrets
+
+    def apply_regrets(self):
+        ''' Update the cumulative regrets of every infoset with the regrets of the iteration
+
+        The rule is applied once per iteration over the whole table, so that the discount of
+        'dcfr' reaches the infosets not visited and the floor of 'cfr+' sees the summed regrets.
+        '''
+        instant_regrets = np.zeros((len(self.infosets), self.env.num_actions))
+        for index, regrets in self.instant_regrets.items():
+            instant_regrets[index] = regrets
+        self.instant_regrets = {}
+        self.rule.update_regrets(self.infosets['regrets'], instant_regrets, self.iteration)
+        self.infosets.dirty[:len(self.infosets)] = True
+
     def traverse_tree(self, probs, player_id):
         ''' Traverse the game tree, update the regrets
 
@@ -61,13 +132,37 @@ class CFRAgent():
         action_utilities = {}
         state_utility = np.zeros(self.env.num_players)
         obs, legal_actions = self.get_state(current_player)
-        action_probs = self.action_probs(obs, legal_actions, self.policy)
+        index = self.infosets.index(obs)
+        action_probs = remove_illegal(self.infosets.arrays['policy'][index], legal_actions)
+        counters = self.pruning.counters
+        counters['nodes'] += 1
+        player_reach, others_reach = probs[player_id], np.prod(np.delete(probs, player_id))
+        pruned = []
+        if current_player == player_id and self.pruning.prunes(self.iteration):
+            regrets = self.infosets.arrays['regrets'][index]
+            pruned = [action for action in legal_actions
+                      if action_probs[action] == 0 and regrets[action] < self.pruning.threshold]
 
         for action in legal_actions:
             action_prob = action_probs[action]
             new_probs = probs.copy()
             new_probs[current_player] *= action_prob
 
+            if action in pruned:
+                # Not played, and its regret is left as it is
+                counters['pruned'] += 1
+                continue
+            if current_player == player_id:
+                child_reaches = (player_reach * action_prob, others_reach)
+            else:
+                child_reaches = (player_reach, others_reach * action_prob)
+            if self.pruning.skip_unreached and not any(child_reaches):
+                # Whatever the values below, they are multiplied by 0 in the regrets and average policy
+                counters['skipped'] += 1
+                action_utilities[action] = np.zeros(self.env.num_players)
+                continue
+            counters['walked'] += 1
+
             # Keep traversing the child state
             self.env.step(action)
             utility = self.traverse_tree(new_probs, player_id)
@@ -85,23 +180,20 @@ class CFRAgent():
                                 np.prod(probs[current_player + 1:]))
         player_state_utility = state_utility[current_player]
 
-        if obs not in self.regrets:
-            self.regrets[obs] = np.zeros(self.env.num_actions)
-        if obs not in self.average_policy:
-            self.average_policy[obs] = np.zeros(self.env.num_actions)
-        for action in legal_actions:
-            action_prob = action_probs[action]
-            regret = counterfactual_prob * (action_utilities[action][current_player]
+        regrets = np.zeros(self.env.num_actions)
+        for action in action_utilities:
+            regrets[action] = counterfactual_prob * (action_utilities[action][current_player]
                     - player_state_utility)
-            self.regrets[obs][action] += regret
-            self.average_policy[obs][action] += self.iteration * player_prob * action_prob
+        self.add_regrets(index, regrets)
+        # The arrays may have grown in the traversal of the children
+        self.rule.update_strategy_sums(self.infosets.arrays['average_policy'][index], player_prob * action_probs,
+                                       self.iteration)
         return state_utility
 
     def update_policy(self):
         ''' Update policy based on the current regrets
         '''
-        for obs in self.regrets:
-            self.policy[obs] = self.regret_matching(obs)
+        self.infosets['policy'][:] = match_regrets(self.infosets['regrets'])
 
     def regret_matching(self, obs):
         ''' Apply regret matching
@@ -109,17 +201,7 @@ class CFRAgent():
         Args:
             obs (string): The state_str
         '''
-        regret = self.regrets[obs]
-        positive_regret_sum = sum([r for r in regret if r > 0])
-
-        action_probs = np.zeros(self.env.num_actions)
-        if positive_regret_sum > 0:
-            for action in range(self.env.num_actions):
-                action_probs[action] = max(0.0, regret[action] / positive_regret_sum)
-        else:
-            for action in range(self.env.num_actions):
-                action_probs[action] = 1.0 / self.env.num_actions
-        return action_probs
+        return match_regrets(self.regrets[obs])
 
     def action_probs(self, obs, legal_actions, policy):
         ''' Obtain the action probabilities of the current state
@@ -128,16 +210,13 @@ class CFRAgent():
             obs (str): state_str
             legal_actions (list): List of leagel actions
             player_id (int): The current player
-            policy (dict): The used policy
+            policy (Mapping): The used policy
 
         Returns:
-            (tuple) that contains:
-                action_probs(numpy.array): The action probabilities
-                legal_actions (list): Indices of legal actions
+            action_probs(numpy.array): The action probabilities, uniform for an unknown state
         '''
-        if obs not in policy.keys():
-            action_probs = np.array([1.0/self.env.num_actions for _ in range(self.env.num_actions)])
-            self.policy[obs] = action_probs
+        if obs not in policy:
+            action_probs = np.full(self.env.num_actions, 1.0 / self.env.num_actions)
         else:
             action_probs = policy[obs]
         action_probs = remove_illegal(action_probs, legal_actions)
@@ -153,7 +232,7 @@ class CFRAgent():
             action (int): Predicted action
             info (dict): A dictionary containing information
         '''
-        probs = self.action_probs(state['obs'].tostring(), list(state['legal_actions'].keys()), self.average_policy)
+        probs = self.action_probs(state_key(state), list(state['legal_actions'].keys()), self.average_policy)
         action = np.random.choice(len(probs), p=probs)
 
         info = {}
@@ -173,49 +252,31 @@ class CFRAgent():
                 legal_actions (list): Indices of legal actions
         '''
         state = self.env.get_state(player_id)
-        return state['obs'].tostring(), list(state['legal_actions'].keys())
+        return state_key(state), list(state['legal_actions'].keys())
 
     def save(self):
-        ''' Save model
+        ''' Save model, incrementally when the last save went to the same model_path
         '''
-        if not os.path.exists(self.model_path):
-            os.makedirs(self.model_path)
-
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'wb')
-        pickle.dump(self.policy, policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'wb')
-        pickle.dump(self.average_policy, average_policy_file)
-        average_policy_file.close()
-
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'wb')
-        pickle.dump(self.regrets, regrets_file)
-        regrets_file.close()
-
-        iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'wb')
-        pickle.dump(self.iteration, iteration_file)
-        iteration_file.close()
+        self.infosets.save(self.model_path, iteration=self.iteration)
 
     def load(self):
-        ''' Load model
+        ''' Load model, the tables are mapped and only read when used
         '''
         if not os.path.exists(self.model_path):
             return
 
-        policy_file = open(os.path.join(self.model_path, 'policy.pkl'),'rb')
-        self.policy = pickle.load(policy_file)
-        policy_file.close()
-
-        average_policy_file = open(os.path.join(self.model_path, 'average_policy.pkl'),'rb')
-        self.average_policy = pickle.load(average_policy_file)
-        average_policy_file.close()
+        if os.path.exists(os.path.join(self.model_path, INFOSETS_FILE)):
+            self.use_infosets(load_infoset_table(self.model_path))
+            self.iteration = self.infosets.attributes['iteration']
+            return
 
-        regrets_file = open(os.path.join(self.model_path, 'regrets.pkl'),'rb')
-        self.regrets = pickle.load(regrets_file)
-        regrets_file.close()
+        # Models saved as pickled state_str -> row dicts
+        self.infosets.clear()
+        for name in ('policy', 'average_policy', 'regrets'):
+            table_file = open(os.path.join(self.model_path, name + '.pkl'),'rb')
+            self.infosets.update(name, pickle.load(table_file))
+            table_file.close()
 
         iteration_file = open(os.path.join(self.model_path, 'iteration.pkl'),'rb')
         self.iteration = pickle.load(iteration_file)
         iteration_file.close()
-
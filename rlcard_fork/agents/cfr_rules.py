@@ -0,0 +1,128 @@
+''' Update rules of the CFR family
+
+The CFR variants only differ in how the regrets of an iteration are added to
+the cumulative regrets and in how much each iteration weighs in the average
+strategy. A rule implements both updates, and CFRAgent and
+VectorCFRSolver take one, by name or as an object:
+
+    'cfr': regrets are summed, iterations weigh t in the average (CFRAgent's historical behaviour)
+    'cfr+': negative cumulative regrets are floored to 0, iterations weigh t (Tammelin, 2014)
+    'linear': the regrets and the strategy of iteration t weigh t (Brown and Sandholm, 2019)
+    'dcfr': positive and negative cumulative regrets are discounted by t^alpha / (t^alpha + 1)
+        and t^beta / (t^beta + 1), iterations weigh t^gamma (Brown and Sandholm, 2019)
+
+The updates work in place on NumPy arrays of any shape, the first iteration is 1.
+'''
+import numpy as np
+
+
+class CFR:
+    ''' Vanilla CFR, with linearly weighted average strategy by default
+    '''
+    name = 'cfr'
+
+    def __init__(self, linear_averaging=True):
+        ''' Args:
+            linear_averaging (boolean): Whether iteration t weighs t in the average strategy, else 1
+        '''
+        self.linear_averaging = linear_averaging
+
+    def update_regrets(self, regrets, instant_regrets, iteration):
+        ''' Add the regrets of an iteration to the cumulative regrets
+
+        Args:
+            regrets (numpy.array): The cumulative regrets, updated in place
+            instant_regrets (numpy.array): The regrets of the iteration
+            iteration (int): The iteration, from 1
+
+        Returns:
+            (numpy.array): The updated regrets
+        '''
+        regrets += instant_regrets
+        return regrets
+
+    def strategy_weight(self, iteration):
+        ''' Get the weight of an iteration in the average strategy
+        '''
+        return iteration if self.linear_averaging else 1
+
+    def update_strategy_sums(self, strategy_sums, contribution, iteration):
+        ''' Add the strategy of an iteration, weighted by the reach of the player, to the sums
+
+        Args:
+            strategy_sums (numpy.array): The weighted sums of the strategies, updated in place
+            contribution (numpy.array): The reach of the player times its strategy
+            iteration (int): The iteration, from 1
+
+        Returns:
+            (numpy.array): The updated sums
+        '''
+        strategy_sums += self.strategy_weight(iteration) * contribution
+        return strategy_sums
+
+
+class CFRPlus(CFR):
+    ''' CFR+: the cumulative regrets never go below 0
+    '''
+    name = 'cfr+'
+
+    def update_regrets(self, regrets, instant_regrets, iteration):
+        regrets += instant_regrets
+        np.maximum(regrets, 0, out=regrets)
+        return regrets
+
+
+class LinearCFR(CFR):
+    ''' Linear CFR: the regrets and the strategy of iteration t weigh t
+    '''
+    name = 'linear'
+
+    def update_regrets(self, regrets, instant_regrets, iteration):
+        regrets += iteration * instant_regrets
+        return regrets
+
+
+class DCFR(CFR):
+    ''' Discounted CFR
+    '''
+    name = 'dcfr'
+
+    def __init__(self, alpha=1.5, beta=0.0, gamma=2.0):
+        ''' Args:
+            alpha (float): Discount exponent of the positive cumulative regrets
+            beta (float): Discount exponent of the negative cumulative regrets
+            gamma (float): Iteration t weighs t^gamma in the average strategy
+        '''
+        super().__init__()
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+
+    def update_regrets(self, regrets, instant_regrets, iteration):
+        regrets += instant_regrets
+        positive = iteration ** self.alpha / (iteration ** self.alpha + 1)
+        negative = iteration ** self.beta / (iteration ** self.beta + 1)
+        regrets *= np.where(regrets > 0, positive, negative)
+        return regrets
+
+    def strategy_weight(self, iteration):
+        return iteration ** self.gamma
+
+
+CFR_RULES = {rule.name: rule for rule in (CFR, CFRPlus, LinearCFR, DCFR)}
+
+
+def get_cfr_rule(rule):
+    ''' Get an update rule
+
+    Args:
+        rule (str or CFR): One of the names of CFR_RULES, with default parameters, or a rule
+
+    Returns:
+        (CFR): The rule
+    '''
+    if isinstance(rule, CFR):
+        return rule
+    if rule not in CFR_RULES:
+        raise ValueError('Unknown CFR rule {}, expected one of {}'.format(rule, sorted(CFR_RULES)))
+    return CFR_RULES[rule]()
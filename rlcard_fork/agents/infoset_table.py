@@ -0,0 +1,377 @@
+''' Dense storage of the per infoset tables of the CFR agents
+
+An InfosetTable numbers the infosets (state_str keys) in the order they are met
+and keeps each table (regrets, average policy...) as one 2-D float array of
+shape (infosets, actions). Rows are allocated by chunks, so an infoset costs
+its floats plus one dict entry, and a lookup is a single hash for all the
+tables. InfosetView gives the dict-like state_str -> row access of the
+former dict-of-arrays attributes.
+
+A table is saved to a directory, one file per column so that each can be
+mapped with np.memmap:
+
+    infosets.json: the number of infosets and actions, the tables and their dtype,
+        attributes of the caller (the CFR iteration...), written last
+    keys.bin: the keys one after the other, in id order
+    key_offsets.i8: int64 [infosets + 1], where each key starts in keys.bin
+    key_hashes.u8, key_ids.i8: uint64 and int64 [infosets], the 64 bit hashes of
+        the keys in increasing order and the id of each, to find a key without
+        reading them all
+    <table>.bin: [infosets, actions] rows of each table
+
+Saving again to the same directory is incremental: the keys and rows of the
+new infosets are appended, the rows that changed since the last save (the
+infosets looked up with index) are written in place, and only the hash index
+and infosets.json are rewritten. load_infoset_table maps the files, so a
+table opens without reading them and pages in the rows it touches.
+'''
+import collections.abc
+import hashlib
+import json
+import os
+
+import numpy as np
+
+INFOSETS_FILE = 'infosets.json'
+_VERSION = 1
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little')
+
+
+class InfosetTable:
+    ''' Dense infoset ids and the tables indexed by them
+    '''
+
+    def __init__(self, num_actions, tables, chunk_size=1024, dtype=np.float64):
+        ''' Args:
+            num_actions (int): The number of columns of the tables
+            tables (dict): The name of each table -> the initial value of its rows
+            chunk_size (int): The number of rows allocated at a time, the allocation doubles
+                once it has more chunks
+            dtype (numpy.dtype): The type of the tables
+        '''
+        self.num_actions = num_actions
+        self.initial_values = dict(tables)
+        self.chunk_size = chunk_size
+        # state_str -> id, and the state_str of each id
+        self.ids = {}
+        self.keys = []
+        self.arrays = {name: np.full((chunk_size, num_actions), value, dtype=dtype)
+                       for name, value in self.initial_values.items()}
+        # The rows that may have changed since the last save
+        self.dirty = np.zeros(chunk_size, dtype=bool)
+        # Attributes of the caller read from a save
+        self.attributes = {}
+        # The directory and number of infosets of the last save
+        self._saved = (None, 0)
+
+    @property
+    def capacity(self):
+        return len(self.dirty)
+
+    def index(self, key):
+        ''' Get the id of an infoset, registering it if it is new
+
+        Args:
+            key (str): The state_str of the infoset
+
+        Returns:
+            (int): The row of the infoset in the tables, which is marked as changed
+        '''
+        index = self.ids.get(key)
+        if index is None:
+            index = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            if index == self.capacity:
+                self._grow()
+        self.dirty[index] = True
+        return index
+
+    def _grow(self):
+        ''' Add rows by whole chunks, as many as there are, views of the former arrays are not updated
+        '''
+        capacity = self.capacity + max(1, self.capacity // self.chunk_size) * self.chunk_size
+        self._reallocate(capacity)
+        self.dirty = np.concatenate([self.dirty, np.zeros(capacity - len(self.dirty), dtype=bool)])
+
+    def _reallocate(self, capacity):
+        for name, array in self.arrays.items():
+            rows = np.full((capacity - len(array), self.num_actions), self.initial_values[name], dtype=array.dtype)
+            self.arrays[name] = np.concatenate([array, rows])
+
+    def __getitem__(self, name):
+        ''' Get the rows of the registered infosets of a table, a view of shape (infosets, actions)
+        '''
+        return self.arrays[name][:len(self.keys)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.ids
+
+    def nbytes(self):
+        ''' Get the memory used by the rows of the tables
+        '''
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def clear(self):
+        ''' Forget all the infosets
+        '''
+        self.ids.clear()
+        self.keys.clear()
+        for name, array in self.arrays.items():
+            array[:] = self.initial_values[name]
+        self.dirty[:] = False
+        self._saved = (None, 0)
+
+    def view(self, name, transform=None):
+        ''' Get a read-only state_str -> row mapping of a table
+
+        Args:
+            name (str): The table
+            transform (function): Applied to the rows, if any
+        '''
+        return InfosetView(self, name, transform)
+
+    def update(self, name, rows):
+        ''' Set rows of a table, registering the new infosets
+
+        Args:
+            name (str): The table
+            rows (Mapping): state_str -> row
+        '''
+        for key, row in rows.items():
+            index = self.index(key)
+            self.arrays[name][index] = row
+
+    def save(self, path, **attributes):
+        ''' Save the tables to a directory, incrementally if it holds the last save of this table
+
+        Args:
+            path (str): The directory
+            attributes: Values to save along, json serializable, see load_infoset_table
+        '''
+        os.makedirs(path, exist_ok=True)
+        saved_path, num_saved = self._saved
+        if saved_path != os.path.abspath(path) or not os.path.exists(os.path.join(path, INFOSETS_FILE)):
+            num_saved = 0
+        num_infosets = len(self.keys)
+        mode = 'ab' if num_saved else 'wb'
+
+        # The keys of the new infosets are appended, with their hashes merged into the sorted index
+        new_keys = [self.keys[index] for index in range(num_saved, num_infosets)]
+        offsets = np.cumsum([0] + [len(key) for key in new_keys], dtype=np.int64)
+        if num_saved:
+            last_offset = np.fromfile(os.path.join(path, 'key_offsets.i8'), dtype=np.int64,
+                                      count=1, offset=num_saved * 8)[0]
+            offsets = offsets[1:] + last_offset
+        with open(os.path.join(path, 'keys.bin'), mode) as f:
+            f.write(b''.join(new_keys))
+        with open(os.path.join(path, 'key_offsets.i8'), mode) as f:
+            f.write(offsets.tobytes())
+        hashes = np.array([_hash(key) for key in new_keys], dtype=np.uint64)
+        ids = np.arange(num_saved, num_infosets, dtype=np.int64)
+        if num_saved:
+            hashes = np.concatenate([np.fromfile(os.path.join(path, 'key_hashes.u8'), dtype=np.uint64), hashes])
+            ids = np.concatenate([np.fromfile(os.path.join(path, 'key_ids.i8'), dtype=np.int64), ids])
+        order = np.argsort(hashes, kind='stable')
+        _replace(os.path.join(path, 'key_hashes.u8'), hashes[order].tobytes())
+        _replace(os.path.join(path, 'key_ids.i8'), ids[order].tobytes())
+
+        # The changed rows are written in place, the new ones appended
+        changed = np.flatnonzero(self.dirty[:num_saved])
+        for name, array in self.arrays.items():
+            table_path = os.path.join(path, name + '.bin')
+            if len(changed):
+                rows = np.memmap(table_path, dtype=array.dtype, mode='r+', shape=(num_saved, self.num_actions))
+                rows[changed] = array[changed]
+                rows.flush()
+                del rows
+            with open(table_path, mode) as f:
+                f.write(np.ascontiguousarray(array[num_saved:num_infosets]).tobytes())
+
+        meta = {
+            'version': _VERSION,
+            'num_infosets': num_infosets,
+            'num_actions': self.num_actions,
+            'chunk_size': self.chunk_size,
+            'tables': {name: [str(array.dtype), self.initial_values[name]] for name, array in self.arrays.items()},
+            'attributes': attributes,
+        }
+        _replace(os.path.join(path, INFOSETS_FILE), json.dumps(meta).encode())
+        self.dirty[:] = False
+        self._saved = (os.path.abspath(path), num_infosets)
+
+
+def _replace(path, data):
+    ''' Write a file atomically
+    '''
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def load_infoset_table(path, mmap=True):
+    ''' Open a table written by InfosetTable.save
+
+    Args:
+        path (str): The directory
+        mmap (bool): Whether to map the files copy-on-write, reading the keys and rows
+            when they are first used, instead of reading them in memory
+
+    Returns:
+        (InfosetTable): The table, with the saved attributes in its attributes
+    '''
+    meta_path = os.path.join(path, INFOSETS_FILE)
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError('No infoset table in {}'.format(path))
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['version'] != _VERSION:
+        raise ValueError('{} has version {} of the infoset table format'.format(path, meta['version']))
+    num_infosets, num_actions = meta['num_infosets'], meta['num_actions']
+    tables = {name: value for name, (_, value) in meta['tables'].items()}
+    infosets = InfosetTable(num_actions, tables, chunk_size=meta['chunk_size'])
+    infosets.attributes = meta['attributes']
+
+    def read(name, dtype, count, shape=None):
+        file_path = os.path.join(path, name)
+        if count == 0:
+            return np.zeros(shape or (0,), dtype=dtype)
+        if mmap:
+            return np.memmap(file_path, dtype=dtype, mode='c', shape=shape or (count,))
+        array = np.fromfile(file_path, dtype=dtype, count=count)
+        return array.reshape(shape) if shape else array
+
+    for name, (dtype, _) in meta['tables'].items():
+        infosets.arrays[name] = read(name + '.bin', dtype, num_infosets * num_actions, (num_infosets, num_actions))
+    infosets.dirty = np.zeros(num_infosets, dtype=bool)
+    saved_keys = _SavedKeys(
+        read('keys.bin', np.uint8, os.path.getsize(os.path.join(path, 'keys.bin'))),
+        read('key_offsets.i8', np.int64, num_infosets + 1),
+        read('key_hashes.u8', np.uint64, num_infosets),
+        read('key_ids.i8', np.int64, num_infosets),
+    )
+    infosets.ids = _InfosetIds(saved_keys)
+    infosets.keys = _InfosetKeys(saved_keys)
+    infosets._saved = (os.path.abspath(path), num_infosets)
+    return infosets
+
+
+class _SavedKeys:
+    ''' The keys of a saved table and their hash index
+    '''
+
+    def __init__(self, data, offsets, hashes, ids):
+        self.data = data
+        self.offsets = offsets
+        self.hashes = hashes
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def key(self, index):
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes()
+
+    def find(self, key):
+        key_hash = np.uint64(_hash(key))
+        start = np.searchsorted(self.hashes, key_hash, side='left')
+        while start < len(self.hashes) and self.hashes[start] == key_hash:
+            index = int(self.ids[start])
+            if self.key(index) == key:
+                return index
+            start += 1
+        return None
+
+
+class _InfosetIds:
+    ''' The state_str -> id dict of a loaded table: the keys met since the load,
+        and the saved ones, found in the hash index and then kept
+    '''
+
+    def __init__(self, saved_keys):
+        self.saved_keys = saved_keys
+        self.memory = {}
+
+    def get(self, key, default=None):
+        index = self.memory.get(key)
+        if index is None and self.saved_keys is not None:
+            index = self.saved_keys.find(key)
+            if index is not None:
+                self.memory[key] = index
+        return default if index is None else index
+
+    def __getitem__(self, key):
+        index = self.get(key)
+        if index is None:
+            raise KeyError(key)
+        return index
+
+    def __setitem__(self, key, index):
+        self.memory[key] = index
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def clear(self):
+        self.saved_keys = None
+        self.memory.clear()
+
+
+class _InfosetKeys(collections.abc.Sequence):
+    ''' The keys of a loaded table in id order: the saved ones then the ones met since the load
+    '''
+
+    def __init__(self, saved_keys):
+        self.saved_keys = saved_keys
+        self.num_saved = len(saved_keys)
+        self.memory = []
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < self.num_saved:
+            return self.saved_keys.key(index)
+        return self.memory[index - self.num_saved]
+
+    def __len__(self):
+        return self.num_saved + len(self.memory)
+
+    def append(self, key):
+        self.memory.append(key)
+
+    def clear(self):
+        self.num_saved = 0
+        self.memory.clear()
+
+
+class InfosetView(collections.abc.Mapping):
+    ''' A read-only state_str -> row mapping of a table, pickled as a dict
+    '''
+
+    def __init__(self, infosets, name, transform=None):
+        self.infosets = infosets
+        self.name = name
+        self.transform = transform
+
+    def __getitem__(self, key):
+        row = self.infosets.arrays[self.name][self.infosets.ids[key]]
+        return row if self.transform is None else self.transform(row)
+
+    def __contains__(self, key):
+        return key in self.infosets.ids
+
+    def __iter__(self):
+        return iter(self.infosets.keys)
+
+    def __len__(self):
+        return len(self.infosets)
+
+    def __reduce__(self):
+        return (dict, ({key: np.array(self[key]) for key in self},))
@@ -0,0 +1,161 @@
+import numpy as np
+
+from rlcard_fork.agents.cfr_agent import CFRAgent, match_regrets
+from rlcard_fork.utils import seeding
+from rlcard_fork.utils.utils import remove_illegal
+
+class MCCFRAgent(CFRAgent):
+    ''' Implement Monte Carlo CFR with external sampling or outcome sampling (Lanctot et al., 2009)
+
+    A CFR iteration walks every action of every player. External sampling walks
+    every action of the updated player and samples one action of the others,
+    outcome sampling samples a single trajectory. The chance events are sampled
+    by the env, so a seeded env and a seeded agent give the same training.
+    '''
+
+    def __init__(self, env, model_path='./mccfr_model', sampling='external', epsilon=0.6, rule='cfr', seed=None,
+                 pruning=None):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class, with allow_step_back
+            model_path (str): The directory of the saved model
+            sampling (str): 'external' or 'outcome'
+            epsilon (float): The exploration of the updated player with outcome sampling
+            rule (str or CFR): The update rule of the regrets and average policy, see cfr_rules
+            seed (int): The seed of the action sampling
+            pruning (RegretPruning): The regret-based pruning of external sampling and its counters
+        '''
+        if sampling not in ('external', 'outcome'):
+            raise ValueError('Unknown sampling {}, expected external or outcome'.format(sampling))
+        super().__init__(env, model_path, rule, pruning)
+        self.sampling = sampling
+        self.epsilon = epsilon
+        self.np_random, _ = seeding.np_random(seed)
+
+    def train(self):
+        ''' Do one iteration of MCCFR, a sampled traversal for each player
+
+        The traversals play the regret matching strategies of the regrets before the iteration,
+        the regrets they sample are applied at the end, see apply_regrets.
+        '''
+        self.iteration += 1
+        for player_id in range(self.env.num_players):
+            self.env.reset()
+            if self.sampling == 'external':
+                self.external_sampling(player_id)
+            else:
+                self.outcome_sampling(player_id, 1.0, 1.0, 1.0)
+        self.apply_regrets()
+
+    def current_strategy(self, index, legal_actions):
+        ''' Get the regret matching strategy of an infoset, and record it in the policy
+
+        Args:
+            index (int): The id of the infoset
+            legal_actions (list): Indices of legal actions
+
+        Returns:
+            (numpy.array): The probability of each action, 0 for the illegal ones
+        '''
+        policy = self.infosets.arrays['policy'][index]
+        policy[:] = match_regrets(self.infosets.arrays['regrets'][index])
+        return remove_illegal(policy, legal_actions)
+
+    def external_sampling(self, player_id):
+        ''' Traverse all the actions of player_id and one sampled action of the others, update the regrets
+
+        Args:
+            player_id (int): The player to update
+
+        Returns:
+            utility (float): The sampled utility of the player
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id]
+
+        current_player = self.env.get_player_id()
+        obs, legal_actions = self.get_state(current_player)
+        index = self.infosets.index(obs)
+        strategy = self.current_strategy(index, legal_actions)
+        counters = self.pruning.counters
+        counters['nodes'] += 1
+
+        if current_player != player_id:
+            # The others are sampled according to their strategy, which is what they add to their average
+            self.rule.update_strategy_sums(self.infosets.arrays['average_policy'][index], strategy, self.iteration)
+            action = self.np_random.choice(len(strategy), p=strategy)
+            counters['walked'] += 1
+            self.env.step(action)
+            utility = self.external_sampling(player_id)
+            self.env.step_back()
+            return utility
+
+        walked_actions = legal_actions
+        if self.pruning.prunes(self.iteration):
+            # The pruned actions are not played and keep their regret
+            regrets = self.infosets.arrays['regrets'][index]
+            walked_actions = [action for action in legal_actions
+                              if strategy[action] > 0 or regrets[action] >= self.pruning.threshold]
+            counters['pruned'] += len(legal_actions) - len(walked_actions)
+        counters['walked'] += len(walked_actions)
+
+        action_utilities = np.zeros(self.env.num_actions)
+        for action in walked_actions:
+            self.env.step(action)
+            action_utilities[action] = self.external_sampling(player_id)
+            self.env.step_back()
+        utility = strategy @ action_utilities
+
+        regrets = np.zeros(self.env.num_actions)
+        regrets[walked_actions] = action_utilities[walked_actions] - utility
+        self.add_regrets(index, regrets)
+        return utility
+
+    def outcome_sampling(self, player_id, player_prob, opponent_prob, sample_prob):
+        ''' Sample a trajectory, update the regrets of player_id along it
+
+        Args:
+            player_id (int): The player to update
+            player_prob (float): The reach probability of player_id
+            opponent_prob (float): The reach probability of the others
+            sample_prob (float): The probability of sampling the trajectory so far
+
+        Returns:
+            (tuple) that contains:
+                utility (float): The utility of the player at the end of the trajectory, divided by its sampling probability
+                tail_prob (float): The probability of the rest of the trajectory under the current strategies
+        '''
+        if self.env.is_over():
+            return self.env.get_payoffs()[player_id] / sample_prob, 1.0
+
+        current_player = self.env.get_player_id()
+        obs, legal_actions = self.get_state(current_player)
+        index = self.infosets.index(obs)
+        strategy = self.current_strategy(index, legal_actions)
+        sampling_probs = strategy
+        if current_player == player_id:
+            sampling_probs = (1 - self.epsilon) * strategy
+            sampling_probs[legal_actions] += self.epsilon / len(legal_actions)
+
+        action = self.np_random.choice(len(sampling_probs), p=sampling_probs)
+        self.env.step(action)
+        if current_player == player_id:
+            utility, tail_prob = self.outcome_sampling(player_id, player_prob * strategy[action], opponent_prob,
+                                                       sample_prob * sampling_probs[action])
+        else:
+            utility, tail_prob = self.outcome_sampling(player_id, player_prob, opponent_prob * strategy[action],
+                                                       sample_prob * sampling_probs[action])
+        self.env.step_back()
+
+        if current_player == player_id:
+            # Sampled counterfactual values: the sampled action gets the whole value, the others 0
+            value = utility * opponent_prob * tail_prob
+            regrets = np.zeros(self.env.num_actions)
+            regrets[legal_actions] = -value * strategy[action]
+            regrets[action] += value
+            self.add_regrets(index, regrets)
+        else:
+            self.rule.update_strategy_sums(self.infosets.arrays['average_policy'][index],
+                                           opponent_prob / sample_prob * strategy, self.iteration)
+        return utility, tail_prob * strategy[action]
@@ -0,0 +1,272 @@
+''' Monte Carlo CFR on a pool of worker processes
+
+The regrets and the average strategy sums of all the infosets are the rows of
+an InfosetTable in shared memory, indexed by the dense infoset ids of the
+parent. The workers run sampled traversals (each with its own seeded env and
+action sampling) against a snapshot of the regrets. They accumulate the
+regrets and strategies of their traversals in a local table, then add them to
+a shared buffer of their own, so that no lock is needed. At the end of an
+iteration the parent sums the buffers into the tables through the update rule,
+numbers the infosets the workers met for the first time, and the next
+iteration starts from the new regrets.
+'''
+import multiprocessing
+import os
+
+import numpy as np
+
+from rlcard_fork.agents.cfr_agent import CFRAgent, match_regrets
+from rlcard_fork.agents.cfr_rules import CFR
+from rlcard_fork.agents.infoset_table import InfosetTable, load_infoset_table
+from rlcard_fork.agents.mccfr_agent import MCCFRAgent
+from rlcard_fork.utils.utils import remove_illegal
+
+
+class _SharedTables:
+    ''' The regret and strategy sum tables, then a regret and a strategy buffer for each worker,
+        as one float64 array of shape (2 + 2 * workers, capacity, actions) in shared memory
+    '''
+
+    def __init__(self, num_workers, capacity, num_actions, name=None):
+        # Python 3.8, imported here so that the other agents import on 3.7
+        from multiprocessing import shared_memory
+        self.shape = (2 + 2 * num_workers, capacity, num_actions)
+        size = int(np.prod(self.shape)) * 8
+        self.memory = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.owner = name is None
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.memory.buf)
+        if self.owner:
+            self.array[:] = 0
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def close(self):
+        del self.array
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+class _SharedInfosetTable(InfosetTable):
+    ''' An InfosetTable of regrets and average_policy whose arrays are views of _SharedTables,
+        reallocated in shared memory when they grow
+    '''
+
+    def __init__(self, num_actions, num_workers, chunk_size):
+        self.num_workers = num_workers
+        self.tables = None
+        super().__init__(num_actions, {'regrets': 0.0, 'average_policy': 0.0}, chunk_size)
+        self._reallocate(chunk_size)
+
+    def _reallocate(self, capacity):
+        tables = _SharedTables(self.num_workers, capacity, self.num_actions)
+        if self.tables is not None:
+            tables.array[:, :self.capacity] = self.tables.array
+            self.tables.close()
+        self.tables = tables
+        self.arrays = {'regrets': tables.array[0], 'average_policy': tables.array[1]}
+
+    def close(self):
+        ''' Free the shared memory, keeping a private copy of the tables
+        '''
+        self.arrays = {name: np.array(array) for name, array in self.arrays.items()}
+        self.tables.close()
+        self.tables = None
+
+
+class _WorkerAgent(MCCFRAgent):
+    ''' The traversals of MCCFRAgent, reading the shared regrets, with local tables flushed to the buffers of a worker
+    '''
+
+    def __init__(self, env, worker_id, num_workers, sampling, epsilon, seed):
+        # The local tables sum the raw regrets and strategies, the rule of the parent weighs them
+        super().__init__(env, sampling=sampling, epsilon=epsilon, rule=CFR(linear_averaging=False), seed=seed)
+        self.worker_id = worker_id
+        self.num_workers = num_workers
+        self.tables = None
+        # state_str -> id in the shared tables, and the shared id of each local id, -1 if it has none yet
+        self.shared_ids = {}
+        self.global_ids = []
+
+    def attach(self, name, capacity):
+        if self.tables is not None:
+            self.tables.close()
+        self.tables = _SharedTables(self.num_workers, capacity, self.env.num_actions, name=name)
+
+    def add_ids(self, new_ids):
+        self.shared_ids.update(new_ids)
+        for obs, index in new_ids.items():
+            local_index = self.infosets.ids.get(obs)
+            if local_index is not None:
+                self.global_ids[local_index] = index
+
+    def current_strategy(self, index, legal_actions):
+        if index == len(self.global_ids):
+            self.global_ids.append(self.shared_ids.get(self.infosets.keys[index], -1))
+        shared_index = self.global_ids[index]
+        if shared_index < 0:
+            regrets = np.zeros(self.env.num_actions)
+        else:
+            regrets = self.tables.array[0, shared_index]
+        return remove_illegal(match_regrets(regrets), legal_actions)
+
+    def run(self, num_traversals):
+        ''' Run the traversals of an iteration
+
+        Returns:
+            (dict): state_str -> regrets and strategy sums of the infosets without a shared id
+        '''
+        for _ in range(num_traversals):
+            self.train()
+        regrets, strategy_sums = self.infosets['regrets'], self.infosets['average_policy']
+        shared_ids = np.array(self.global_ids, dtype=np.int64)
+        known = shared_ids >= 0
+        buffers = self.tables.array
+        buffers[2 + 2 * self.worker_id, shared_ids[known]] += regrets[known]
+        buffers[3 + 2 * self.worker_id, shared_ids[known]] += strategy_sums[known]
+        pending = {self.infosets.keys[index]: (regrets[index].copy(), strategy_sums[index].copy())
+                   for index in np.flatnonzero(~known)}
+        regrets[:] = 0
+        strategy_sums[:] = 0
+        return pending
+
+
+def _work(connection, env, worker_id, num_workers, sampling, epsilon, seed):
+    ''' The loop of a worker process: receive an iteration, send back the infosets met for the first time
+    '''
+    # Without a seed the forked envs would all deal the same cards
+    env.seed(seed)
+    agent = _WorkerAgent(env, worker_id, num_workers, sampling, epsilon, seed)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        (name, capacity), new_ids, num_traversals = message
+        if agent.tables is None or agent.tables.name != name:
+            agent.attach(name, capacity)
+        agent.add_ids(new_ids)
+        connection.send(agent.run(num_traversals))
+    if agent.tables is not None:
+        agent.tables.close()
+    connection.close()
+
+
+class ParallelMCCFRAgent(CFRAgent):
+    ''' Monte Carlo CFR with the traversals of an iteration shared among worker processes
+
+    An iteration is num_traversals MCCFR iterations (a traversal per player) in each of the
+    num_workers processes. The policy, average_policy and regrets are read-only
+    state_str -> array mappings backed by the shared tables.
+    '''
+
+    def __init__(self, env, model_path='./parallel_mccfr_model', num_workers=None, num_traversals=10,
+                 sampling='external', epsilon=0.6, rule='cfr', seed=None, capacity=1 << 16):
+        ''' Initilize Agent
+
+        Args:
+            env (Env): Env class, with allow_step_back, each worker gets a copy
+            model_path (str): The directory of the saved model
+            num_workers (int): The number of worker processes, the number of CPUs if None
+            num_traversals (int): The traversals of each worker and player per iteration
+            sampling (str): 'external' or 'outcome', see MCCFRAgent
+            epsilon (float): The exploration of the updated player with outcome sampling
+            rule (str or CFR): The update rule of the regrets and average policy, see cfr_rules
+            seed (int): The seed of the worker envs and action sampling, worker i uses seed + i
+            capacity (int): The initial number of infoset rows, doubled when full
+        '''
+        if sampling not in ('external', 'outcome'):
+            raise ValueError('Unknown sampling {}, expected external or outcome'.format(sampling))
+        super().__init__(env, model_path, rule)
+        self.num_workers = num_workers or os.cpu_count()
+        self.num_traversals = num_traversals
+        self.sampling = sampling
+        self.epsilon = epsilon
+        self.seed = seed
+
+        self.use_infosets(_SharedInfosetTable(env.num_actions, self.num_workers, capacity))
+        # The infosets with an id known to the workers
+        self._num_sent = 0
+
+        self.workers = []
+        self.connections = []
+        for worker_id in range(self.num_workers):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            worker_seed = None if seed is None else seed + worker_id
+            process = multiprocessing.Process(
+                target=_work,
+                args=(child_connection, env, worker_id, self.num_workers, sampling, epsilon, worker_seed),
+                daemon=True,
+            )
+            process.start()
+            child_connection.close()
+            self.workers.append(process)
+            self.connections.append(parent_connection)
+
+    def use_infosets(self, infosets):
+        ''' Set the tables, the policy is computed from the regrets
+        '''
+        self.infosets = infosets
+        self.regrets = infosets.view('regrets')
+        self.average_policy = infosets.view('average_policy')
+        self.policy = infosets.view('regrets', match_regrets)
+
+    def train(self):
+        ''' Do one parallel iteration and merge the buffers of the workers into the tables
+        '''
+        self.iteration += 1
+        tables = (self.infosets.tables.name, self.infosets.capacity)
+        new_ids = {obs: index for index, obs in enumerate(self.infosets.keys[self._num_sent:], self._num_sent)}
+        self._num_sent = len(self.infosets)
+        for connection in self.connections:
+            connection.send((tables, new_ids, self.num_traversals))
+        pendings = [connection.recv() for connection in self.connections]
+
+        # The workers wait for the next iteration, the tables can grow
+        num_known = len(self.infosets)
+        for pending in pendings:
+            for obs in pending:
+                self.infosets.index(obs)
+        num_ids = len(self.infosets)
+
+        array = self.infosets.tables.array
+        regrets = np.zeros((num_ids, self.env.num_actions))
+        strategy_sums = np.zeros((num_ids, self.env.num_actions))
+        regrets[:num_known] = array[2::2, :num_known].sum(axis=0)
+        strategy_sums[:num_known] = array[3::2, :num_known].sum(axis=0)
+        array[2:, :num_known] = 0
+        for pending in pendings:
+            for obs, (pending_regrets, pending_strategy_sums) in pending.items():
+                regrets[self.infosets.ids[obs]] += pending_regrets
+                strategy_sums[self.infosets.ids[obs]] += pending_strategy_sums
+        self.rule.update_regrets(self.infosets['regrets'], regrets, self.iteration)
+        self.rule.update_strategy_sums(self.infosets['average_policy'], strategy_sums, self.iteration)
+        self.infosets.dirty[:num_ids] = True
+
+    def load(self):
+        ''' Load model, into the shared tables
+        '''
+        if not os.path.exists(self.model_path):
+            return
+        saved = load_infoset_table(self.model_path)
+        for name in ('regrets', 'average_policy'):
+            self.infosets.update(name, saved.view(name))
+        self.iteration = saved.attributes['iteration']
+
+    def close(self):
+        ''' Stop the workers and free the shared memory, the agent can not train any more
+        '''
+        for connection, process in zip(self.connections, self.workers):
+            connection.send(None)
+            process.join()
+            connection.close()
+        self.connections, self.workers = [], []
+        self.infosets.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.connections:
+            self.close()
@@ -0,0 +1,198 @@
+''' Bayesian tracking of the ranges of the players through a no limit holdem hand
+
+Each player starts the hand with a range, by default the hands its position
+plays (PREFLOP_RANGES). When a player acts, the weight of each of its 1326
+combos is multiplied by the probability of the combo to take that action
+under a strategy, e.g. SolverService.frequencies: by Bayes' rule the weights
+stay proportional to the probability of each combo given the actions seen.
+The cards that become known, the board and the hands shown to the tracker
+such as the hero's, are removed from the ranges of the other players.
+
+The ranges are the rows of one (players, 1326) array, so that an update is a
+couple of vector operations, a few microseconds once the strategy is known.
+'''
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import cards_to_mask
+from rlcard_fork.games.limitholdem.range import COMBO_MASKS, Range
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.player import Position
+from rlcard_fork.games.nolimitholdem.round import Action
+
+# The hands each position plays, opening ranges of 6-max tables, the big blind defends with any hand
+PREFLOP_RANGES = {
+    Position.UTG: '55+,A2s+,K9s+,Q9s+,J9s+,T9s,98s,87s,ATo+,KJo+',
+    Position.UTG1: '44+,A2s+,K9s+,Q9s+,J9s+,T9s,98s,87s,76s,ATo+,KJo+,QJo',
+    Position.MP: '33+,A2s+,K8s+,Q9s+,J9s+,T9s,98s,87s,76s,ATo+,KTo+,QJo',
+    Position.MP1: '22+,A2s+,K7s+,Q9s+,J9s+,T8s+,98s,87s,76s,65s,A9o+,KTo+,QJo',
+    Position.HJ: '22+,A2s+,K6s+,Q8s+,J8s+,T8s+,97s+,86s+,76s,65s,A9o+,KTo+,QTo+,JTo',
+    Position.CO: '22+,A2s+,K4s+,Q6s+,J7s+,T7s+,96s+,86s+,75s+,65s,54s,A7o+,A5o,K9o+,Q9o+,J9o+,T9o',
+    Position.BTN: '22+,A2s+,K2s+,Q2s+,J4s+,T6s+,95s+,85s+,74s+,64s+,53s+,43s,A2o+,K7o+,Q8o+,J8o+,T8o+,97o+,87o,76o',
+    Position.SB: '22+,A2s+,K3s+,Q5s+,J7s+,T7s+,96s+,86s+,75s+,64s+,54s,A2o+,K8o+,Q9o+,J9o+,T9o,98o',
+    Position.BB: None,
+}
+
+
+def positional_ranges(num_players, chart=None):
+    ''' Get the range of each seat of a hand from its position
+
+    Args:
+        num_players (int): The number of players of the hand
+        chart (dict): The hand classes of each Position (see Range.from_string), every hand for
+            the positions it leaves out or maps to None, PREFLOP_RANGES if None
+
+    Returns:
+        (list): The Range of each seat
+    '''
+    chart = PREFLOP_RANGES if chart is None else chart
+    ranges = []
+    for position in Position.positions(num_players):
+        hand_classes = chart.get(position)
+        ranges.append(Range() if hand_classes is None else Range.from_string(hand_classes))
+    return ranges
+
+
+def _as_weights(value):
+    ''' The 1326 weights of a Range, a hand class string or weights
+    '''
+    if isinstance(value, Range):
+        return value.weights
+    if isinstance(value, str):
+        return Range.from_string(value).weights
+    return np.asarray(value, dtype=np.float64)
+
+
+class RangeTracker:
+    ''' The ranges of the players of a hand, narrowed by the actions they take
+    '''
+
+    def __init__(self, num_players, ranges=None, strategy=None):
+        ''' Start tracking a hand
+
+        Args:
+            num_players (int): The number of players of the hand
+            ranges (list): The range of each seat at the start of the hand, as a Range, a string of
+                hand classes or 1326 weights, positional_ranges if None
+            strategy (function): (state, action, size, raises, ranges) -> the probability of the
+                action for each of the 1326 combos of the player to act, or None if it has no
+                strategy for the state, e.g. SolverService.frequencies or SolverClient.frequencies.
+                The state is before the action and the ranges are those of every seat. The
+                actions narrow no range if None
+        '''
+        ranges = positional_ranges(num_players) if ranges is None else ranges
+        if len(ranges) != num_players:
+            raise ValueError('Expected the ranges of {} players, got {}'.format(num_players, len(ranges)))
+        self.weights = np.stack([_as_weights(player_range) for player_range in ranges]).astype(np.float64)
+        self.strategy = strategy
+        # The street and the bets and raises already made on it, for the bet size abstraction
+        self.street = 0
+        self.raises = 0
+        self.counters = {'actions': 0, 'updates': 0, 'inconsistent': 0}
+
+    def observe(self, state, action, size=None):
+        ''' Narrow the range of the player to act by the action it takes
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): The state before the action
+            action (Action): The action
+            size (int): The chips added by a bet or raise
+
+        Returns:
+            (bool): Whether the range was narrowed, see update
+        '''
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        self._enter_street(state.street)
+        frequencies = None
+        if self.strategy is not None:
+            frequencies = self.strategy(state, action, size, self.raises, self.get_ranges())
+        if action in (Action.BET, Action.RAISE):
+            self.raises += 1
+        self.counters['actions'] += 1
+        if frequencies is None:
+            return False
+        return self.update(state.game_pointer, frequencies)
+
+    def _enter_street(self, street):
+        ''' Start counting the bets and raises of a new street
+        '''
+        if street != self.street:
+            self.street, self.raises = street, 0
+
+    def update(self, seat, frequencies):
+        ''' Multiply the range of a seat by the probability of each combo to take the action seen
+
+        Args:
+            seat (int): The seat of the player who acted
+            frequencies (numpy.array): The probability of the action for each of the 1326 combos
+
+        Returns:
+            (bool): Whether the range was narrowed. An action that the strategy plays with no combo
+                of the range leaves it as it was
+        '''
+        updated = self.weights[seat] * frequencies
+        if not updated.any():
+            self.counters['inconsistent'] += 1
+            return False
+        self.weights[seat] = updated
+        self.counters['updates'] += 1
+        return True
+
+    def remove_cards(self, cards, seats=None):
+        ''' Zero the combos holding any of some cards
+
+        Args:
+            cards (list): Card codes, the unknown ones (-1) are skipped
+            seats (list): The seats whose ranges lose the combos, all if None
+        '''
+        mask = cards_to_mask([int(card) for card in cards if card >= 0])
+        blocked = (COMBO_MASKS & np.uint64(mask)) != 0
+        if seats is None:
+            self.weights[:, blocked] = 0.0
+        else:
+            self.weights[np.ix_(list(seats), blocked)] = 0.0
+
+    def remove_known_cards(self, state):
+        ''' Remove the board from every range, and each known hand from the ranges of the other seats
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): The state, in a game with the hero's
+                hand set
+        '''
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        self.remove_cards(state.get_public_cards())
+        for seat, hand in enumerate(state.hands):
+            if (hand >= 0).all():
+                self.remove_cards(hand, [other for other in range(len(self.weights)) if other != seat])
+
+    def step(self, game, action, size=None):
+        ''' Observe an action, play it in a game and remove the cards known afterwards
+
+        The street and raises of the tracker are those of the game after the action, e.g. for the
+        bet size abstraction of the next one.
+
+        Args:
+            game (NolimitholdemGame): The game, before the action
+            action (Action): The action
+            size (int): The chips added by a bet or raise
+
+        Returns:
+            (tuple): The result of game.step
+        '''
+        self.observe(game, action, size)
+        result = game.step(action, size)
+        state = FlatNolimitholdemState.from_game(game)
+        self._enter_street(state.street)
+        self.remove_known_cards(state)
+        return result
+
+    def get_range(self, seat):
+        ''' Get a copy of the range of a seat
+        '''
+        return Range(self.weights[seat])
+
+    def get_ranges(self):
+        ''' Get a copy of the range of every seat
+        '''
+        return [Range(weights) for weights in self.weights]
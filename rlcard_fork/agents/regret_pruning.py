@@ -0,0 +1,72 @@
+''' Regret-based pruning of the CFR traversals
+
+An action whose cumulative regret is far below zero has no probability in the
+current strategy, and walking its subtree only moves its own regret, by too
+little to make it played again soon. With regret-based pruning the traversals
+skip such actions of the updated player, leaving their regret unchanged,
+except on one iteration out of full_traversal_every, where the whole tree is
+walked so that an action that has become good again gets its regret back up
+(Brown and Sandholm, 2015). The regrets below a pruned action are not updated
+either, so nothing is pruned in the first iterations, while the regrets are
+still far from their long run values.
+
+Whatever the regrets, a subtree that neither the updated player nor the others
+reach adds nothing to the regrets or to the average strategy, the traversals
+skip it on every iteration unless skip_unreached is off.
+'''
+
+
+class RegretPruning:
+    ''' When the traversals prune the actions of low regret, and counters of the walked tree
+    '''
+
+    def __init__(self, threshold=None, warmup=100, full_traversal_every=20, skip_unreached=True):
+        ''' Set up pruning
+
+        Args:
+            threshold (float): The actions of a cumulative regret below are pruned, negative, in the
+                units of the regrets of the solver and far below what an action gains in one iteration,
+                or an action that becomes good again is played too late. None to only skip the
+                unreached subtrees
+            warmup (int): The number of iterations without pruning at the start
+            full_traversal_every (int): Every full_traversal_every iterations nothing is pruned
+            skip_unreached (bool): Whether to skip the subtrees that no player reaches, False to walk
+                them, e.g. to check that skipping them changes nothing
+        '''
+        if threshold is not None and threshold >= 0:
+            raise ValueError('The pruning threshold should be negative, got {}'.format(threshold))
+        self.threshold = threshold
+        self.warmup = warmup
+        self.full_traversal_every = full_traversal_every
+        self.skip_unreached = skip_unreached
+        self.reset_counters()
+
+    def prunes(self, iteration):
+        ''' Check whether the traversals of an iteration prune the actions of low regret
+
+        Args:
+            iteration (int): The iteration, from 1
+
+        Returns:
+            (bool): False without a threshold, during the warmup and on the full traversals
+        '''
+        return (self.threshold is not None and iteration > self.warmup
+                and iteration % self.full_traversal_every != 0)
+
+    def reset_counters(self):
+        ''' Start counting again
+
+        nodes is the number of player nodes walked, walked the number of their children walked,
+        pruned and skipped the children not walked because of their regret and their reach
+        '''
+        self.counters = {'nodes': 0, 'walked': 0, 'pruned': 0, 'skipped': 0}
+
+    def pruned_fraction(self):
+        ''' Get the fraction of the children of the walked nodes that were pruned or skipped
+
+        Returns:
+            (float): The fraction since the counters were reset, 0 before anything was walked
+        '''
+        not_walked = self.counters['pruned'] + self.counters['skipped']
+        total = self.counters['walked'] + not_walked
+        return not_walked / total if total else 0.0
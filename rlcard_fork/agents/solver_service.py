@@ -0,0 +1,705 @@
+''' A long-running process answering strategy queries about no limit holdem spots
+
+Solving a spot with VectorCFRSolver takes seconds to minutes, reading its
+strategy takes milliseconds. SolverService keeps the trees and solvers of
+the spots it has solved in a SpotCache, by canonical signature (see
+spot_cache). A query for a state of a solved spot (its root with the same
+ranges up to the suits, or any node below it in memory on the same board) is
+answered from the solved strategy, any other state is solved first, from the
+state itself. The answer is the strategy of the player to act: the frequency
+and the expected value of each abstract action, for the hand of that player
+if the state knows it, averaged over its range otherwise.
+
+A no limit holdem hand of more players is solved once two players are left:
+the chips of the folded players are dead money, split between the two. Each
+of them is then credited half of it in every outcome, which changes none of
+the decisions. The expected values are the chips the player gets back from
+the pot and the bets to come, from the state on.
+
+For real-time play the service solves depth-limited trees within a time
+budget: only to the end of the street of the state, with leaf value
+estimates (see vector_cfr_solver), returning the strategy reached when the
+budget runs out. A spot cut short this way keeps training on the next
+queries of its states. When no ranges are given at the start of a street,
+they are propagated from the leaf of a spot solved on the previous streets:
+the ranges at its root times the frequencies of the actions leading there.
+
+start_server serves a SolverService on a Unix socket with asyncio, so that
+the driver, GUIs and scripts share one warm process. The protocol is one JSON
+object per line each way: a request {"method": ..., params} gets
+{"result": ...} or {"error": "..."}. The requests are handled one at a time,
+on a worker thread, so that a long solve does not block the connections.
+SolverClient is a blocking client.
+'''
+import asyncio
+import json
+import os
+import socket
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rlcard_fork.agents.spot_cache import (SpotCache, canonical_spot, permute_range, permute_suits, seat_positions,
+                                           spot_signature)
+from rlcard_fork.agents.vector_cfr_solver import VectorCFRSolver, compatible_reach, load_vector_cfr_solver
+from rlcard_fork.games.limitholdem.range import Range, combo_index
+from rlcard_fork.games.nolimitholdem.bet_sizing import AbstractAction, SizingTree
+from rlcard_fork.games.nolimitholdem.flat_state import ALIVE, FOLDED, SHOWDOWN, FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game_tree import LEAF_NODE, PLAYER_NODE, build_game_tree, load_game_tree
+from rlcard_fork.games.nolimitholdem.round import Action
+
+DEFAULT_SOCKET = '/tmp/rlcard_solver.sock'
+
+
+def heads_up_spot(state):
+    ''' Reduce a state where two players are left to a heads up state
+
+    The folded players are removed and their chips split between the two
+    others, the odd chip to the second one.
+
+    Args:
+        state (FlatNolimitholdemState): A flop, turn or river state with two players left
+
+    Returns:
+        (tuple) that contains:
+            spot (FlatNolimitholdemState): The heads up state, without hole cards nor unrevealed board cards
+            seats (numpy.array): The seat in state of each player of spot
+    '''
+    seats = np.flatnonzero(state.status != FOLDED)
+    if len(seats) != 2:
+        raise ValueError('The solver needs two players left, got {}'.format(len(seats)))
+    if state.street in (0, SHOWDOWN):
+        raise ValueError('The solver needs a flop, turn or river state, got street {}'.format(state.street))
+    public_cards = state.get_public_cards()
+    if min(public_cards) < 0:
+        raise ValueError('The board cards of street {} are not known'.format(state.street))
+    if state.game_pointer not in seats:
+        raise ValueError('Seat {} to act has folded'.format(state.game_pointer))
+    dead = int(state.in_chips.sum() - state.in_chips[seats].sum())
+    spot = FlatNolimitholdemState.__new__(FlatNolimitholdemState)
+    spot.num_players = 2
+    spot.small_blind = state.small_blind
+    spot.big_blind = state.big_blind
+    spot.stacks = state.stacks[seats].copy()
+    spot.in_chips = state.in_chips[seats] + np.array([dead // 2, dead - dead // 2])
+    spot.raised = state.raised[seats].copy()
+    spot.status = state.status[seats].copy()
+    spot.hands = np.full((2, 2), -1, dtype=np.int8)
+    spot.board = np.array(public_cards + [-1] * (5 - len(public_cards)), dtype=np.int8)
+    spot.board_mask = state.board_mask
+    spot.game_pointer = int(np.flatnonzero(seats == state.game_pointer)[0])
+    spot.street = state.street
+    # The checks and calls since the last bet were made by players still in the hand
+    spot.not_raise_num = state.not_raise_num
+    spot.not_playing_num = int((spot.status != ALIVE).sum())
+    return spot, seats
+
+
+def _parse_range(value):
+    ''' A Range from a hand class string, a list of 1326 weights or None for every combo
+    '''
+    if value is None:
+        return Range()
+    if isinstance(value, Range):
+        return value
+    if isinstance(value, str):
+        return Range.from_string(value)
+    return Range(value)
+
+
+class SolvedSpot:
+    ''' The tree and solver of a spot, and the answers already computed at its nodes
+    '''
+
+    def __init__(self, spot, tree, solver, solve_time, exploitability=None, signature=None):
+        ''' Wrap a solved spot
+
+        Args:
+            spot (FlatNolimitholdemState): The canonical heads up spot at the root of the tree
+            tree (PublicTree): The tree
+            solver (VectorCFRSolver): The solver
+            solve_time (float): The seconds the solve took
+            exploitability (float): The exploitability of the solver in mbb/g, None if unknown
+            signature (str): The signature of the spot, see spot_signature
+        '''
+        self.spot = spot
+        self.tree = tree
+        self.solver = solver
+        self.solve_time = solve_time
+        self.exploitability = exploitability
+        self.signature = signature
+        # node type -> (street, player, in_chips, stacks, status) -> node, built on the first lookup
+        self._nodes = {}
+        # (node, board) -> strategy, action values, reach and opponent reach of the player to act
+        self.answers = {}
+
+    def nbytes(self):
+        ''' Get the memory used by the tree and the solver
+        '''
+        return self.tree.nbytes() + self.solver.nbytes()
+
+    def save(self, directory):
+        ''' Write the spot to a directory, see load_solved_spot
+        '''
+        self.tree.save(os.path.join(directory, 'tree.bin'))
+        self.solver.save(os.path.join(directory, 'solver.npz'))
+        with open(os.path.join(directory, 'spot.json'), 'w') as f:
+            json.dump({'spot': self.spot.to_array().tolist(), 'solve_time': self.solve_time,
+                       'exploitability': self.exploitability, 'signature': self.signature}, f)
+
+    def find(self, spot, node_type=PLAYER_NODE):
+        ''' Get the node of the tree at a heads up state on the board of the solver
+
+        Args:
+            spot (FlatNolimitholdemState): The heads up state
+            node_type (int): PLAYER_NODE, or LEAF_NODE for a state at the start of the street
+                after the leaf
+
+        Returns:
+            (int): The node, None if no node has the same bets and stacks
+        '''
+        if tuple(spot.get_public_cards()[:len(self.solver.board)]) != self.solver.board:
+            return None
+        tree = self.tree
+        if node_type not in self._nodes:
+            nodes = self._nodes[node_type] = {}
+            for node in np.flatnonzero(tree.node_type == node_type).tolist():
+                signature = (int(tree.street[node]), int(tree.player[node]), tree.in_chips[node].tobytes(),
+                             tree.stacks[node].tobytes(), tree.status[node].tobytes())
+                nodes.setdefault(signature, node)
+        # The stacks tell apart the trees of the same bets at other depths
+        signature = (spot.street, spot.game_pointer if node_type == PLAYER_NODE else -1,
+                     spot.in_chips.astype(tree.in_chips.dtype).tobytes(),
+                     spot.stacks.astype(tree.stacks.dtype).tobytes(),
+                     spot.status.astype(tree.status.dtype).tobytes())
+        return self._nodes[node_type].get(signature)
+
+    def answer(self, node, board):
+        ''' Get the strategy, the action values, the reach and the opponent reach of the player to act
+            at a node, computed once
+        '''
+        key = (node, tuple(board))
+        if key not in self.answers:
+            player = int(self.tree.player[node])
+            reaches = self.solver.get_reaches(node, board)
+            self.answers[key] = (self.solver.get_average_strategy(node, board),
+                                 self.solver.get_action_values(node, board), reaches[player],
+                                 compatible_reach(reaches[1 - player]))
+        return self.answers[key]
+
+
+def load_solved_spot(directory, rule='cfr', mmap=True, leaf_values=None):
+    ''' Read a spot written by SolvedSpot.save
+
+    Args:
+        directory (str): The directory
+        rule (str or CFR): The update rule of the solver, see cfr_rules
+        mmap (bool): Whether to map the tree instead of reading it in memory
+        leaf_values (function): The value model of the leaf nodes, see VectorCFRSolver
+
+    Returns:
+        (SolvedSpot): The spot
+    '''
+    meta_path = os.path.join(directory, 'spot.json')
+    if not os.path.exists(meta_path):
+        raise FileNotFoundError('No solved spot in {}'.format(directory))
+    with open(meta_path) as f:
+        meta = json.load(f)
+    tree = load_game_tree(os.path.join(directory, 'tree.bin'), mmap)
+    solver = load_vector_cfr_solver(os.path.join(directory, 'solver.npz'), tree, rule, leaf_values=leaf_values)
+    return SolvedSpot(FlatNolimitholdemState.from_array(meta['spot']), tree, solver, meta['solve_time'],
+                      meta['exploitability'], meta['signature'])
+
+
+class SolverService:
+    ''' Solve spots on demand and answer strategy queries from the solved ones
+    '''
+
+    def __init__(self, sizing=None, num_iterations=200, rule='dcfr', max_nodes=1000000, max_bytes=2 ** 30,
+                 stack_bucket=None, cache=None, depth_limited=False, time_budget=None, leaf_values=None):
+        ''' Set up a service
+
+        Args:
+            sizing (SizingTree): The bet sizes of the trees, the default SizingTree if None
+            num_iterations (int): The iterations of a solve when the query does not say
+            rule (str or CFR): The update rule of the solvers, see cfr_rules
+            max_nodes (int): The largest tree solved
+            max_bytes (int): The most memory the regrets and strategy sums of a solver may take, see
+                VectorCFRSolver.estimate_nbytes, no limit if None
+            stack_bucket (float): The big blinds the effective stacks are rounded to, see canonical_spot,
+                exact stacks if None
+            cache (SpotCache): The solved spots, with load_solved_spot to read them from disk, 64 spots
+                in memory if None
+            depth_limited (bool): Whether to solve only to the end of the street of the state, see
+                build_game_tree
+            time_budget (float): The seconds of a query when the query does not say, no limit if None
+            leaf_values (function): The value model of the leaf nodes, the players check down if None,
+                see VectorCFRSolver. The cache must be set up with the same one
+        '''
+        self.sizing = SizingTree() if sizing is None else sizing
+        self.num_iterations = num_iterations
+        self.rule = rule
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.stack_bucket = stack_bucket
+        self.cache = SpotCache() if cache is None else cache
+        self.depth_limited = depth_limited
+        self.time_budget = time_budget
+        self.leaf_values = leaf_values
+        self.counters = {'queries': 0, 'solves': 0, 'node_hits': 0, 'propagated': 0, 'cut_short': 0}
+
+    def solve(self, spot, ranges, raises=0, num_iterations=None, signature=None, time_budget=None):
+        ''' Solve a heads up spot, and keep it in the cache if it has a signature
+
+        Args:
+            spot (FlatNolimitholdemState): The heads up state, see heads_up_spot and canonical_spot
+            ranges (list): The Range of each player of spot
+            raises (int): The bets and raises already made on the street
+            num_iterations (int): The CFR iterations, num_iterations of the service if None
+            signature (str): The signature of the spot, see spot_signature
+            time_budget (float): The seconds of the solve, building the tree included, no limit if None
+
+        Returns:
+            (SolvedSpot): The solved spot
+        '''
+        start = time.time()
+        tree = build_game_tree(spot, self.sizing, raises, max_nodes=self.max_nodes, depth_limited=self.depth_limited)
+        solver = VectorCFRSolver(tree, spot.get_public_cards(), ranges, rule=self.rule, leaf_values=self.leaf_values)
+        # The solver allocates its arrays as it walks the tree, a spot too large must not start
+        nbytes = solver.estimate_nbytes()
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            raise ValueError('Solving the spot takes about {} MB, more than the {} MB allowed, solve it depth-limited '
+                             'or with narrower ranges'.format(nbytes >> 20, self.max_bytes >> 20))
+        solved = SolvedSpot(spot, tree, solver, 0.0, signature=signature)
+        self.train(solved, num_iterations, None if time_budget is None else time_budget - (time.time() - start))
+        solved.solve_time = time.time() - start
+        self.counters['solves'] += 1
+        if signature is not None:
+            self.cache.put(signature, solved)
+        return solved
+
+    def train(self, solved, num_iterations=None, time_budget=None):
+        ''' Train a solved spot up to a number of iterations in all, within a time budget
+
+        Args:
+            solved (SolvedSpot): The spot
+            num_iterations (int): The iterations of the spot in all, num_iterations of the service if None
+            time_budget (float): The seconds of the training, no limit if None
+
+        Returns:
+            (bool): Whether the spot was trained, its answers and exploitability are then reset
+        '''
+        solver = solved.solver
+        num_iterations = num_iterations or self.num_iterations
+        if solver.iteration >= num_iterations:
+            return False
+        start, iteration = time.time(), solver.iteration
+        solver.solve(num_iterations - solver.iteration, None if time_budget is None else max(time_budget, 0.0))
+        if solver.iteration < num_iterations:
+            self.counters['cut_short'] += 1
+        if solver.iteration == iteration:
+            return False
+        solved.solve_time += time.time() - start
+        solved.answers = {}
+        solved.exploitability = None
+        if time_budget is None and solver.iteration >= num_iterations:
+            solved.exploitability = solver.exploitability(solved.spot.big_blind)
+        return True
+
+    def canonical_spot(self, spot, board_length=None):
+        ''' Get the canonical form of a heads up state, with the stacks rounded to the stack bucket
+            of the service, see canonical_spot
+        '''
+        stack_bucket = None if self.stack_bucket is None else int(round(self.stack_bucket * spot.big_blind))
+        return canonical_spot(spot, board_length, stack_bucket)
+
+    def propagate_ranges(self, spot):
+        ''' Get the ranges at the start of a street from a leaf of a depth-limited spot in memory
+
+        Args:
+            spot (FlatNolimitholdemState): The heads up state, see heads_up_spot
+
+        Returns:
+            (list): The Range of each player, the ranges at the root of the solved spot times the
+                frequencies of the actions leading to the leaf, None if no solved spot has a leaf
+                at the state or the state is not at the start of its street
+        '''
+        public_cards = spot.get_public_cards()
+        if spot.raised.any() or spot.not_raise_num:
+            return None
+        for signature, solved in self.cache.items():
+            board_length = len(solved.solver.board)
+            if board_length >= len(public_cards):
+                continue
+            canonical, permutation = self.canonical_spot(spot, board_length)
+            leaf = solved.find(canonical, LEAF_NODE)
+            if leaf is None:
+                continue
+            reaches = solved.solver.get_reaches(leaf)
+            inverse = tuple(np.argsort(permutation).tolist())
+            ranges = [Range(permute_range(reach, inverse)).remove_cards(public_cards) for reach in reaches]
+            if all(player_range.weights.any() for player_range in ranges):
+                self.cache.get(signature)
+                self.counters['propagated'] += 1
+                return ranges
+        return None
+
+    def find_node(self, spot):
+        ''' Find a node below the root of a solved spot in memory at a heads up state
+
+        Args:
+            spot (FlatNolimitholdemState): The heads up state, see heads_up_spot
+
+        Returns:
+            (tuple): The SolvedSpot, the node, and the canonical state and suit permutation
+                of the SolvedSpot's board, None if no spot has the state
+        '''
+        canonical_spots = {}
+        for signature, solved in self.cache.items():
+            board_length = len(solved.solver.board)
+            if board_length > len(spot.get_public_cards()):
+                continue
+            if board_length not in canonical_spots:
+                canonical_spots[board_length] = self.canonical_spot(spot, board_length)
+            canonical, permutation = canonical_spots[board_length]
+            node = solved.find(canonical)
+            # The roots match by signature, with the ranges
+            if node:
+                self.cache.get(signature)
+                self.counters['node_hits'] += 1
+                return solved, node, canonical, permutation
+        return None
+
+    def _solved_node(self, spot, seats, num_players, ranges, raises, num_iterations, time_budget, start):
+        ''' Find the solved spot and node of a heads up state, solving the state first if no spot has it
+
+        Returns:
+            (tuple): The SolvedSpot, the node, the canonical state and suit permutation of the
+                SolvedSpot's board, whether the spot was already solved and whether its ranges
+                were propagated
+        '''
+        time_budget = self.time_budget if time_budget is None else time_budget
+        deadline = None if time_budget is None else start + time_budget
+        found = self.find_node(spot)
+        cached = found is not None
+        propagated = False
+        if cached:
+            solved, node, canonical, permutation = found
+        else:
+            if ranges is None:
+                ranges = self.propagate_ranges(spot)
+                propagated = ranges is not None
+            ranges = [_parse_range(player_range) for player_range in (ranges or [None, None])]
+            canonical, permutation = self.canonical_spot(spot)
+            ranges = [Range(permute_range(player_range.weights, permutation)) for player_range in ranges]
+            signature = spot_signature(canonical, seat_positions(seats, num_players), ranges, raises,
+                                       self.depth_limited)
+            solved, node = self.cache.get(signature), 0
+            cached = solved is not None
+            if not cached:
+                solved = self.solve(canonical, ranges, raises, num_iterations, signature,
+                                    None if deadline is None else deadline - time.time())
+        if cached and self.train(solved, num_iterations, None if deadline is None else deadline - time.time()):
+            if solved.signature is not None:
+                self.cache.put(solved.signature, solved)
+        return solved, node, canonical, permutation, cached, propagated
+
+    def query(self, state, ranges=None, raises=0, num_iterations=None, time_budget=None):
+        ''' Get the strategy of the player to act in a no limit holdem hand
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): A flop, turn or river state with two players left
+            ranges (list): The range of each player left in seat order, as a Range, a string of hand
+                classes or 1326 weights. Only used at the root of a spot. If None, propagated from a
+                depth-limited spot solved on the previous streets, see propagate_ranges, or else
+                every combo
+            raises (int): The bets and raises already made on the street
+            num_iterations (int): The iterations of the spot, num_iterations of the service if None
+            time_budget (float): The seconds of the query, time_budget of the service if None. The
+                strategy reached is returned when it runs out, and the spot trained further by the
+                next queries
+
+        Returns:
+            (dict): The seat to act, the labels of the abstract actions, their frequencies, the
+                expected value of each of them and of the strategy in chips, the signature of the
+                spot and the line of the node from its root, whether the spot was already solved,
+                whether its ranges were propagated, its solve time, iterations and exploitability in
+                mbb/g (None if cut short), and the time of the query in milliseconds. The hand is
+                that of the player to act if the state knows it, the frequencies and values are
+                averaged over the range of the player otherwise
+        '''
+        start = time.time()
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        spot, seats = heads_up_spot(state)
+        if ranges is not None and len(ranges) != 2:
+            raise ValueError('Expected the ranges of the two players left, got {}'.format(len(ranges)))
+        self.counters['queries'] += 1
+        solved, node, canonical, permutation, cached, propagated = self._solved_node(
+            spot, seats, state.num_players, ranges, raises, num_iterations, time_budget, start)
+
+        strategy, action_values, reach, opponent_reach = solved.answer(node, canonical.get_public_cards())
+        player = int(solved.tree.player[node])
+        hand = state.hands[seats[player]]
+        if (hand >= 0).all():
+            weights = np.zeros_like(reach)
+            weights[combo_index(permute_suits(hand, permutation).tolist())] = 1.0
+        else:
+            hand = None
+            weights = reach
+        # Each combo weighs as much as the deals of it against the opponent range
+        deals = np.where(np.isnan(action_values[0]), 0.0, weights * opponent_reach)
+        total = deals.sum()
+        if total == 0:
+            raise ValueError('No deal of the ranges reaches the state with this hand')
+        action_values = np.nan_to_num(action_values)
+        frequencies = strategy @ deals / total
+        # From the state on: the payoff of the hand plus the chips already in the pot
+        in_chips = int(solved.tree.in_chips[node][player])
+        action_evs = action_values @ deals / total + in_chips
+        ev = (strategy * action_values).sum(axis=0) @ deals / total + in_chips
+        return {
+            'seat': int(seats[player]),
+            'hand': None if hand is None else hand.tolist(),
+            'actions': [solved.tree.action_label(child) for child in solved.tree.children(node)],
+            'frequencies': frequencies.tolist(),
+            'action_evs': action_evs.tolist(),
+            'ev': float(ev),
+            'signature': solved.signature,
+            'line': solved.tree.action_sequence(node),
+            'cached': cached,
+            'propagated': propagated,
+            'solve_time': solved.solve_time,
+            'iterations': solved.solver.iteration,
+            'exploitability': solved.exploitability,
+            'elapsed_ms': (time.time() - start) * 1000,
+        }
+
+    def frequencies(self, state, action, size=None, raises=0, ranges=None, num_iterations=None, time_budget=None):
+        ''' Get the probability of each combo of the player to act to take an action, see RangeTracker
+
+        A bet or raise of any size is mapped onto the abstract bets with
+        SizingTree.translate, and its probability is the mix of theirs.
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): The state before the action
+            action (Action): The action taken
+            size (int): The chips added by a bet or raise
+            raises (int): The bets and raises already made on the street
+            ranges (list): The range of every seat of the state, folded ones included, as for query
+            num_iterations (int): The iterations of the spot, num_iterations of the service if None
+            time_budget (float): The seconds of a new solve, time_budget of the service if None
+
+        Returns:
+            (numpy.array): The probability of the action for each of the 1326 combos, None if the
+                state is not a flop, turn or river state with two players left
+        '''
+        start = time.time()
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        try:
+            spot, seats = heads_up_spot(state)
+        except ValueError:
+            return None
+        if ranges is not None:
+            ranges = [ranges[seat] for seat in seats]
+        self.counters['queries'] += 1
+        solved, node, canonical, permutation, _, _ = self._solved_node(
+            spot, seats, state.num_players, ranges, raises, num_iterations, time_budget, start)
+        strategy = solved.answer(node, canonical.get_public_cards())[0]
+        tree = solved.tree
+        children = tree.children(node)
+        if action in (Action.BET, Action.RAISE):
+            translated = self.sizing.translate(canonical, raises, size)
+        else:
+            translated = [(AbstractAction(action, None), 1.0)]
+        frequencies = np.zeros(strategy.shape[1])
+        for abstract, probability in translated:
+            matches = [i for i, child in enumerate(children) if tree.action[child] == abstract.action.value
+                       and (abstract.size is None or tree.action_size[child] == abstract.size)]
+            if not matches:
+                raise ValueError('{} is not an action at {}'.format(abstract.action.name, tree.action_sequence(node)))
+            frequencies += probability * strategy[matches[0]]
+        return permute_range(frequencies, tuple(np.argsort(permutation).tolist()))
+
+    def stats(self):
+        ''' Get the counts of the service
+
+        Returns:
+            (dict): The number of queries, of solves, of queries answered below the root of a spot,
+                of ranges propagated from a leaf and of trainings cut short by a time budget, the
+                number of nodes of the spots in memory, and the counters of the cache, see
+                SpotCache.stats
+        '''
+        nodes = sum(solved.tree.num_nodes for _, solved in self.cache.items())
+        return dict(self.counters, nodes=nodes, **self.cache.stats())
+
+    def handle(self, request):
+        ''' Answer a decoded request of the protocol
+
+        Args:
+            request (dict): The method, 'query', 'frequencies' or 'stats', and its parameters. The
+                state is the list of FlatNolimitholdemState.to_array, the action the name of an Action
+
+        Returns:
+            (dict): The result, a list for 'frequencies'
+        '''
+        method = request.get('method')
+        if method == 'query':
+            return self.query(FlatNolimitholdemState.from_array(request['state']), request.get('ranges'),
+                              request.get('raises', 0), request.get('num_iterations'), request.get('time_budget'))
+        if method == 'frequencies':
+            frequencies = self.frequencies(FlatNolimitholdemState.from_array(request['state']),
+                                           Action[request['action']], request.get('size'), request.get('raises', 0),
+                                           request.get('ranges'), request.get('num_iterations'),
+                                           request.get('time_budget'))
+            return None if frequencies is None else frequencies.tolist()
+        if method == 'stats':
+            return self.stats()
+        raise ValueError('Unknown method {}'.format(method))
+
+
+async def start_server(service, path=DEFAULT_SOCKET):
+    ''' Serve a SolverService on a Unix socket
+
+    Args:
+        service (SolverService): The service
+        path (str): The socket file, replaced if it exists
+
+    Returns:
+        (asyncio.AbstractServer): The server, serving until closed
+    '''
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise ValueError('{} exists and is not a socket'.format(path))
+        os.unlink(path)
+    # The solvers are not thread safe, one worker handles all the requests
+    executor = ThreadPoolExecutor(max_workers=1)
+    loop = asyncio.get_running_loop()
+
+    def respond(line):
+        try:
+            return {'result': service.handle(json.loads(line))}
+        except Exception as error:
+            return {'error': '{}: {}'.format(type(error).__name__, error)}
+
+    async def serve_client(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await loop.run_in_executor(executor, respond, line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # A range of 1326 weights does not fit in the default line limit
+    return await asyncio.start_unix_server(serve_client, path=path, limit=1 << 22)
+
+
+async def serve(service, path=DEFAULT_SOCKET):
+    ''' Serve a SolverService on a Unix socket forever
+    '''
+    server = await start_server(service, path)
+    async with server:
+        await server.serve_forever()
+
+
+class SolverClient:
+    ''' Blocking client of a solver service
+    '''
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=None):
+        ''' Connect to a service
+
+        Args:
+            path (str): The socket file of the service
+            timeout (float): The seconds to wait for an answer, forever if None
+        '''
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        try:
+            self.socket.connect(path)
+        except OSError:
+            self.socket.close()
+            raise
+        self._file = self.socket.makefile('rb')
+
+    def request(self, method, **params):
+        ''' Send a request and wait for its result
+
+        Args:
+            method (str): The method, see SolverService.handle
+            params: The parameters of the method, JSON serializable
+
+        Returns:
+            (dict): The result, a RuntimeError is raised with the message of a failed request
+        '''
+        self.socket.sendall(json.dumps(dict(params, method=method)).encode() + b'\n')
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('The solver service closed the connection')
+        response = json.loads(line)
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def query(self, state, ranges=None, raises=0, num_iterations=None, time_budget=None):
+        ''' Get the strategy of the player to act, see SolverService.query
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): The state
+            ranges (list): The range of each player left, as a Range, a string of hand classes or weights
+            raises (int): The bets and raises already made on the street
+            num_iterations (int): The iterations of the spot, the default of the service if None
+            time_budget (float): The seconds of the query, the default of the service if None
+
+        Returns:
+            (dict): The answer
+        '''
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        if ranges is not None:
+            ranges = [player_range.weights.tolist() if isinstance(player_range, Range) else player_range
+                      for player_range in ranges]
+        return self.request('query', state=state.to_array().tolist(), ranges=ranges, raises=raises,
+                            num_iterations=num_iterations, time_budget=time_budget)
+
+    def frequencies(self, state, action, size=None, raises=0, ranges=None, num_iterations=None, time_budget=None):
+        ''' Get the probability of each combo of the player to act to take an action, see
+            SolverService.frequencies
+
+        Returns:
+            (numpy.array): The probability for each of the 1326 combos, None if the service has no
+                strategy for the state
+        '''
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        if ranges is not None:
+            ranges = [player_range.weights.tolist() if isinstance(player_range, Range) else player_range
+                      for player_range in ranges]
+        frequencies = self.request('frequencies', state=state.to_array().tolist(), action=action.name, size=size,
+                                   raises=raises, ranges=ranges, num_iterations=num_iterations,
+                                   time_budget=time_budget)
+        return None if frequencies is None else np.array(frequencies)
+
+    def stats(self):
+        ''' Get the counts of the service, see SolverService.stats
+        '''
+        return self.request('stats')
+
+    def close(self):
+        self._file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,255 @@
+''' Canonical signatures of heads up spots and an LRU cache of solved spots
+
+Spots that only differ by the suits of the cards have the same strategies,
+with the suits renamed. isomorphism.canonicalize finds the suit permutation
+that maps a board to the smallest board of its class (the flop as a set, then
+the turn and the river), and the ranges and hands of a spot go through the
+same permutation. The stacks of a heads up spot are equalized to the smaller
+total, which changes nothing, and can also be rounded to buckets of a few big
+blinds, which approximates the spot with nearby stacks.
+
+The signature of a canonical spot names the positions of the players, the
+effective stack, the pot, the bets of the street, the board and the ranges.
+SpotCache keeps solved spots by signature: in memory up to a number of spots
+and of bytes, and in a directory up to a number of spots, each tier dropping
+the least recently used spots first. A spot put in the cache is written to
+the directory at once, so that the next process finds it, and a spot read
+from the directory comes back to memory.
+'''
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import cards_to_mask, hand_as_string
+from rlcard_fork.games.limitholdem.isomorphism import canonicalize, permute_cards
+from rlcard_fork.games.limitholdem.range import COMBO_INDEX, COMBOS
+from rlcard_fork.games.nolimitholdem.player import Position
+
+SIGNATURE_FILE = 'signature.txt'
+
+
+def permute_suits(cards, permutation):
+    ''' Rename the suits of an array of cards, see isomorphism.permute_cards
+
+    Args:
+        cards (numpy.array): Card codes of any shape, -1 for unknown cards which are kept
+        permutation (tuple): The new suit of each suit
+
+    Returns:
+        (numpy.array): The card codes, same shape
+    '''
+    permuted = np.array(cards, dtype=np.int64)
+    known = permuted >= 0
+    permuted[known] = permute_cards(permuted[known].tolist(), permutation)
+    return permuted
+
+
+def permute_range(weights, permutation):
+    ''' Rename the suits of the combos of a range
+
+    Args:
+        weights (numpy.array): A weight for each of the 1326 combos
+        permutation (tuple): The new suit of each suit
+
+    Returns:
+        (numpy.array): The weights of the renamed combos
+    '''
+    permuted = np.empty_like(weights)
+    cards = permute_suits(COMBOS, permutation)
+    permuted[COMBO_INDEX[cards[:, 0], cards[:, 1]]] = weights
+    return permuted
+
+
+def canonical_spot(spot, board_length=None, stack_bucket=None):
+    ''' Get the canonical form of a heads up spot
+
+    Args:
+        spot (FlatNolimitholdemState): A heads up flop, turn or river state, see heads_up_spot
+        board_length (int): The number of board cards choosing the suit permutation, all if None,
+            e.g. to follow a spot solved from the flop on the turn
+        stack_bucket (int): The chips to round the effective stack to, not rounded if None or
+            when a player is all-in
+
+    Returns:
+        (tuple) that contains:
+            spot (FlatNolimitholdemState): The spot with the renamed board and the equalized stacks
+            permutation (tuple): The new suit of each suit
+    '''
+    public_cards = spot.get_public_cards()
+    board_length = len(public_cards) if board_length is None else board_length
+    _, _, permutation = canonicalize([], public_cards[:board_length])
+    cards = permute_cards(public_cards, permutation)
+    cards = sorted(cards[:3]) + cards[3:]
+    canonical = spot.clone()
+    canonical.board[:len(cards)] = cards
+    canonical.board_mask = cards_to_mask(cards)
+
+    totals = spot.stacks + spot.in_chips
+    effective = int(totals.min())
+    if stack_bucket and spot.stacks.min() > 0:
+        effective = max(int(round(effective / stack_bucket)) * stack_bucket, int(spot.in_chips.max()) + 1)
+    canonical.stacks = effective - spot.in_chips
+    return canonical, permutation
+
+
+def spot_signature(spot, positions, ranges, raises=0, depth_limited=False):
+    ''' Get the signature of a canonical spot
+
+    Args:
+        spot (FlatNolimitholdemState): A canonical heads up spot, see canonical_spot
+        positions (list): The Position of each player of the spot
+        ranges (list): The Range of each player, with the suits of the spot
+        raises (int): The bets and raises already made on the street
+        depth_limited (bool): Whether the spot is solved only to the end of its street, marked 'dl'
+
+    Returns:
+        (str): e.g. 'BTN-BB 97bb pot 13 bets 0/0 x0 act 0 r0 2S3H7D e3b0c44298fc'
+    '''
+    digest = hashlib.sha1(b''.join(np.asarray(player_range.weights, dtype=np.float64).tobytes()
+                                   for player_range in ranges)).hexdigest()[:12]
+    effective = int((spot.stacks + spot.in_chips).min())
+    return '{} {:g}bb pot {} bets {} x{} act {} r{} {} {}{}'.format(
+        '-'.join(position.name for position in positions), effective / spot.big_blind, spot.get_pot(),
+        '/'.join(str(int(chips)) for chips in spot.raised), spot.not_raise_num, spot.game_pointer, raises,
+        hand_as_string(spot.get_public_cards()), digest, ' dl' if depth_limited else '')
+
+
+def seat_positions(seats, num_players):
+    ''' Get the Position of seats of a hand
+    '''
+    return [Position.positions(num_players)[seat] for seat in seats]
+
+
+class SpotCache:
+    ''' Solved spots by signature, least recently used first, in memory and in a directory
+
+    The values have an nbytes() method and a save(directory) method writing
+    what load(directory) reads back.
+    '''
+
+    def __init__(self, capacity=64, max_bytes=None, directory=None, disk_capacity=1024, load=None):
+        ''' Set up a cache, finding the spots already in the directory
+
+        Args:
+            capacity (int): The spots kept in memory
+            max_bytes (int): The bytes kept in memory, unbounded if None, the last spot put is always kept
+            directory (str): The directory of the spots on disk, memory only if None
+            disk_capacity (int): The spots kept on disk
+            load (function): directory -> value, reads a value written by its save method
+        '''
+        if directory is not None and load is None:
+            raise ValueError('A cache on disk needs a load function')
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.disk_capacity = disk_capacity
+        self.load = load
+        # signature -> (value, bytes)
+        self.memory = OrderedDict()
+        self.nbytes = 0
+        # file name -> None, least recently used first
+        self.disk = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            names = [name for name in os.listdir(directory)
+                     if os.path.exists(os.path.join(directory, name, SIGNATURE_FILE))]
+            for name in sorted(names, key=lambda name: os.path.getmtime(os.path.join(directory, name))):
+                self.disk[name] = None
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+
+    @staticmethod
+    def file_name(signature):
+        return hashlib.sha1(signature.encode()).hexdigest()[:20]
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __contains__(self, signature):
+        return signature in self.memory or self.file_name(signature) in self.disk
+
+    def items(self):
+        ''' Get the signatures and values in memory, least recently used first, without using them
+        '''
+        return [(signature, value) for signature, (value, _) in self.memory.items()]
+
+    def get(self, signature):
+        ''' Get a value, from memory or else from the directory, and make it the most recently used
+
+        Args:
+            signature (str): The signature of the spot
+
+        Returns:
+            (object): The value, None if the cache does not have it
+        '''
+        if signature in self.memory:
+            self.memory.move_to_end(signature)
+            self.counters['hits'] += 1
+            return self.memory[signature][0]
+        name = self.file_name(signature)
+        if name in self.disk:
+            path = os.path.join(self.directory, name)
+            with open(os.path.join(path, SIGNATURE_FILE)) as f:
+                if f.read() == signature:
+                    value = self.load(path)
+                    os.utime(path)
+                    self.disk.move_to_end(name)
+                    self.counters['disk_hits'] += 1
+                    self._keep(signature, value)
+                    return value
+        self.counters['misses'] += 1
+        return None
+
+    def put(self, signature, value):
+        ''' Add a value, in memory and in the directory
+
+        Args:
+            signature (str): The signature of the spot
+            value (object): The solved spot
+        '''
+        self._keep(signature, value)
+        if self.directory is None:
+            return
+        name = self.file_name(signature)
+        path = os.path.join(self.directory, name)
+        # Written aside and moved in place, a process reading the directory never sees half a spot
+        writing = path + '.writing'
+        shutil.rmtree(writing, ignore_errors=True)
+        os.makedirs(writing)
+        value.save(writing)
+        with open(os.path.join(writing, SIGNATURE_FILE), 'w') as f:
+            f.write(signature)
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(writing, path)
+        self.disk[name] = None
+        self.disk.move_to_end(name)
+        while len(self.disk) > self.disk_capacity:
+            name, _ = self.disk.popitem(last=False)
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+            self.counters['disk_evictions'] += 1
+
+    def _keep(self, signature, value):
+        if signature in self.memory:
+            self.nbytes -= self.memory.pop(signature)[1]
+        nbytes = value.nbytes()
+        self.memory[signature] = (value, nbytes)
+        self.nbytes += nbytes
+        while len(self.memory) > 1 and (len(self.memory) > self.capacity
+                                        or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, (_, nbytes) = self.memory.popitem(last=False)
+            self.nbytes -= nbytes
+            self.counters['evictions'] += 1
+
+    def stats(self):
+        ''' Get the counters of the cache
+
+        Returns:
+            (dict): The hits in memory and on disk, the misses, the evictions from memory and from
+                disk, the hit rate, and the spots and bytes in memory and the spots on disk
+        '''
+        lookups = self.counters['hits'] + self.counters['disk_hits'] + self.counters['misses']
+        hits = self.counters['hits'] + self.counters['disk_hits']
+        return dict(self.counters, hit_rate=hits / lookups if lookups else 0.0, spots=len(self.memory),
+                    nbytes=self.nbytes, disk_spots=len(self.disk))
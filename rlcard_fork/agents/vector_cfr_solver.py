@@ -0,0 +1,671 @@
+''' Vector-form CFR over the public tree of a heads up no limit holdem spot
+
+CFRAgent walks the game one hand at a time. VectorCFRSolver instead walks a
+PublicTree (see game_tree) once per iteration and player, carrying for each
+player a reach probability for every one of the 1326 combos, and keeps the
+regrets and the average strategy of a node as arrays over the combos of the
+range of the player to act. A node therefore costs a few array operations
+whatever the ranges are.
+
+The cards dealt by the chance nodes add one more dimension: all the boards
+that can follow the root board on a street are enumerated once, in a fixed
+order, and the subtree below a chance node is walked once for all of them
+with arrays of shape (boards, 1326). The regrets of a node of that street
+have shape (boards, actions, combos in range), in float32 since a flop spot
+has 2352 river boards.
+
+The values of the terminal nodes are linear in the reach of the opponent.
+At a showdown the combos are sorted by strength once per board, and the
+reach of the weaker and of the stronger opponent combos that share no card
+with each combo come from prefix sums over that order, in O(1326) instead of
+O(1326^2). The runouts of an all-in before the river are enumerated the same
+way as the chance nodes. On the root board of a flop or turn spot, where
+the showdowns are reached on every iteration, the wins minus the losses of
+each combo against each opponent combo over the runouts are instead
+averaged once into a matrix, and the values are a product with it.
+
+The leaf nodes of a depth-limited tree end the street without walking the
+streets to come. Their value is an estimate: by default the players check
+the hand down, which is a rollout of the check-down strategy over every
+runout, valued like an all-in. A value model (e.g. a network of the
+ranges and the pot) can be given instead. Together with a time budget, see
+solve, this re-solves the current street of a hand in real time.
+'''
+import os
+import time
+
+import numpy as np
+
+from rlcard_fork.agents.cfr_rules import get_cfr_rule
+from rlcard_fork.agents.regret_pruning import RegretPruning
+from rlcard_fork.games.limitholdem.card import NUM_CARDS
+from rlcard_fork.games.limitholdem.evaluator import evaluate_boards
+from rlcard_fork.games.limitholdem.range import COMBOS, NUM_COMBOS, Range
+from rlcard_fork.games.nolimitholdem.flat_state import FOLDED, NUM_REVEALED, SHOWDOWN
+from rlcard_fork.games.nolimitholdem.game_tree import CHANCE_NODE, FOLD_NODE, LEAF_NODE, PLAYER_NODE, SHOWDOWN_NODE
+
+# HOLDING[card, combo] is whether the combo holds the card
+HOLDING = (COMBOS[None, :, :] == np.arange(NUM_CARDS)[:, None, None]).any(axis=2)
+# CARD_COMBOS[card] are the 51 combos holding the card
+CARD_COMBOS = np.array([np.flatnonzero(holding) for holding in HOLDING])
+_FIRST, _SECOND = COMBOS[:, 0].astype(np.int64), COMBOS[:, 1].astype(np.int64)
+_CARD_PREFIX_SIZE = CARD_COMBOS.shape[1] + 1
+_TERMINAL_NODES = (FOLD_NODE, SHOWDOWN_NODE, LEAF_NODE)
+
+
+class _DeadlineReached(Exception):
+    ''' Raised in the middle of an iteration when its deadline has passed
+    '''
+
+
+def compatible_reach(reach):
+    ''' Sum, for every combo, the reach of the combos that share no card with it
+
+    Args:
+        reach (numpy.array): A weight for each combo, shape (..., 1326)
+
+    Returns:
+        (numpy.array): The sums, same shape
+    '''
+    card_sums = reach @ HOLDING.T
+    # The combo itself holds both cards, so it is removed twice
+    return reach.sum(axis=-1, keepdims=True) - card_sums[..., _FIRST] - card_sums[..., _SECOND] + reach
+
+
+def regret_matching(regrets):
+    ''' Get the strategy of a node from its regrets
+
+    Args:
+        regrets (numpy.array): Regrets of shape (..., actions, combos)
+
+    Returns:
+        (numpy.array): The probability of each action for each combo, uniform where no regret is positive
+    '''
+    positive = np.maximum(regrets, 0.0)
+    total = positive.sum(axis=-2, keepdims=True)
+    return np.where(total > 0, positive / np.where(total > 0, total, 1.0), 1.0 / regrets.shape[-2])
+
+
+class _Showdowns:
+    ''' Order of the combos by strength on complete boards, for the prefix sums
+    '''
+
+    def __init__(self, boards):
+        num_boards = len(boards)
+        blocked = HOLDING[boards].any(axis=1)
+        strengths = np.where(blocked, -1, evaluate_boards(boards, COMBOS))
+        self.live = ~blocked
+        self.order = np.argsort(strengths, axis=1, kind='stable')
+        sorted_strengths = np.take_along_axis(strengths, self.order, axis=1)
+        # The combos weaker than a combo are the first `below` ones, the stronger ones start at `above`
+        self.below = np.empty((num_boards, NUM_COMBOS), dtype=np.int64)
+        self.above = np.empty((num_boards, NUM_COMBOS), dtype=np.int64)
+        for row in range(num_boards):
+            self.below[row] = np.searchsorted(sorted_strengths[row], strengths[row], 'left')
+            self.above[row] = np.searchsorted(sorted_strengths[row], strengths[row], 'right')
+
+        # Same for the 51 combos holding each card, within the order of the strengths
+        positions = np.empty((num_boards, NUM_COMBOS), dtype=np.int64)
+        np.put_along_axis(positions, self.order, np.arange(NUM_COMBOS)[None, :], axis=1)
+        card_positions = positions[:, CARD_COMBOS]
+        card_sort = np.argsort(card_positions, axis=2)
+        card_positions = np.take_along_axis(card_positions, card_sort, axis=2)
+        self.card_order = CARD_COMBOS[np.arange(NUM_CARDS)[:, None], card_sort]
+        # Indexes into the flattened arrays of the combos, of the prefix sums and of the card prefix sums
+        rows = np.arange(num_boards)[:, None]
+        self.order = (self.order + rows * NUM_COMBOS).astype(np.int64)
+        self.card_order = (self.card_order + rows[:, :, None] * NUM_COMBOS).astype(np.int64)
+        self.below = (self.below + rows * (NUM_COMBOS + 1)).astype(np.int64)
+        self.above = (self.above + rows * (NUM_COMBOS + 1)).astype(np.int64)
+        self.totals = (rows + 1) * (NUM_COMBOS + 1) - 1
+        card_offsets = rows * NUM_CARDS * _CARD_PREFIX_SIZE
+        self.card_indexes = [np.empty((num_boards, NUM_COMBOS), dtype=np.int64) for _ in range(4)]
+        for start in range(0, num_boards, 64):
+            chunk = slice(start, start + 64)
+            bounds = [self.below[chunk] % (NUM_COMBOS + 1), self.above[chunk] % (NUM_COMBOS + 1)]
+            for i, (cards, bound) in enumerate((cards, bound) for cards in (_FIRST, _SECOND) for bound in bounds):
+                ranks = (card_positions[chunk][:, cards, :] < bound[:, :, None]).sum(axis=2)
+                self.card_indexes[i][chunk] = card_offsets[chunk] + cards * _CARD_PREFIX_SIZE + ranks
+        self.card_totals = [card_offsets + cards * _CARD_PREFIX_SIZE + _CARD_PREFIX_SIZE - 1 for cards in (_FIRST, _SECOND)]
+
+    def win_minus_lose(self, reach):
+        ''' Reach of the weaker minus reach of the stronger compatible opponent combos
+
+        Args:
+            reach (numpy.array): The reach of the opponent combos, shape (boards, 1326)
+
+        Returns:
+            (numpy.array): The difference for each combo, 0 for the combos blocked by the board
+        '''
+        num_boards = len(reach)
+        reach = reach.ravel()
+        prefix = np.zeros((num_boards, NUM_COMBOS + 1))
+        np.cumsum(reach[self.order], axis=1, out=prefix[:, 1:])
+        card_prefix = np.zeros((num_boards, NUM_CARDS, _CARD_PREFIX_SIZE))
+        np.cumsum(reach[self.card_order], axis=2, out=card_prefix[:, :, 1:])
+        prefix, card_prefix = prefix.ravel(), card_prefix.ravel()
+        first_below, first_above, second_below, second_above = (card_prefix[indexes] for indexes in self.card_indexes)
+        first_total, second_total = (card_prefix[indexes] for indexes in self.card_totals)
+        weaker = prefix[self.below] - first_below - second_below
+        stronger = (prefix[self.totals] - prefix[self.above]
+                    - (first_total - first_above) - (second_total - second_above))
+        return np.where(self.live, weaker - stronger, 0.0)
+
+
+class _Boards:
+    ''' All the boards of a street that can follow the root board, in a fixed order
+    '''
+
+    def __init__(self, cards, dead_cards, parents=None):
+        self.cards = cards
+        self.dead_cards = dead_cards
+        self.parents = parents
+        # Combos blocked by the card dealt last, the others are blocked on the parent boards
+        self.dealt = None if parents is None else HOLDING[cards[:, -1]]
+        # Both players hold two cards that can not be dealt either
+        self.num_deals = NUM_CARDS - cards.shape[1] - len(dead_cards) - 4
+        self._next = None
+        self._showdowns = None
+        self._equities = None
+
+    def next(self):
+        ''' Get the boards with one more card
+        '''
+        if self._next is None:
+            available = np.ones((len(self.cards), NUM_CARDS), dtype=bool)
+            available[np.arange(len(self.cards))[:, None], self.cards] = False
+            available[:, list(self.dead_cards)] = False
+            rows, cards = np.nonzero(available)
+            self._next = _Boards(np.hstack([self.cards[rows], cards[:, None].astype(self.cards.dtype)]),
+                                 self.dead_cards, rows)
+        return self._next
+
+    def showdowns(self):
+        if self._showdowns is None:
+            self._showdowns = _Showdowns(self.cards)
+        return self._showdowns
+
+    def equities(self, columns):
+        ''' Get, on a single board before the river, how much more often each combo wins than it loses
+            against some opponent combos over the runouts, computed once
+
+        Args:
+            columns (numpy.array): The opponent combos, the same on every call
+
+        Returns:
+            (numpy.array): The wins minus the losses over the runouts of each combo against each opponent
+                combo, shape (1326, columns), 0 for the pairs sharing a card with each other or the board
+        '''
+        if self._equities is None:
+            runouts, num_runouts = self, 1
+            while runouts.cards.shape[1] < 5:
+                num_runouts *= runouts.num_deals
+                runouts = runouts.next()
+            rows = np.flatnonzero(~HOLDING[self.cards[0]].any(axis=0))
+            strengths = evaluate_boards(runouts.cards, COMBOS)
+            live = ~HOLDING[runouts.cards].any(axis=1)
+            counts = np.zeros((len(rows), len(columns)), dtype=np.int64)
+            chunk = max(1, 2 ** 22 // max(len(rows) * len(columns), 1))
+            for start in range(0, len(runouts.cards), chunk):
+                row_strengths = strengths[start:start + chunk, rows][:, :, None]
+                column_strengths = strengths[start:start + chunk, columns][:, None, :]
+                signs = (row_strengths > column_strengths).astype(np.int8) - (row_strengths < column_strengths)
+                signs *= live[start:start + chunk, rows][:, :, None] & live[start:start + chunk, columns][:, None, :]
+                counts += signs.sum(axis=0, dtype=np.int64)
+            self._equities = np.zeros((NUM_COMBOS, len(columns)))
+            self._equities[rows] = counts / num_runouts
+            # The pairs of combos sharing a card are never dealt
+            self._equities[HOLDING.T.astype(np.int64) @ HOLDING[:, columns] > 0] = 0.0
+        return self._equities
+
+
+class VectorCFRSolver:
+    ''' CFR over a heads up public tree with strategy vectors over the combos
+    '''
+
+    def __init__(self, tree, board, ranges, dead_cards=(), rule='cfr', pruning=None, leaf_values=None):
+        ''' Set up a spot
+
+        Args:
+            tree (PublicTree): The betting tree of the spot, for 2 players
+            board (list): The board card codes at the root of the tree
+            ranges (list): The Range of each player at the root
+            dead_cards (list): Card codes that can not be dealt nor held
+            rule (str or CFR): The update rule of the regrets and average strategy, see cfr_rules
+            pruning (RegretPruning): The regret-based pruning and its counters, only the unreached
+                subtrees are skipped if None. An action is pruned when its regret is below the
+                threshold for all the boards and combos of the node
+            leaf_values (function): The value model of the leaf nodes of a depth-limited tree,
+                (tree, node, boards, player, reaches) -> values with the arguments and result of
+                _terminal_values, the boards as card codes. The players check down if None
+        '''
+        if tree.num_players != 2 or len(ranges) != 2:
+            raise ValueError('The solver is for heads up spots')
+        board = [int(card) for card in board]
+        dead_cards = tuple(int(card) for card in dead_cards)
+        if tree.street[0] != SHOWDOWN and len(board) != NUM_REVEALED[int(tree.street[0])]:
+            raise ValueError('The tree starts on a street with {} board cards'.format(NUM_REVEALED[tree.street[0]]))
+        if len(set(board + list(dead_cards))) != len(board) + len(dead_cards):
+            raise ValueError('Duplicated cards')
+        self.tree = tree
+        self.rule = get_cfr_rule(rule)
+        self.pruning = RegretPruning() if pruning is None else pruning
+        self.leaf_values = leaf_values
+        self.board = tuple(board)
+        self.dead_cards = dead_cards
+        blocked = HOLDING[board + list(dead_cards)].any(axis=0)
+        self.ranges = [np.where(blocked, 0.0, player_range.weights)[None, :] for player_range in ranges]
+        # Only the combos of a player's range are stored at its nodes
+        self.live_combos = [np.flatnonzero(player_range[0] > 0) for player_range in self.ranges]
+        self._opponent_combos = np.union1d(*self.live_combos)
+        self.iteration = 0
+        # node -> [regrets, strategy sums], both of shape (boards, actions, live combos of the player to act)
+        self.infosets = {}
+        self._root_boards = _Boards(np.array([board], dtype=np.int64), dead_cards)
+        self._deadline = None
+
+    def train(self, deadline=None):
+        ''' Do one iteration of CFR, updating each player in turn
+
+        Args:
+            deadline (float): The time.time() at which to stop the iteration where it is, the nodes
+                not walked yet keeping their regrets and strategy sums. No deadline if None
+
+        Returns:
+            (bool): Whether the iteration was complete, only then is it counted in iteration
+        '''
+        self.iteration += 1
+        self._deadline = deadline
+        try:
+            for player in range(2):
+                self.traverse(0, self._root_boards, player, list(self.ranges))
+        except _DeadlineReached:
+            # The next iteration updates the nodes with the same weight
+            self.iteration -= 1
+            return False
+        finally:
+            self._deadline = None
+        return True
+
+    def solve(self, num_iterations, time_budget=None):
+        ''' Train until a number of iterations or a time budget is reached, whichever comes first
+
+        The average strategy is usable whenever the training stops. Reading
+        the answer afterwards walks the tree about once, as much as half an
+        iteration, so the training keeps that much of the budget: it does not
+        start an iteration that would not end in time, and cuts short the
+        first one or one running late.
+
+        Args:
+            num_iterations (int): The iterations to do
+            time_budget (float): The seconds to spend, no limit if None
+
+        Returns:
+            (int): The complete iterations done
+        '''
+        deadline = None if time_budget is None else time.time() + time_budget
+        completed = 0
+        # The duration of an iteration, unknown before the first one
+        duration = 0.0
+        while completed < num_iterations:
+            start = time.time()
+            if deadline is not None and start + 1.5 * duration >= deadline:
+                break
+            if not self.train(None if deadline is None else deadline - duration / 2):
+                break
+            completed += 1
+            duration = time.time() - start
+        return completed
+
+    def get_boards(self, node):
+        ''' Get the boards of a node, in the order of the first axis of its arrays
+
+        Returns:
+            (numpy.array): Card codes of shape (boards, board cards)
+        '''
+        boards = self._root_boards
+        for _ in range(len(self.board), min(NUM_REVEALED[int(self.tree.street[node])], 5)):
+            boards = boards.next()
+        return boards.cards
+
+    def _infoset(self, node, num_boards):
+        if node not in self.infosets:
+            live_combos = self.live_combos[int(self.tree.player[node])]
+            shape = (num_boards, int(self.tree.num_children[node]), len(live_combos))
+            self.infosets[node] = [np.zeros(shape, dtype=np.float32), np.zeros(shape, dtype=np.float32)]
+        return self.infosets[node]
+
+    def _strategy(self, node, num_boards, average=False):
+        ''' Strategy of a node over all the combos, 0 for the combos out of the range
+        '''
+        regrets, strategy_sums = self._infoset(node, num_boards)
+        live_combos = self.live_combos[int(self.tree.player[node])]
+        strategy = np.zeros(regrets.shape[:2] + (NUM_COMBOS,))
+        strategy[:, :, live_combos] = regret_matching(strategy_sums if average else regrets)
+        return strategy
+
+    def nbytes(self):
+        ''' Get the memory used by the regrets and strategy sums, and by the runout equities of the root board
+        '''
+        equities = self._root_boards._equities
+        return (sum(regrets.nbytes + strategy_sums.nbytes for regrets, strategy_sums in self.infosets.values())
+                + (0 if equities is None else equities.nbytes))
+
+    def estimate_nbytes(self):
+        ''' Get the memory the regrets and strategy sums will take once every node is walked, without
+            allocating them
+
+        Returns:
+            (int): The bytes, the boards of the street times the children times the live combos of
+                the player to act, twice in float32, summed over the player nodes, and the runout
+                equities of the root board if it has showdowns before the river
+        '''
+        tree = self.tree
+        nodes = np.flatnonzero(tree.node_type == PLAYER_NODE)
+        available = NUM_CARDS - len(self.board) - len(self.dead_cards)
+        num_boards = {}
+        for street in np.unique(tree.street[nodes]).tolist():
+            num_boards[street] = 1
+            for dealt in range(min(NUM_REVEALED[street], 5) - len(self.board)):
+                num_boards[street] *= available - dealt
+        live = np.array([len(live_combos) for live_combos in self.live_combos], dtype=np.int64)
+        boards = np.array([num_boards[street] for street in tree.street[nodes].tolist()], dtype=np.int64)
+        cells = boards * tree.num_children[nodes].astype(np.int64) * live[tree.player[nodes].astype(np.int64)]
+        nbytes = int(cells.sum()) * 2 * np.dtype(np.float32).itemsize
+        checked_down = (tree.node_type == SHOWDOWN_NODE) | ((tree.node_type == LEAF_NODE) & (self.leaf_values is None))
+        parents = tree.parent[checked_down]
+        if len(self.board) < 5 and ((parents < 0) | (tree.street[np.maximum(parents, 0)] == tree.street[0])).any():
+            nbytes += NUM_COMBOS * len(self._opponent_combos) * np.dtype(np.float64).itemsize
+        return nbytes
+
+    def save(self, path):
+        ''' Write the spot, the iteration and the regrets and strategy sums of the nodes to a .npz file,
+            the tree is saved on its own, see load_vector_cfr_solver
+
+        Args:
+            path (str): The file to write
+        '''
+        nodes = np.array(sorted(self.infosets), dtype=np.int64)
+        shapes = np.array([self.infosets[node][0].shape for node in nodes], dtype=np.int64).reshape(-1, 3)
+        tables = [np.concatenate([self.infosets[node][i].ravel() for node in nodes]) if len(nodes)
+                  else np.zeros(0, dtype=np.float32) for i in range(2)]
+        with open(path, 'wb') as f:
+            np.savez(f, board=np.array(self.board, dtype=np.int64),
+                     dead_cards=np.array(self.dead_cards, dtype=np.int64),
+                     ranges=np.concatenate(self.ranges), iteration=self.iteration, nodes=nodes, shapes=shapes,
+                     regrets=tables[0], strategy_sums=tables[1])
+
+    def _deal(self, boards, reaches, values_function):
+        ''' Average the values of the next boards, values_function maps the next boards and reaches to values
+        '''
+        next_boards = boards.next()
+        dealt = next_boards.dealt
+        next_reaches = [np.where(dealt, 0.0, reach[next_boards.parents]) for reach in reaches]
+        values = np.where(dealt, 0.0, values_function(next_boards, next_reaches))
+        return values.reshape(len(boards.cards), -1, NUM_COMBOS).sum(axis=1) / boards.num_deals
+
+    def _terminal_values(self, node, boards, player, reaches):
+        ''' Get the counterfactual values of a player at a terminal node
+
+        Args:
+            node (int): A fold, showdown or leaf node of the tree
+            boards (_Boards): The boards at the node
+            player (int): The player whose values are computed
+            reaches (list): The reach of each combo of each player, shape (boards, 1326)
+
+        Returns:
+            (numpy.array): The value of each combo of the player in chips, shape (boards, 1326)
+        '''
+        in_chips = self.tree.in_chips[node]
+        opponent = 1 - player
+        node_type = self.tree.node_type[node]
+        if node_type == FOLD_NODE:
+            payoff = in_chips[opponent] if self.tree.status[node][opponent] == FOLDED else -in_chips[player]
+            return payoff * compatible_reach(reaches[opponent])
+        if node_type == LEAF_NODE and self.leaf_values is not None:
+            return self.leaf_values(self.tree, node, boards.cards, player, reaches)
+        # A leaf is checked down: the bets are even at the end of a street
+        # An all-in for less only wins what it covers
+        payoff = min(in_chips[0], in_chips[1])
+        return payoff * self._showdown_values(boards, reaches, opponent)
+
+    def _showdown_values(self, boards, reaches, opponent):
+        if boards.cards.shape[1] == 5:
+            return boards.showdowns().win_minus_lose(reaches[opponent])
+        if len(boards.cards) == 1:
+            # The root board of a flop or turn spot, whose leaves and all-ins are reached on every
+            # iteration: the values are linear in the opponent reach, so the runouts are averaged once
+            equities = boards.equities(self._opponent_combos)
+            return reaches[opponent][:, self._opponent_combos] @ equities.T
+        return self._deal(boards, reaches, lambda next_boards, next_reaches:
+                          self._showdown_values(next_boards, next_reaches, opponent))
+
+    def traverse(self, node, boards, player, reaches):
+        ''' Compute the counterfactual values of a player and update its regrets
+
+        Args:
+            node (int): The node of the tree
+            boards (_Boards): The boards at the node
+            player (int): The player to update
+            reaches (list): The reach of each combo of each player, shape (boards, 1326)
+
+        Returns:
+            (numpy.array): The value of each combo of the player, shape (boards, 1326)
+        '''
+        node_type = self.tree.node_type[node]
+        if node_type in _TERMINAL_NODES:
+            return self._terminal_values(node, boards, player, reaches)
+        children = self.tree.children(node)
+        if node_type == CHANCE_NODE:
+            return self._deal(boards, reaches, lambda next_boards, next_reaches:
+                              self.traverse(children[0], next_boards, player, next_reaches))
+
+        if self._deadline is not None and time.time() > self._deadline:
+            raise _DeadlineReached()
+        acting = int(self.tree.player[node])
+        strategy = self._strategy(node, len(boards.cards))
+        regrets, strategy_sums = self._infoset(node, len(boards.cards)) if acting == player else (None, None)
+        counters = self.pruning.counters
+        counters['nodes'] += 1
+        pruned = np.zeros(len(children), dtype=bool)
+        if acting == player and self.pruning.prunes(self.iteration):
+            pruned = (regrets < self.pruning.threshold).all(axis=(0, 2)) & ~strategy.any(axis=(0, 2))
+        action_values = []
+        for i, child in enumerate(children):
+            child_reaches = list(reaches)
+            child_reaches[acting] = reaches[acting] * strategy[:, i]
+            if pruned[i]:
+                counters['pruned'] += 1
+                action_values.append(np.zeros_like(child_reaches[player]))
+            elif self.pruning.skip_unreached and not (child_reaches[0].any() or child_reaches[1].any()):
+                # Nothing below changes the regrets or the average strategy
+                counters['skipped'] += 1
+                action_values.append(np.zeros_like(child_reaches[player]))
+            else:
+                counters['walked'] += 1
+                action_values.append(self.traverse(child, boards, player, child_reaches))
+        if acting != player:
+            return sum(action_values)
+
+        action_values = np.stack(action_values, axis=1)
+        values = (strategy * action_values).sum(axis=1)
+        # The pruned actions are not played, and their regrets do not change
+        action_values[:, pruned] = values[:, None, :]
+        live_combos = self.live_combos[player]
+        self.rule.update_regrets(regrets, (action_values - values[:, None, :])[:, :, live_combos], self.iteration)
+        self.rule.update_strategy_sums(strategy_sums, (reaches[player][:, None, :] * strategy)[:, :, live_combos],
+                                       self.iteration)
+        return values
+
+    def get_average_strategy(self, node, board=None):
+        ''' Get the average strategy of a player node
+
+        Args:
+            node (int): A player node of the tree
+            board (list): The board at the node, dealt cards in order, the root board if None
+
+        Returns:
+            (numpy.array): The probability of each child for each combo, shape (actions, combos),
+                uniform for the combos that never reach the node
+        '''
+        if self.tree.node_type[node] != PLAYER_NODE:
+            raise ValueError('Node {} is not a player node'.format(node))
+        boards = self.get_boards(node)
+        row = self._board_row(node, boards, board)
+        _, strategy_sums = self._infoset(node, len(boards))
+        strategy = np.full((strategy_sums.shape[1], NUM_COMBOS), 1.0 / strategy_sums.shape[1])
+        strategy[:, self.live_combos[int(self.tree.player[node])]] = regret_matching(strategy_sums[row])
+        return strategy
+
+    def _board_row(self, node, boards, board):
+        board = self.board if board is None else tuple(int(card) for card in board)
+        rows = np.flatnonzero((boards == np.array(board)).all(axis=1)) if len(board) == boards.shape[1] else []
+        if len(rows) == 0:
+            raise ValueError('Board {} does not follow the root board at node {}'.format(board, node))
+        return rows[0]
+
+    def _node_reaches(self, node):
+        ''' Get the boards of a node and the reaches of the players when both play their average strategy
+        '''
+        path = []
+        while node > 0:
+            path.append(node)
+            node = int(self.tree.parent[node])
+        boards, reaches = self._root_boards, list(self.ranges)
+        for child in reversed(path):
+            parent = int(self.tree.parent[child])
+            if self.tree.node_type[parent] == CHANCE_NODE:
+                boards = boards.next()
+                reaches = [np.where(boards.dealt, 0.0, reach[boards.parents]) for reach in reaches]
+            else:
+                acting = int(self.tree.player[parent])
+                strategy = self._strategy(parent, len(boards.cards), average=True)
+                reaches[acting] = reaches[acting] * strategy[:, child - int(self.tree.first_child[parent])]
+        return boards, reaches
+
+    def get_reaches(self, node, board=None):
+        ''' Get the probability of each player to reach a node with each combo, when both play their average strategy
+
+        Args:
+            node (int): A node of the tree
+            board (list): The board at the node, dealt cards in order, the root board if None
+
+        Returns:
+            (list): For each player, the range at the root times the probability of its actions, shape (1326,)
+        '''
+        boards, reaches = self._node_reaches(node)
+        row = self._board_row(node, boards.cards, board)
+        return [reach[row] for reach in reaches]
+
+    def get_action_values(self, node, board=None):
+        ''' Get the expected value of each action of a player node for each combo of the player to act,
+            when both play their average strategy afterwards
+
+        Args:
+            node (int): A player node of the tree
+            board (list): The board at the node, dealt cards in order, the root board if None
+
+        Returns:
+            (numpy.array): The payoff of each child for each combo in chips, shape (actions, combos), nan
+                for the combos that share a card with the board or with every opponent combo reaching the node
+        '''
+        if self.tree.node_type[node] != PLAYER_NODE:
+            raise ValueError('Node {} is not a player node'.format(node))
+        boards, reaches = self._node_reaches(node)
+        row = self._board_row(node, boards.cards, board)
+        player = int(self.tree.player[node])
+        # The values of a player do not depend on its own reach
+        values = np.stack([self._average_values(child, boards, player, reaches)[row]
+                           for child in self.tree.children(node)])
+        opponent_reach = compatible_reach(reaches[1 - player][row])
+        valid = (opponent_reach > 0) & ~HOLDING[list(boards.cards[row])].any(axis=0)
+        return np.where(valid, values / np.where(valid, opponent_reach, 1.0), np.nan)
+
+    def get_expected_values(self):
+        ''' Get the value of each combo of each player at the root when both play their average strategy
+
+        Returns:
+            (list): For each player, the value of each combo in chips, counterfactual
+                (weighted by the reach of the compatible opponent combos)
+        '''
+        return [self._average_values(0, self._root_boards, player, list(self.ranges))[0] for player in range(2)]
+
+    def get_best_response_values(self):
+        ''' Get the value of each combo of each player at the root when it plays a best response
+            to the average strategy of the other
+
+        Returns:
+            (list): For each player, the value of each combo in chips, counterfactual
+                (weighted by the reach of the compatible opponent combos)
+        '''
+        return [self._average_values(0, self._root_boards, player, list(self.ranges), best_response=True)[0]
+                for player in range(2)]
+
+    def exploitability(self, big_blind=2):
+        ''' Get how much a best response wins against the average strategy
+
+        The mean over the players of the value of a best response to the other
+        average strategy, per pair of hands dealt from the ranges. It is 0 at a
+        Nash equilibrium of the spot.
+
+        Args:
+            big_blind (int): The big blind of the game, in chips
+
+        Returns:
+            (float): The exploitability in milli big blinds per game
+        '''
+        values = self.get_best_response_values()
+        deals = (self.ranges[0][0] * compatible_reach(self.ranges[1][0])).sum()
+        total = sum((self.ranges[player][0] * values[player]).sum() for player in range(2))
+        return total / deals / 2 / big_blind * 1000
+
+    def _average_values(self, node, boards, player, reaches, best_response=False):
+        node_type = self.tree.node_type[node]
+        if node_type in _TERMINAL_NODES:
+            return self._terminal_values(node, boards, player, reaches)
+        children = self.tree.children(node)
+        if node_type == CHANCE_NODE:
+            return self._deal(boards, reaches, lambda next_boards, next_reaches:
+                              self._average_values(children[0], next_boards, player, next_reaches, best_response))
+        acting = int(self.tree.player[node])
+        strategy = self._strategy(node, len(boards.cards), average=True)
+        child_values = []
+        for i, child in enumerate(children):
+            child_reaches = list(reaches)
+            child_reaches[acting] = reaches[acting] * strategy[:, i]
+            child_values.append(self._average_values(child, boards, player, child_reaches, best_response))
+        if acting != player:
+            return sum(child_values)
+        if best_response:
+            # The values of a player do not depend on its own reach, each combo on each board picks its best action
+            return np.max(child_values, axis=0)
+        return sum(strategy[:, i] * values for i, values in enumerate(child_values))
+
+
+def load_vector_cfr_solver(path, tree, rule='cfr', pruning=None, leaf_values=None):
+    ''' Read a solver written by VectorCFRSolver.save
+
+    Args:
+        path (str): The file to read
+        tree (PublicTree): The tree of the saved solver
+        rule (str or CFR): The update rule of the regrets and average strategy, see cfr_rules
+        pruning (RegretPruning): The regret-based pruning and its counters
+        leaf_values (function): The value model of the leaf nodes, see VectorCFRSolver
+
+    Returns:
+        (VectorCFRSolver): The solver, at the saved iteration
+    '''
+    if not os.path.exists(path):
+        raise FileNotFoundError('No solver at {}'.format(path))
+    with np.load(path) as data:
+        solver = VectorCFRSolver(tree, data['board'].tolist(), [Range(weights) for weights in data['ranges']],
+                                 data['dead_cards'].tolist(), rule, pruning, leaf_values)
+        solver.iteration = int(data['iteration'])
+        offset = 0
+        regrets, strategy_sums = data['regrets'], data['strategy_sums']
+        for node, shape in zip(data['nodes'].tolist(), data['shapes']):
+            size = int(np.prod(shape))
+            solver.infosets[node] = [regrets[offset:offset + size].reshape(shape).copy(),
+                                     strategy_sums[offset:offset + size].reshape(shape).copy()]
+            offset += size
+    return solver
@@ -5,45 +5,45 @@ from rlcard_fork.envs.registration import register, make
 
 register(
     env_id='blackjack',
-    entry_point='rlcard.envs.blackjack:BlackjackEnv',
+    entry_point='rlcard_fork.envs.blackjack:BlackjackEnv',
 )
 
 register(
     env_id='doudizhu',
-    entry_point='rlcard.envs.doudizhu:DoudizhuEnv',
+    entry_point='rlcard_fork.envs.doudizhu:DoudizhuEnv',
 )
 
 register(
     env_id='limit-holdem',
-    entry_point='rlcard.envs.limitholdem:LimitholdemEnv',
+    entry_point='rlcard_fork.envs.limitholdem:LimitholdemEnv',
 )
 
 register(
     env_id='no-limit-holdem',
-    entry_point='rlcard.envs.nolimitholdem:NolimitholdemEnv',
+    entry_point='rlcard_fork.envs.nolimitholdem:NolimitholdemEnv',
 )
 
 register(
     env_id='leduc-holdem',
-    entry_point='rlcard.envs.leducholdem:LeducholdemEnv'
+    entry_point='rlcard_fork.envs.leducholdem:LeducholdemEnv'
 )
 
 register(
     env_id='uno',
-    entry_point='rlcard.envs.uno:UnoEnv',
+    entry_point='rlcard_fork.envs.uno:UnoEnv',
 )
 
 register(
     env_id='mahjong',
-    entry_point='rlcard.envs.mahjong:MahjongEnv',
+    entry_point='rlcard_fork.envs.mahjong:MahjongEnv',
 )
 
 register(
     env_id='gin-rummy',
-    entry_point='rlcard.envs.gin_rummy:GinRummyEnv',
+    entry_point='rlcard_fork.envs.gin_rummy:GinRummyEnv',
 )
 
 register(
     env_id='bridge',
-    entry_point='rlcard.envs.bridge:BridgeEnv',
+    entry_point='rlcard_fork.envs.bridge:BridgeEnv',
 )
@@ -1,11 +1,9 @@
-import json
-import os
 import numpy as np
 from collections import OrderedDict
 
-import rlcard_fork
 from rlcard_fork.envs import Env
 from rlcard_fork.games.limitholdem import Game
+from rlcard_fork.games.limitholdem.card import int_to_string
 
 DEFAULT_GAME_CONFIG = {
         'game_num_players': 2,
@@ -26,9 +24,6 @@ class LimitholdemEnv(Env):
         self.state_shape = [[72] for _ in range(self.num_players)]
         self.action_shape = [None for _ in range(self.num_players)]
 
-        with open(os.path.join(rlcard_fork.__path__[0], 'games/limitholdem/card2index.json'), 'r') as file:
-            self.card2index = json.load(file)
-
     def _get_legal_actions(self):
         ''' Get all leagal actions
 
@@ -53,13 +48,13 @@ class LimitholdemEnv(Env):
         legal_actions = OrderedDict({self.actions.index(a): None for a in state['legal_actions']})
         extracted_state['legal_actions'] = legal_actions
 
-        public_cards = state['public_cards']
-        hand = state['hand']
+        public_cards = state['public_codes']
+        hand = state['hand_codes']
         raise_nums = state['raise_nums']
         cards = public_cards + hand
-        idx = [self.card2index[card] for card in cards]
         obs = np.zeros(72)
-        obs[idx] = 1
+        # Card codes follow the layout of card2index.json
+        obs[cards] = 1
         for i, num in enumerate(raise_nums):
             obs[52 + i * 5 + num] = 1
         extracted_state['obs'] = obs
@@ -103,8 +98,8 @@ class LimitholdemEnv(Env):
         '''
         state = {}
         state['chips'] = [self.game.players[i].in_chips for i in range(self.num_players)]
-        state['public_card'] = [c.get_index() for c in self.game.public_cards] if self.game.public_cards else None
-        state['hand_cards'] = [[c.get_index() for c in self.game.players[i].hand] for i in range(self.num_players)]
+        state['public_card'] = [int_to_string(c) for c in self.game.public_cards] if self.game.public_cards else None
+        state['hand_cards'] = [[int_to_string(c) for c in self.game.players[i].hand] for i in range(self.num_players)]
         state['current_player'] = self.game.game_pointer
         state['legal_actions'] = self.game.get_legal_actions()
         return state
@@ -1,12 +1,11 @@
-import json
-import os
 import numpy as np
 from collections import OrderedDict
 
-import rlcard_fork
 from rlcard_fork.envs import Env
 from rlcard_fork.games.nolimitholdem import Game
 from rlcard_fork.games.nolimitholdem.round import Action
+from rlcard_fork.games.limitholdem.card import int_to_string
+from rlcard_fork.games.limitholdem.isomorphism import canonical_index, index_to_cards
 
 DEFAULT_GAME_CONFIG = {
         'game_num_players': 2,
@@ -24,6 +23,9 @@ class NolimitholdemEnv(Env):
         self.name = 'no-limit-holdem'
         self.default_game_config = DEFAULT_GAME_CONFIG
         self.game = Game()
+        # Encode the cards of isomorphic states (same up to a suit permutation) the same way, and add
+        # the canonical_index and suit_permutation of the state, off by default as it costs a search per state
+        self.canonical_suits = config.get('canonical_suits', False)
         super().__init__(config)
         self.actions = Action
         self.state_shape = [[54] for _ in range(self.num_players)]
@@ -31,9 +33,6 @@ class NolimitholdemEnv(Env):
         # for raise_amount in range(1, self.game.init_chips+1):
         #     self.actions.append(raise_amount)
 
-        with open(os.path.join(rlcard_fork.__path__[0], 'games/limitholdem/card2index.json'), 'r') as file:
-            self.card2index = json.load(file)
-
     def _get_legal_actions(self):
         ''' Get all leagal actions
 
@@ -58,14 +57,19 @@ class NolimitholdemEnv(Env):
         legal_actions = OrderedDict({action.value: None for action in state['legal_actions']})
         extracted_state['legal_actions'] = legal_actions
 
-        public_cards = state['public_cards']
-        hand = state['hand']
+        public_cards = state['public_codes']
+        hand = state['hand_codes']
         my_chips = state['my_chips']
         all_chips = state['all_chips']
+        if self.canonical_suits and len(hand) == 2 and len(public_cards) in (0, 3, 4, 5):
+            index, permutation = canonical_index(hand, public_cards)
+            extracted_state['canonical_index'] = index
+            extracted_state['suit_permutation'] = permutation
+            hand, public_cards = index_to_cards(index, 2, len(public_cards))
         cards = public_cards + hand
-        idx = [self.card2index[card] for card in cards]
         obs = np.zeros(54)
-        obs[idx] = 1
+        # Card codes follow the layout of card2index.json
+        obs[cards] = 1
         obs[52] = float(my_chips)
         obs[53] = float(max(all_chips))
         extracted_state['obs'] = obs
@@ -110,8 +114,8 @@ class NolimitholdemEnv(Env):
         '''
         state = {}
         state['chips'] = [self.game.players[i].in_chips for i in range(self.num_players)]
-        state['public_card'] = [c.get_index() for c in self.game.public_cards] if self.game.public_cards else None
-        state['hand_cards'] = [[c.get_index() for c in self.game.players[i].hand] for i in range(self.num_players)]
+        state['public_card'] = [int_to_string(c) for c in self.game.public_cards] if self.game.public_cards else None
+        state['hand_cards'] = [[int_to_string(c) for c in self.game.players[i].hand] for i in range(self.num_players)]
         state['current_player'] = self.game.game_pointer
         state['legal_actions'] = self.game.get_legal_actions()
         return state
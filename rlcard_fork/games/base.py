@@ -33,9 +33,7 @@ class Card:
             return NotImplemented
 
     def __hash__(self):
-        suit_index = Card.valid_suit.index(self.suit)
-        rank_index = Card.valid_rank.index(self.rank)
-        return rank_index + 100 * suit_index
+        return hash((self.rank, self.suit))
 
     def __str__(self):
         ''' Get string representation of a card.
@@ -7,6 +7,6 @@ class LeducholdemDealer(Dealer):
         ''' Initialize a leducholdem dealer class
         '''
         self.np_random = np_random
-        self.deck = [Card('S', 'J'), Card('H', 'J'), Card('S', 'Q'), Card('H', 'Q'), Card('S', 'K'), Card('H', 'K')]
+        self.deck = [Card('J', 'S'), Card('J', 'H'), Card('Q', 'S'), Card('Q', 'H'), Card('K', 'S'), Card('K', 'H')]
         self.shuffle()
         self.pot = 0
@@ -0,0 +1,118 @@
+''' Integer card encoding shared by the texas holdem engines
+
+A card is an integer 0..51 laid out like card2index.json: suit * 13 + rank,
+with suits in the order S, H, D, C and ranks in the order A, 2, ..., K. This is
+also the order of init_standard_deck. A set of cards is a 64 bit mask with bit
+`code` set for every card in it.
+'''
+import numpy as np
+
+from rlcard_fork.games.base import Card
+
+SUIT_LOOKUP = 'SHDC'
+RANK_LOOKUP = 'A23456789TJQK'
+NUM_CARDS = 52
+
+# Shared Card objects and 'SA'-style strings (Card.get_index), indexed by code
+CARDS = tuple(Card(rank, suit) for suit in SUIT_LOOKUP for rank in RANK_LOOKUP)
+CARD_STRINGS = tuple(card.get_index() for card in CARDS)
+STRING_TO_CODE = {string: code for code, string in enumerate(CARD_STRINGS)}
+CARD_MASKS = np.left_shift(np.uint64(1), np.arange(NUM_CARDS, dtype=np.uint64))
+
+
+def init_deck():
+    ''' Initialize a standard deck of 52 integer cards
+
+    Returns:
+        (list): The card codes 0..51
+    '''
+    return list(range(NUM_CARDS))
+
+
+def card_to_int(card):
+    ''' Get the code of a card
+
+    Args:
+        card (Card or str): A Card or its 'SA'-style string
+
+    Returns:
+        (int): The card code
+    '''
+    if isinstance(card, Card):
+        card = card.get_index()
+    return STRING_TO_CODE[card]
+
+
+def int_to_card(code):
+    ''' Get the Card object of a code
+
+    Args:
+        code (int): The card code
+
+    Returns:
+        (Card): The shared Card object for this code
+    '''
+    return CARDS[code]
+
+
+def int_to_string(code):
+    ''' Get the 'SA'-style string (suit + rank) of a code
+
+    Args:
+        code (int): The card code
+
+    Returns:
+        (str): The string of the card, as returned by Card.get_index
+    '''
+    return CARD_STRINGS[code]
+
+
+def get_rank(code):
+    ''' Get the rank index of a card, 0 for an ace up to 12 for a king
+    '''
+    return code % 13
+
+
+def get_suit(code):
+    ''' Get the suit index of a card, in the order of SUIT_LOOKUP
+    '''
+    return code // 13
+
+
+def cards_to_mask(codes):
+    ''' Get the mask of a set of cards
+
+    Args:
+        codes (list): Card codes
+
+    Returns:
+        (int): 64 bit mask with one bit set per card
+    '''
+    mask = 0
+    for code in codes:
+        mask |= 1 << code
+    return mask
+
+
+def mask_to_cards(mask):
+    ''' Get the cards of a mask
+
+    Args:
+        mask (int): 64 bit card mask
+
+    Returns:
+        (list): The card codes in ascending order
+    '''
+    return [code for code in range(NUM_CARDS) if mask >> code & 1]
+
+
+def hand_as_string(codes):
+    ''' Get the string of a list of cards, e.g. 'AS5H'
+
+    Args:
+        codes (list): Card codes
+
+    Returns:
+        (str): The rank + suit strings of the cards joined together
+    '''
+    return Card.hand_as_string([CARDS[code] for code in codes])
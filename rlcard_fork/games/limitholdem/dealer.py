@@ -1,10 +1,10 @@
-from rlcard_fork.utils.utils import init_standard_deck
+from rlcard_fork.games.limitholdem.card import init_deck
 
 
 class LimitHoldemDealer:
     def __init__(self, np_random):
         self.np_random = np_random
-        self.deck = init_standard_deck()
+        self.deck = init_deck()
         self.shuffle()
         self.pot = 0
 
@@ -16,6 +16,6 @@ class LimitHoldemDealer:
         Deal one card from the deck
 
         Returns:
-            (Card): The drawn card from the deck
+            (int): The code of the drawn card, see card.py
         """
         return self.deck.pop()
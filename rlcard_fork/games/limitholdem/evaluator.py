@@ -0,0 +1,286 @@
+''' Lookup-table hand evaluator for texas holdem
+
+Cards are integer codes as defined in card.py. Card objects and legacy
+'SA'-style strings (suit + rank) are accepted as well.
+
+Every 5, 6 or 7 card hand maps to a single integer strength: a stronger hand
+always gets a larger value and hands of equal value split the pot. The
+category of the hand (same numbering as Hand.category, 1: high card ...
+9: straight flush) is `strength >> CATEGORY_SHIFT`.
+'''
+import itertools
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import CARDS, RANK_LOOKUP, SUIT_LOOKUP
+
+CATEGORY_SHIFT = 20
+
+# Ranks ordered by strength, 0 is a deuce and 12 is an ace
+_STRENGTH_RANKS = '23456789TJQKA'
+
+# Each card contributes 5 ** rank to the low bits of its key, so the sum of
+# the keys of up to 4 cards of a rank can never carry into the next rank and
+# the low bits identify the rank multiset. Suit counts live in 4-bit fields
+# above it so that a flush can be detected from the same sum.
+_SUIT_SHIFT = 32
+_RANK_KEY_MASK = (1 << _SUIT_SHIFT) - 1
+_FLUSH_CHECK_ADD = 0x3333
+_FLUSH_CHECK_MASK = 0x8888
+
+_NOFLUSH = {}
+_FLUSH = []
+
+_CARD_KEY = {}
+_CARD_SUIT = {}
+_CARD_BIT = {}
+
+# Array versions of the tables above for evaluate_batch, indexed by card code
+_NOFLUSH_KEYS = np.zeros(0, dtype=np.int64)
+_NOFLUSH_VALUES = np.zeros(0, dtype=np.int32)
+_FLUSH_VALUES = np.zeros(0, dtype=np.int32)
+_CARD_KEYS = np.zeros(52, dtype=np.int64)
+_CARD_SUITS = np.zeros(52, dtype=np.int8)
+_CARD_BITS = np.zeros(52, dtype=np.int32)
+
+
+def _register_card(card, rank, suit):
+    _CARD_KEY[card] = 5 ** rank + ((1 << (4 * suit)) << _SUIT_SHIFT if suit >= 0 else 0)
+    _CARD_SUIT[card] = suit
+    _CARD_BIT[card] = 1 << rank
+
+for _suit in range(4):
+    for _rank_index, _rank in enumerate(RANK_LOOKUP):
+        _strength_rank = _STRENGTH_RANKS.index(_rank)
+        _register_card(_suit * 13 + _rank_index, _strength_rank, _suit)
+        _register_card(SUIT_LOOKUP[_suit] + _rank, _strength_rank, _suit)
+        _register_card(CARDS[_suit * 13 + _rank_index], _strength_rank, _suit)
+_CARD_KEYS[:] = [_CARD_KEY[card] for card in range(52)]
+_CARD_SUITS[:] = [_CARD_SUIT[card] for card in range(52)]
+_CARD_BITS[:] = [_CARD_BIT[card] for card in range(52)]
+# rlcard fixtures use 'B' as a suit letter. Hand never counted such cards
+# towards a flush, so they only take part in the rank evaluation.
+for _rank in RANK_LOOKUP:
+    _register_card('B' + _rank, _STRENGTH_RANKS.index(_rank), -1)
+
+
+def _pack(category, ranks):
+    ''' Pack a category and its tie-breaking ranks into one strength value
+
+    Args:
+        category (int): The category of the hand, 1 to 9
+        ranks (list): Up to five ranks (0 to 12) in order of significance
+
+    Returns:
+        (int): The strength value
+    '''
+    strength = category << CATEGORY_SHIFT
+    for i, rank in enumerate(ranks):
+        strength |= rank << (16 - 4 * i)
+    return strength
+
+
+def _straight_high(mask):
+    ''' Get the highest straight contained in a rank mask
+
+    Args:
+        mask (int): 13 bit mask of the ranks present, bit 0 is a deuce
+
+    Returns:
+        (int): The rank of the top card of the best straight, -1 if there is none
+    '''
+    for high in range(12, 3, -1):
+        run = 0b11111 << (high - 4)
+        if mask & run == run:
+            return high
+    # The wheel, A-2-3-4-5, is topped by the five
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return -1
+
+
+def _rank_strength(counts):
+    ''' Evaluate the best five cards of a hand without a flush
+
+    Args:
+        counts (list): Number of cards for each rank, index 0 is a deuce
+
+    Returns:
+        (int): The strength value
+    '''
+    mask = sum(1 << rank for rank in range(13) if counts[rank])
+    # Groups sorted by size, then by rank, e.g. [(3, 9), (2, 12), (1, 5), ...]
+    groups = sorted(((count, rank) for rank, count in enumerate(counts) if count), reverse=True)
+    ranks = [rank for _, rank in groups]
+    if groups[0][0] == 4:
+        return _pack(8, [ranks[0], max(ranks[1:])])
+    if groups[0][0] == 3 and groups[1][0] >= 2:
+        return _pack(7, ranks[:2])
+    high = _straight_high(mask)
+    if high >= 0:
+        return _pack(5, [high])
+    if groups[0][0] == 3:
+        return _pack(4, ranks[:3])
+    if groups[0][0] == 2 and groups[1][0] == 2:
+        return _pack(3, [ranks[0], ranks[1], max(ranks[2:])])
+    if groups[0][0] == 2:
+        return _pack(2, ranks[:4])
+    return _pack(1, ranks[:5])
+
+
+def _flush_strength(mask):
+    ''' Evaluate the best five cards of a flush
+
+    Args:
+        mask (int): 13 bit mask of the ranks in the flush suit
+
+    Returns:
+        (int): The strength value
+    '''
+    high = _straight_high(mask)
+    if high >= 0:
+        return _pack(9, [high])
+    ranks = [rank for rank in range(12, -1, -1) if mask & (1 << rank)]
+    return _pack(6, ranks[:5])
+
+
+def _build_tables():
+    ''' Fill the flush table and the rank multiset table for 5, 6 and 7 cards
+    '''
+    flush = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count('1') >= 5:
+            flush[mask] = _flush_strength(mask)
+
+    noflush = {}
+    for num_cards in (5, 6, 7):
+        for ranks in itertools.combinations_with_replacement(range(13), num_cards):
+            counts = [0] * 13
+            for rank in ranks:
+                counts[rank] += 1
+            if max(counts) > 4:
+                continue
+            key = sum(5 ** rank for rank in ranks)
+            noflush[key] = _rank_strength(counts)
+
+    _NOFLUSH.update(noflush)
+    _FLUSH.extend(flush)
+
+    global _NOFLUSH_KEYS, _NOFLUSH_VALUES, _FLUSH_VALUES
+    keys = np.array(sorted(noflush), dtype=np.int64)
+    _NOFLUSH_VALUES = np.array([noflush[key] for key in keys.tolist()], dtype=np.int32)
+    _NOFLUSH_KEYS = keys
+    _FLUSH_VALUES = np.array(flush, dtype=np.int32)
+
+
+def evaluate_hand(cards):
+    ''' Evaluate a hand of 5, 6 or 7 cards
+
+    Args:
+        cards (list): Integer card codes, Card objects or 'SA'-style card strings
+
+    Returns:
+        (int): The strength of the best five cards, larger is better
+    '''
+    if not _FLUSH:
+        _build_tables()
+    key = 0
+    for card in cards:
+        key += _CARD_KEY[card]
+    flush_suits = ((key >> _SUIT_SHIFT) + _FLUSH_CHECK_ADD) & _FLUSH_CHECK_MASK
+    if flush_suits:
+        # At most one suit can hold five of seven cards
+        suit = (flush_suits.bit_length() - 4) // 4
+        mask = 0
+        for card in cards:
+            if _CARD_SUIT[card] == suit:
+                mask |= _CARD_BIT[card]
+        return _FLUSH[mask]
+    return _NOFLUSH[key & _RANK_KEY_MASK]
+
+
+def get_category(strength):
+    ''' Get the category of a hand from its strength
+
+    Args:
+        strength (int): A value returned by evaluate_hand
+
+    Returns:
+        (int): 1: High card, 2: One pair, ..., 9: Straight flush
+    '''
+    return strength >> CATEGORY_SHIFT
+
+
+def evaluate_batch(cards):
+    ''' Evaluate many hands at once with array operations
+
+    Args:
+        cards (numpy.array): Integer card codes of shape (N, 5), (N, 6) or (N, 7).
+            The cards of a hand must be distinct
+
+    Returns:
+        (numpy.array): The strength of each hand, same values as evaluate_hand
+    '''
+    if not _FLUSH:
+        _build_tables()
+    cards = np.asarray(cards)
+    keys = _CARD_KEYS[cards].sum(axis=1)
+    strengths = _NOFLUSH_VALUES[np.searchsorted(_NOFLUSH_KEYS, keys & _RANK_KEY_MASK)]
+
+    flush_suits = ((keys >> _SUIT_SHIFT) + _FLUSH_CHECK_ADD) & _FLUSH_CHECK_MASK
+    rows = np.flatnonzero(flush_suits)
+    if len(rows) > 0:
+        flush_suits = flush_suits[rows]
+        suits = (flush_suits > 0x8).astype(np.int8) + (flush_suits > 0x88) + (flush_suits > 0x888)
+        flush_cards = cards[rows]
+        # Ranks are distinct within a suit so the sum of the bits is the mask
+        in_suit = _CARD_SUITS[flush_cards] == suits[:, None]
+        masks = np.where(in_suit, _CARD_BITS[flush_cards], 0).sum(axis=1)
+        strengths[rows] = _FLUSH_VALUES[masks]
+    return strengths
+
+
+def evaluate_boards(boards, hands):
+    ''' Evaluate every pair of hole cards on every board
+
+    The rank part is looked up once per distinct pair of ranks (at most 91)
+    instead of once per hand, only the hands that can make a flush with a
+    board are evaluated through the flush table.
+
+    Args:
+        boards (numpy.array): Integer card codes of shape (B, k), 3 <= k <= 5
+        hands (numpy.array): Integer card codes of shape (H, 2)
+
+    Returns:
+        (numpy.array): Strengths of shape (B, H). Entries where a hand shares
+            a card with the board are meaningless and should be masked out
+    '''
+    if not _FLUSH:
+        _build_tables()
+    boards = np.asarray(boards)
+    hands = np.asarray(hands)
+    board_keys = _CARD_KEYS[boards].sum(axis=1)
+    hand_keys = _CARD_KEYS[hands].sum(axis=1)
+
+    rank_keys, hand_rank_index = np.unique(hand_keys & _RANK_KEY_MASK, return_inverse=True)
+    # Hands sharing a card with the board can form impossible rank multisets
+    index = np.searchsorted(_NOFLUSH_KEYS, (board_keys & _RANK_KEY_MASK)[:, None] + rank_keys)
+    rank_strengths = _NOFLUSH_VALUES[np.minimum(index, len(_NOFLUSH_KEYS) - 1)]
+    strengths = rank_strengths[:, hand_rank_index.ravel()]
+
+    # With at most 5 board cards only one suit can have 3 or more of them
+    board_suit_counts = _CARD_SUITS[boards][:, :, None] == np.arange(4)
+    board_suit_counts = board_suit_counts.sum(axis=1)
+    flush_boards = np.flatnonzero(board_suit_counts.max(axis=1) >= 5 - hands.shape[1])
+    if len(flush_boards) > 0:
+        suits = board_suit_counts[flush_boards].argmax(axis=1)
+        board_cards = boards[flush_boards]
+        board_masks = np.where(_CARD_SUITS[board_cards] == suits[:, None], _CARD_BITS[board_cards], 0).sum(axis=1)
+        # (B', H, 2): whether each hole card is of the flush suit of the board
+        in_suit = _CARD_SUITS[hands][None, :, :] == suits[:, None, None]
+        hand_masks = np.where(in_suit, _CARD_BITS[hands][None, :, :], 0).sum(axis=2)
+        counts = board_suit_counts[flush_boards, suits][:, None] + in_suit.sum(axis=2)
+        rows, cols = np.nonzero(counts >= 5)
+        flush_strengths = _FLUSH_VALUES[board_masks[rows] | hand_masks[rows, cols]]
+        strengths[flush_boards[rows], cols] = flush_strengths
+    return strengths
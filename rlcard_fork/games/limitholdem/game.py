@@ -1,4 +1,3 @@
-from copy import deepcopy, copy
 import numpy as np
 
 from rlcard_fork.games.limitholdem import Dealer
@@ -116,15 +115,11 @@ class LimitHoldemGame:
                 (int): next player id
         """
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            rn = copy(self.history_raise_nums)
-            self.history.append((r, b, r_c, d, p, ps, rn))
+            # First record what this step can change: the round, the acting player,
+            # the raise count of the round and how many public cards are dealt
+            player = self.players[self.game_pointer]
+            self.history.append((self.game_pointer, self.round_counter, self.round.snapshot(), player.in_chips,
+                                 player.status, self.history_raise_nums[self.round_counter], len(self.public_cards)))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action)
@@ -163,8 +158,16 @@ class LimitHoldemGame:
             (bool): True if the game steps back successfully
         """
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, \
-                self.players, self.history_raises_nums = self.history.pop()
+            self.game_pointer, self.round_counter, round_record, in_chips, status, raise_num, num_public_cards = \
+                self.history.pop()
+            # Put the cards dealt back on top of the deck, in the order they were drawn
+            while len(self.public_cards) > num_public_cards:
+                self.dealer.deck.append(self.public_cards.pop())
+            self.round.restore(round_record)
+            player = self.players[self.game_pointer]
+            player.in_chips = in_chips
+            player.status = status
+            self.history_raise_nums[self.round_counter] = raise_num
             return True
         return False
 
@@ -209,7 +212,7 @@ class LimitHoldemGame:
         chips = [self.players[i].in_chips for i in range(self.num_players)]
         legal_actions = self.get_legal_actions()
         state = self.players[player].get_state(self.public_cards, chips, legal_actions)
-        state['raise_nums'] = self.history_raise_nums
+        state['raise_nums'] = list(self.history_raise_nums)
 
         return state
 
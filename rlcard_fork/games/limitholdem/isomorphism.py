@@ -0,0 +1,162 @@
+''' Suit isomorphism of texas holdem situations
+
+Permuting the suits of every card of a situation (hole cards and board)
+changes nothing about it: the hand strengths, equities and optimal strategies
+are the same. canonicalize picks one representative per class of such
+situations, so that results computed for it can be reused for all the others,
+e.g. 1326 hole card combos fall into 169 classes and the 25.9 million
+(hole cards, flop) situations into 1.29 million.
+
+A suit permutation is a tuple `permutation` where `permutation[suit]` is the
+suit a card of `suit` becomes, suits being numbered as in card.SUIT_LOOKUP.
+The board is split in rounds (flop, turn, river): the cards of a round are
+unordered, but the rounds are not interchangeable.
+'''
+import itertools
+
+from rlcard_fork.games.limitholdem.card import NUM_CARDS
+
+IDENTITY = (0, 1, 2, 3)
+_PERMUTATIONS = list(itertools.permutations(range(4)))
+# _BINOMIAL[n][k] is n choose k, Pascal's triangle up to NUM_CARDS (math.comb needs Python 3.8)
+_BINOMIAL = [[1]]
+for _n in range(NUM_CARDS):
+    _BINOMIAL.append([1] + [a + b for a, b in zip(_BINOMIAL[-1], _BINOMIAL[-1][1:])] + [1])
+_BINOMIAL = [row + [0] * (NUM_CARDS + 1 - len(row)) for row in _BINOMIAL]
+
+
+def permute_cards(cards, permutation):
+    ''' Apply a suit permutation to cards
+
+    Args:
+        cards (list): Card codes
+        permutation (tuple): The new suit of each suit
+
+    Returns:
+        (list): The permuted card codes, in the same order
+    '''
+    return [permutation[card // 13] * 13 + card % 13 for card in cards]
+
+
+def invert_permutation(permutation):
+    ''' Get the inverse of a suit permutation
+
+    Args:
+        permutation (tuple): The new suit of each suit
+
+    Returns:
+        (tuple): The permutation that undoes it
+    '''
+    inverse = [0] * 4
+    for suit, new_suit in enumerate(permutation):
+        inverse[new_suit] = suit
+    return tuple(inverse)
+
+
+def _rounds(hand, board):
+    if len(hand) not in (0, 2) or len(board) not in (0, 3, 4, 5):
+        raise ValueError('A situation has 0 or 2 hole cards and 0, 3, 4 or 5 board cards')
+    return [list(hand), list(board[:3]), list(board[3:4]), list(board[4:5])]
+
+
+def canonicalize(hand, board=()):
+    ''' Get the canonical representative of a situation
+
+    The representative is the suit permutation of the situation that is the
+    smallest, comparing the sorted cards of each round in turn.
+
+    Args:
+        hand (list): The hole card codes, 2 of them or none
+        board (list): The public card codes, 0, 3, 4 or 5 of them
+
+    Returns:
+        (tuple): Tuple containing:
+
+            (list): The canonical hole cards, sorted
+            (list): The canonical board, sorted within each round
+            (tuple): The suit permutation that maps the situation to its representative
+    '''
+    rounds = _rounds(hand, board)
+    cards = [card for cards in rounds for card in cards]
+    if len(set(cards)) != len(cards) or not all(0 <= card < NUM_CARDS for card in cards):
+        raise ValueError('Invalid or duplicated cards')
+    best_key, best_permutation = None, None
+    for permutation in _PERMUTATIONS:
+        key = tuple(tuple(sorted(permute_cards(cards, permutation))) for cards in rounds)
+        if best_key is None or key < best_key:
+            best_key, best_permutation = key, permutation
+    canonical_hand = list(best_key[0])
+    canonical_board = [card for cards in best_key[1:] for card in cards]
+    return canonical_hand, canonical_board, best_permutation
+
+
+def _combination_rank(cards):
+    ''' Colexicographic rank of a set of cards among the sets of the same size
+    '''
+    return sum(_BINOMIAL[card][i + 1] for i, card in enumerate(sorted(cards)))
+
+
+def _combination_unrank(rank, size):
+    cards = []
+    for i in range(size, 0, -1):
+        card = i - 1
+        while _BINOMIAL[card + 1][i] <= rank:
+            card += 1
+        rank -= _BINOMIAL[card][i]
+        cards.append(card)
+    return sorted(cards)
+
+
+def canonical_index(hand, board=()):
+    ''' Get the index of the class of a situation
+
+    Isomorphic situations get the same index. Indexes are unique within a
+    street (number of board cards) but not contiguous.
+
+    Args:
+        hand (list): The hole card codes, 2 of them or none
+        board (list): The public card codes, 0, 3, 4 or 5 of them
+
+    Returns:
+        (tuple): Tuple containing:
+
+            (int): The index of the canonical representative
+            (tuple): The suit permutation that maps the situation to its representative
+    '''
+    canonical_hand, canonical_board, permutation = canonicalize(hand, board)
+    index = 0
+    for cards in _rounds(canonical_hand, canonical_board):
+        if cards:
+            index = index * _BINOMIAL[NUM_CARDS][len(cards)] + _combination_rank(cards)
+    return index, permutation
+
+
+def index_to_cards(index, num_hand_cards=2, num_board_cards=0, permutation=IDENTITY):
+    ''' Get back a situation from its index, reverse of canonical_index
+
+    Args:
+        index (int): The index of a situation
+        num_hand_cards (int): The number of hole cards, 2 or 0
+        num_board_cards (int): The number of board cards, 0, 3, 4 or 5
+        permutation (tuple): The suit permutation returned with the index, the
+            canonical representative is returned with the identity
+
+    Returns:
+        (tuple): Tuple containing:
+
+            (list): The hole card codes
+            (list): The board card codes
+    '''
+    sizes = [len(cards) for cards in _rounds([0] * num_hand_cards, [0] * num_board_cards)]
+    rounds = []
+    for size in reversed(sizes):
+        if size:
+            index, rank = divmod(index, _BINOMIAL[NUM_CARDS][size])
+            rounds.append(_combination_unrank(rank, size))
+        else:
+            rounds.append([])
+    rounds.reverse()
+    inverse = invert_permutation(permutation)
+    hand = permute_cards(rounds[0], inverse)
+    board = permute_cards([card for cards in rounds[1:] for card in cards], inverse)
+    return hand, board
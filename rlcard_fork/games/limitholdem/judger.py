@@ -1,7 +1,46 @@
-from rlcard_fork.games.limitholdem.utils import compare_hands
+from rlcard_fork.games.limitholdem.evaluator import evaluate_batch, evaluate_hand
 import numpy as np
 
 
+def settle_pots(in_chips, strengths, np_random):
+    """
+    Split the main pot and the side pots of finished games in one pass
+
+    The pot is cut in layers at each distinct amount put in by a player. Each
+    layer is won by the best live hands among the players who reached it, and
+    given back to them if all of them folded. Chips that can not be split
+    evenly go to a random winner of the layer.
+
+    Args:
+        in_chips (numpy.array): Chips put in the pot, shape (games, players)
+        strengths (numpy.array): Strength of each hand (see evaluate_hand), negative if folded
+        np_random (numpy.random.RandomState): Random state for the odd chips
+
+    Returns:
+        (numpy.array): The payoffs, shape (games, players)
+    """
+    in_chips = np.asarray(in_chips, dtype=np.int64)
+    strengths = np.asarray(strengths)
+    # (games, layers): the layers are the sorted contributions, zero sized layers are harmless
+    levels = np.sort(in_chips, axis=1)
+    layer_sizes = np.diff(levels, axis=1, prepend=0)
+    # (games, layers, players)
+    contributors = in_chips[:, None, :] >= levels[:, :, None]
+    contending = np.where(contributors & (strengths[:, None, :] >= 0), strengths[:, None, :], -1)
+    best = contending.max(axis=2, keepdims=True)
+    winners = np.where(best >= 0, contending == best, contributors)
+
+    pots = layer_sizes * contributors.sum(axis=2)
+    num_winners = winners.sum(axis=2)
+    shares, odd_chips = np.divmod(pots, num_winners)
+    # One random winner per layer gets the odd chips
+    lucky = np.where(winners, np_random.random_sample(winners.shape), -1).argmax(axis=2)
+    won = winners * shares[:, :, None]
+    np.put_along_axis(won, lucky[:, :, None], np.take_along_axis(won, lucky[:, :, None], axis=2) + odd_chips[:, :, None], axis=2)
+    return won.sum(axis=1) - in_chips
+
+
+
 class LimitHoldemJudger:
     """The Judger class for limit texas holdem"""
 
@@ -14,79 +53,41 @@ class LimitHoldemJudger:
 
         Args:
             players (list): The list of players who play the game
-            hands (list): The list of hands that from the players
+            hands (list): The list of hands (integer card codes) that from the players, None if folded
 
         Returns:
             (list): Each entry of the list corresponds to one entry of the
         """
-        # Convert the hands into card indexes
-        hands = [[card.get_index() for card in hand] if hand is not None else None for hand in hands]
-        
+        # Evaluate every hand once, folded players get a negative strength.
+        # Nothing to evaluate if everybody else folded before the showdown
+        if sum(hand is not None for hand in hands) == 1:
+            strengths = [0 if hand is not None else -1 for hand in hands]
+        else:
+            strengths = [evaluate_hand(hand) if hand is not None else -1 for hand in hands]
         in_chips = [p.in_chips for p in players]
-        remaining = sum(in_chips)
-        payoffs = [0] * len(hands)
-        while remaining > 0:
-            winners = compare_hands(hands)
-            each_win = self.split_pots_among_players(in_chips, winners)
-            
-            for i in range(len(players)):
-                if winners[i]:
-                    remaining -= each_win[i]
-                    payoffs[i] += each_win[i] - in_chips[i]
-                    hands[i] = None
-                    in_chips[i] = 0
-                elif in_chips[i] > 0:
-                    payoffs[i] += each_win[i] - in_chips[i]
-                    in_chips[i] = each_win[i]
-                    
-        assert sum(payoffs) == 0
-        return payoffs
-
-    def split_pot_among_players(self, in_chips, winners):
+        payoffs = settle_pots(np.array([in_chips]), np.array([strengths]), self.np_random)[0]
+        return payoffs.tolist()
+
+    def judge_games(self, in_chips, cards, folded):
         """
-        Splits the next (side) pot among players.
-        Function is called in loop by distribute_pots_among_players until all chips are allocated.
+        Judge many finished games at once, e.g. for simulations
 
         Args:
-            in_chips (list): List with number of chips bet not yet distributed for each player
-            winners (list): List with 1 if the player is among winners else 0
+            in_chips (numpy.array): Chips put in the pot, shape (games, players)
+            cards (numpy.array): Hole and public card codes, shape (games, players, 7)
+            folded (numpy.array): Whether each player folded, shape (games, players)
 
         Returns:
-            (list): Of how much chips each player get after this pot has been split and list of chips left to distribute
+            (numpy.array): The payoffs, shape (games, players)
         """
-        nb_winners_in_pot = sum((winners[i] and in_chips[i] > 0) for i in range(len(in_chips)))
-        nb_players_in_pot = sum(in_chips[i] > 0 for i in range(len(in_chips)))
-        if nb_winners_in_pot == 0 or nb_winners_in_pot == nb_players_in_pot:
-            # no winner or all winners for this pot
-            allocated = list(in_chips)  # we give back their chips to each players in this pot
-            in_chips_after = len(in_chips) * [0]  # no more chips to distribute
-        else:
-            amount_in_pot_by_player = min(v for v in in_chips if v > 0)
-            how_much_one_win, remaining = divmod(amount_in_pot_by_player * nb_players_in_pot, nb_winners_in_pot)
-            '''
-            In the event of a split pot that cannot be divided equally for every winner, the winner who is sitting 
-            closest to the left of the dealer receives the remaining differential in chips cf 
-            https://www.betclic.fr/poker/house-rules--play-safely--betclic-poker-cpok_rules to simplify and as this 
-            case is very rare, we will give the remaining differential in chips to a random winner
-            '''
-            allocated = len(in_chips) * [0]
-            in_chips_after = list(in_chips)
-            for i in range(len(in_chips)):  # iterate on all players
-                if in_chips[i] == 0:  # player not in pot
-                    continue
-                if winners[i]:
-                    allocated[i] += how_much_one_win
-                in_chips_after[i] -= amount_in_pot_by_player
-            if remaining > 0:
-                random_winning_player = self.np_random.choice(
-                    [i for i in range(len(winners)) if winners[i] and in_chips[i] > 0])
-                allocated[random_winning_player] += remaining
-        assert sum(in_chips[i] - in_chips_after[i] for i in range(len(in_chips))) == sum(allocated)
-        return allocated, in_chips_after
+        cards = np.asarray(cards)
+        strengths = evaluate_batch(cards.reshape(-1, cards.shape[2])).reshape(cards.shape[:2])
+        strengths = np.where(folded, -1, strengths)
+        return settle_pots(in_chips, strengths, self.np_random)
 
     def split_pots_among_players(self, in_chips_initial, winners):
         """
-        Splits main pot and side pots among players (to handle special case of all-in players).
+        Splits main pot and side pots among players, a compatibility wrapper over settle_pots
 
         Args:
             in_chips_initial (list): List with number of chips bet for each player
@@ -95,14 +96,7 @@ class LimitHoldemJudger:
         Returns:
             (list): List of how much chips each player get back after all pots have been split
         """
-        in_chips = list(in_chips_initial)
-        assert len(in_chips) == len(winners)
-        assert all(v == 0 or v == 1 for v in winners)
-        assert sum(winners) >= 1  # there must be at least one winner
-        allocated = np.zeros(len(in_chips), dtype=int)
-        while any(v > 0 for v in in_chips):  # while there are still chips to allocate
-            allocated_current_pot, in_chips = self.split_pot_among_players(in_chips, winners)
-            allocated += allocated_current_pot  # element-wise addition
-        assert all(chips >= 0 for chips in allocated)  # check that all players got a non negative amount of chips
-        assert sum(in_chips_initial) == sum(allocated)  # check that all chips bet have been allocated
-        return list(allocated)
+        in_chips = np.array([in_chips_initial], dtype=np.int64)
+        # The winners beat the other players, who tie and get back the layers no winner reached
+        payoffs = settle_pots(in_chips, np.array([winners]), self.np_random)
+        return (payoffs + in_chips)[0].tolist()
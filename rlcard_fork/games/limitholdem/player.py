@@ -1,5 +1,7 @@
 from enum import Enum
 
+from rlcard_fork.games.limitholdem.card import CARD_STRINGS
+
 
 class PlayerStatus(Enum):
     ALIVE = 0
@@ -18,6 +20,7 @@ class LimitHoldemPlayer:
         """
         self.np_random = np_random
         self.player_id = player_id
+        # Integer card codes, see card.py
         self.hand = []
         self.status = PlayerStatus.ALIVE
 
@@ -29,15 +32,17 @@ class LimitHoldemPlayer:
         Encode the state for the player
 
         Args:
-            public_cards (list): A list of public cards that seen by all the players
+            public_cards (list): A list of public card codes that seen by all the players
             all_chips (int): The chips that all players have put in
 
         Returns:
-            (dict): The state of the player
+            (dict): The state of the player. Cards are given both as strings and as codes
         """
         return {
-            'hand': [c.get_index() for c in self.hand],
-            'public_cards': [c.get_index() for c in public_cards],
+            'hand': [CARD_STRINGS[c] for c in self.hand],
+            'public_cards': [CARD_STRINGS[c] for c in public_cards],
+            'hand_codes': list(self.hand),
+            'public_codes': list(public_cards),
             'all_chips': all_chips,
             'my_chips': self.in_chips,
             'legal_actions': legal_actions
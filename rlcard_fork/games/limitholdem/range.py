@@ -0,0 +1,277 @@
+''' Hand ranges and range against range equity
+
+A range is a weight for each of the 1326 combos of two hole cards. Combo `i`
+is COMBOS[i], the i-th pair of itertools.combinations(range(52), 2), so its
+two card codes are in ascending order.
+
+Preflop the combos fall into 169 hand classes laid out as the usual 13x13
+grid, ranks from ace down to deuce: class `row * 13 + col` is a pair on the
+diagonal, suited above it ('AKs' is row A, col K) and offsuit below it.
+'''
+import itertools
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import CARD_MASKS, NUM_CARDS, RANK_LOOKUP, cards_to_mask, card_to_int
+from rlcard_fork.games.limitholdem.evaluator import evaluate_boards
+
+NUM_COMBOS = 1326
+
+COMBOS = np.array(list(itertools.combinations(range(NUM_CARDS), 2)), dtype=np.int8)
+COMBO_MASKS = CARD_MASKS[COMBOS[:, 0]] | CARD_MASKS[COMBOS[:, 1]]
+# COMBO_INDEX[a, b] is the index of the combo holding cards a and b, -1 if a == b
+COMBO_INDEX = np.full((NUM_CARDS, NUM_CARDS), -1, dtype=np.int16)
+COMBO_INDEX[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(NUM_COMBOS)
+COMBO_INDEX[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(NUM_COMBOS)
+
+NUM_HAND_CLASSES = 169
+_GRID_RANKS = 'AKQJT98765432'
+
+
+def _combo_class(combo):
+    first, second = combo
+    first_row, second_row = _GRID_RANKS.index(RANK_LOOKUP[first % 13]), _GRID_RANKS.index(RANK_LOOKUP[second % 13])
+    high, low = min(first_row, second_row), max(first_row, second_row)
+    if first // 13 == second // 13:
+        return high * 13 + low
+    return low * 13 + high
+
+COMBO_CLASSES = np.array([_combo_class(combo) for combo in COMBOS.tolist()], dtype=np.int16)
+HAND_CLASSES = tuple(_GRID_RANKS[row] + _GRID_RANKS[col] if row == col else
+                     _GRID_RANKS[min(row, col)] + _GRID_RANKS[max(row, col)] + ('s' if row < col else 'o')
+                     for row in range(13) for col in range(13))
+
+_CONFLICTS = None
+
+
+def _expand_class(token):
+    ''' Get the hand classes of a class followed by '+': 'TT+' for the pairs from TT up, 'K9s+' for the
+        kickers from 9 up to below the K
+    '''
+    if not token.endswith('+'):
+        return [token]
+    token = token[:-1]
+    ranks = token[:2].upper()
+    if len(token) not in (2, 3) or any(rank not in _GRID_RANKS for rank in ranks):
+        raise ValueError('Invalid hand class: ' + token + '+')
+    high, low = sorted(_GRID_RANKS.index(rank) for rank in ranks)
+    if high == low:
+        return [_GRID_RANKS[row] * 2 for row in range(high + 1)]
+    return [_GRID_RANKS[high] + _GRID_RANKS[row] + token[2:] for row in range(high + 1, low + 1)]
+
+
+def combo_index(hand):
+    ''' Get the index of a combo
+
+    Args:
+        hand (list): Two card codes, or 'SA'-style strings
+
+    Returns:
+        (int): The index of the combo in a range
+    '''
+    first, second = [card_to_int(card) if isinstance(card, str) else int(card) for card in hand]
+    index = int(COMBO_INDEX[first, second])
+    if index < 0:
+        raise ValueError('A hand needs two different cards')
+    return index
+
+
+def class_index(name):
+    ''' Get the index of a hand class
+
+    Args:
+        name (str): The class, e.g. 'AA', 'AKs' or 'KAo'
+
+    Returns:
+        (int): The index of the class in the 13x13 grid
+    '''
+    name = name[:2].upper() + name[2:].lower()
+    if len(name) == 3 and name[0] != name[1] and _GRID_RANKS.index(name[0]) > _GRID_RANKS.index(name[1]):
+        name = name[1] + name[0] + name[2]
+    if name not in HAND_CLASSES:
+        raise ValueError('Invalid hand class: ' + name)
+    return HAND_CLASSES.index(name)
+
+
+def get_conflicts():
+    ''' Get whether each pair of combos shares a card
+
+    Returns:
+        (numpy.array): Boolean array of shape (1326, 1326), built once
+    '''
+    global _CONFLICTS
+    if _CONFLICTS is None:
+        _CONFLICTS = (COMBO_MASKS[:, None] & COMBO_MASKS[None, :]) != 0
+    return _CONFLICTS
+
+
+class Range:
+    ''' Weighted set of hole card combos
+    '''
+
+    def __init__(self, weights=None):
+        ''' Initialize a range
+
+        Args:
+            weights (numpy.array): A weight for each of the 1326 combos, every combo weighs 1 if None
+        '''
+        if weights is None:
+            weights = np.ones(NUM_COMBOS)
+        self.weights = np.array(weights, dtype=np.float64)
+        if self.weights.shape != (NUM_COMBOS,):
+            raise ValueError('A range needs one weight per combo')
+
+    @classmethod
+    def from_hands(cls, hands, weights=None):
+        ''' Create a range holding some combos
+
+        Args:
+            hands (list): Combos as pairs of card codes or 'SA'-style strings
+            weights (list): The weight of each combo, 1 if None
+
+        Returns:
+            (Range): The range, other combos weigh 0
+        '''
+        result = cls(np.zeros(NUM_COMBOS))
+        if weights is None:
+            weights = [1.0] * len(hands)
+        for hand, weight in zip(hands, weights):
+            result.weights[combo_index(hand)] = weight
+        return result
+
+    @classmethod
+    def from_string(cls, text):
+        ''' Create a range from a comma separated list of hand classes
+
+        A class is a pair ('TT'), two ranks followed by 's' for suited or 'o'
+        for offsuit combos ('AKs', 'AKo'), or two ranks for both ('AK'). A
+        '+' adds the higher pairs ('TT+') or the higher kickers ('K9s+').
+
+        Args:
+            text (str): The hand classes, e.g. 'AA,KK,AKs,T9' or 'QQ+,ATs+'
+
+        Returns:
+            (Range): The range, each combo of the classes weighs 1
+        '''
+        result = cls(np.zeros(NUM_COMBOS))
+        tokens = [hand_class for token in text.replace(' ', '').split(',') for hand_class in _expand_class(token)]
+        for token in tokens:
+            if not token:
+                continue
+            suitedness = token[2:].lower()
+            if len(token) not in (2, 3) or suitedness not in ('', 's', 'o') \
+                    or any(rank not in RANK_LOOKUP for rank in token[:2].upper()):
+                raise ValueError('Invalid hand class: ' + token)
+            first, second = (RANK_LOOKUP.index(rank) for rank in token[:2].upper())
+            for first_suit, second_suit in itertools.product(range(4), repeat=2):
+                if first == second and first_suit >= second_suit:
+                    continue
+                if (suitedness == 's' and first_suit != second_suit) or (suitedness == 'o' and first_suit == second_suit):
+                    continue
+                result.weights[COMBO_INDEX[first_suit * 13 + first, second_suit * 13 + second]] = 1.0
+        return result
+
+    def copy(self):
+        ''' Get a copy of the range with its own weights
+        '''
+        return Range(self.weights)
+
+    def get_weight(self, hand):
+        ''' Get the weight of a combo
+
+        Args:
+            hand (list): Two card codes or 'SA'-style strings
+
+        Returns:
+            (float): The weight of the combo
+        '''
+        return float(self.weights[combo_index(hand)])
+
+    def set_weight(self, hand, weight):
+        ''' Set the weight of a combo
+
+        Args:
+            hand (list): Two card codes or 'SA'-style strings
+            weight (float): The new weight
+        '''
+        self.weights[combo_index(hand)] = weight
+
+    def remove_cards(self, cards):
+        ''' Zero the combos holding any of the given cards, in place
+
+        Args:
+            cards (list): Card codes, e.g. the board and the hero's hand
+
+        Returns:
+            (Range): The range itself
+        '''
+        mask = np.uint64(cards_to_mask(cards))
+        self.weights[(COMBO_MASKS & mask) != 0] = 0
+        return self
+
+    def normalize(self):
+        ''' Scale the weights to sum to one, in place
+
+        Returns:
+            (Range): The range itself
+        '''
+        total = self.weights.sum()
+        if total > 0:
+            self.weights /= total
+        return self
+
+    def num_combos(self):
+        ''' Get the number of combos with a positive weight
+        '''
+        return int(np.count_nonzero(self.weights > 0))
+
+
+def range_vs_range_equity(hero_range, villain_range, board):
+    ''' Compute the equity of every combo of a range against another range
+
+    The equity of a hero combo is its expected share of the pot against the
+    villain combos that share no card with it, weighted by their weight. When
+    the board is not complete, every runout is enumerated: the river takes a
+    few milliseconds, the turn a few hundred and the flop is slow.
+
+    Args:
+        hero_range (Range): The range of the hero
+        villain_range (Range): The range of the opponent
+        board (list): The public card codes, 3 to 5 of them
+
+    Returns:
+        (numpy.array): The equity of each of the 1326 hero combos, 0 for combos
+            blocked by the board or without any unblocked villain combo
+    '''
+    board = list(board)
+    if not 3 <= len(board) <= 5 or len(set(board)) != len(board):
+        raise ValueError('Invalid board')
+    board_mask = cards_to_mask(board)
+    deck = [card for card in range(NUM_CARDS) if not board_mask >> card & 1]
+    runouts = list(itertools.combinations(deck, 5 - len(board)))
+    boards = np.hstack([np.tile(np.array(board, dtype=np.int8), (len(runouts), 1)),
+                        np.array(runouts, dtype=np.int8).reshape(len(runouts), 5 - len(board))])
+    strengths = evaluate_boards(boards, COMBOS)
+    board_masks = np.bitwise_or.reduce(np.left_shift(np.uint64(1), boards.astype(np.uint64)), axis=1)
+    conflicts = get_conflicts()
+
+    shares_sum = np.zeros(NUM_COMBOS)
+    weights_sum = np.zeros(NUM_COMBOS)
+    for strength, mask in zip(strengths, board_masks):
+        live = np.flatnonzero((COMBO_MASKS & mask) == 0)
+        hero_live = live[hero_range.weights[live] > 0]
+        villain_live = live[villain_range.weights[live] > 0]
+        if len(hero_live) == 0 or len(villain_live) == 0:
+            continue
+        villain_weights = np.where(conflicts[np.ix_(hero_live, villain_live)], 0.0, villain_range.weights[villain_live])
+        hero_strength = strength[hero_live][:, None]
+        villain_strength = strength[villain_live][None, :]
+        # Win counts 1 and tie 1/2, hence twice the share
+        double_shares = (hero_strength > villain_strength).astype(np.float64) + (hero_strength >= villain_strength)
+        shares_sum[hero_live] += (double_shares * villain_weights).sum(axis=1) / 2
+        weights_sum[hero_live] += villain_weights.sum(axis=1)
+    # Every pair of unblocked combos is compatible with as many runouts, so
+    # the ratio of the sums is the average over runouts and villain combos
+    equities = np.zeros(NUM_COMBOS)
+    np.divide(shares_sum, weights_sum, out=equities, where=weights_sum > 0)
+    return equities
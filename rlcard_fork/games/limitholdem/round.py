@@ -92,6 +92,28 @@ class LimitHoldemRound:
 
         return self.game_pointer
 
+    def snapshot(self):
+        """
+        Record what the next proceed_round and start_new_round can change
+
+        Returns:
+            (tuple): The record to pass to restore
+        """
+        # start_new_round replaces the raised list, proceed_round only changes the current player's entry
+        return (self.game_pointer, self.raise_amount, self.have_raised, self.not_raise_num, self.player_folded,
+                self.raised, self.raised[self.game_pointer])
+
+    def restore(self, record):
+        """
+        Undo the changes made since a snapshot
+
+        Args:
+            record (tuple): A record returned by snapshot
+        """
+        self.game_pointer, self.raise_amount, self.have_raised, self.not_raise_num, self.player_folded, \
+            self.raised, raised = record
+        self.raised[self.game_pointer] = raised
+
     def get_legal_actions(self):
         """
         Obtain the legal actions for the current player
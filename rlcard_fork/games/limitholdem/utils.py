@@ -1,4 +1,4 @@
-import numpy as np
+from rlcard_fork.games.limitholdem.evaluator import evaluate_hand
 
 class Hand:
     def __init__(self, all_cards):
@@ -406,209 +406,30 @@ class Hand:
         High_cards = self.all_cards[2:7]
         return High_cards
 
-def compare_ranks(position, hands, winner):
-    '''
-    Compare cards in same position of plays' five handcards
-    Args:
-        position(int): the position of a card in a sorted handcard
-        hands(list): cards of those players.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        winner: array of same length than hands with 1 if the hand is among winners and 0 among losers
-    Returns:
-        new updated winner array
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-
-    '''
-    assert len(hands) == len(winner)
-    RANKS = '23456789TJQKA'
-    cards_figure_all_players = [None]*len(hands)  #cards without suit
-    for i, hand in enumerate(hands):
-        if winner[i]:
-            cards = hands[i].get_hand_five_cards()
-            if len(cards[0]) != 1:# remove suit
-                for p in range(5):
-                    cards[p] = cards[p][1:]
-            cards_figure_all_players[i] = cards
-
-    rival_ranks = [] # ranks of rival_figures
-    for i, cards_figure in enumerate(cards_figure_all_players):
-        if winner[i]:
-            rank = cards_figure_all_players[i][position]
-            rival_ranks.append(RANKS.index(rank))
-        else:
-            rival_ranks.append(-1)  # player has already lost
-    new_winner = list(winner)
-    for i, rival_rank in enumerate(rival_ranks):
-        if rival_rank != max(rival_ranks):
-            new_winner[i] = 0
-    return new_winner
-
-def determine_winner(key_index, hands, all_players, potential_winner_index):
-    '''
-    Find out who wins in the situation of having players with same highest hand_catagory
-    Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players with same highest hand_catagory.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
-    Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-
-    '''
-    winner = [1]*len(hands)
-    i_index = 0
-    while i_index < len(key_index) and sum(winner) > 1:
-        index_break_tie = key_index[i_index]
-        winner = compare_ranks(index_break_tie, hands, winner)
-        i_index += 1
-    for i in range(len(potential_winner_index)):
-        if winner[i]:
-            all_players[potential_winner_index[i]] = 1
-    return all_players
-
-def determine_winner_straight(hands, all_players, potential_winner_index):
-    '''
-    Find out who wins in the situation of having players all having a straight or straight flush
-    Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players which all have a straight or straight flush
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
-    Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-    '''
-    highest_ranks = []
-    for hand in hands:
-        highest_rank = hand.STRING_TO_RANK[hand.best_five[-1][1]]  # cards are sorted in ascending order
-        highest_ranks.append(highest_rank)
-    max_highest_rank = max(highest_ranks)
-    for i_player in range(len(highest_ranks)):
-        if highest_ranks[i_player] == max_highest_rank:
-            all_players[potential_winner_index[i_player]] = 1
-    return all_players
-
-def determine_winner_four_of_a_kind(hands, all_players, potential_winner_index):
-    '''
-    Find out who wins in the situation of having players which all have a four of a kind
-    Args:
-        key_index(int): the position of a card in a sorted handcard
-        hands(list): cards of those players with a four of a kind
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        all_players(list): all the players in this round, 0 for losing and 1 for winning or draw
-        potential_winner_index(list): the positions of those players with same highest hand_catagory in all_players
-    Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-    '''
-    ranks = []
-    for hand in hands:
-        rank_1 = hand.STRING_TO_RANK[hand.best_five[-1][1]]  # rank of the four of a kind
-        rank_2 = hand.STRING_TO_RANK[hand.best_five[0][1]]  # rank of the kicker
-        ranks.append((rank_1, rank_2))
-    max_rank = max(ranks)
-    for i, rank in enumerate(ranks):
-        if rank == max_rank:
-            all_players[potential_winner_index[i]] = 1
-    return all_players
-
 def compare_hands(hands):
     '''
     Compare all palyer's all seven cards
     Args:
-        hands(list): cards of those players with same highest hand_catagory.
+        hands(list): cards of those players, None for the players who folded.
         e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
+        Cards can also be given as integer card codes, see evaluator.py
     Returns:
         [0, 1, 0]: player1 wins
         [1, 0, 0]: player0 wins
         [1, 1, 1]: draw
         [1, 1, 0]: player1 and player0 draws
-
-    if hands[0] == None:
-        return [0, 1]
-    elif hands[1] == None:
-        return [1, 0]
     '''
-    hand_category = [] #such as high_card, straight_flush, etc
-    all_players = [0]*len(hands) #all the players in this round, 0 for losing and 1 for winning or draw
-    if None in hands:
-        fold_players = [i for i, j in enumerate(hands) if j is None]
-        if len(fold_players) == len(all_players) - 1:
-            for _ in enumerate(hands):
-                if _[0] in fold_players:
-                    all_players[_[0]] = 0
-                else:
-                    all_players[_[0]] = 1
-            return all_players
-        else:
-            for _ in enumerate(hands):
-                if hands[_[0]] is not None:
-                    hand = Hand(hands[_[0]])
-                    hand.evaluateHand()
-                    hand_category.append(hand.category)
-                elif hands[_[0]] is None:
-                    hand_category.append(0)
-    else:
-            for i in enumerate(hands):
-                hand = Hand(hands[i[0]])
-                hand.evaluateHand()
-                hand_category.append(hand.category)
-    potential_winner_index = [i for i, j in enumerate(hand_category) if j == max(hand_category)]# potential winner are those with same max card_catagory
-
-    return final_compare(hands, potential_winner_index, all_players)
-
-def final_compare(hands, potential_winner_index, all_players):
+    if sum(hand is not None for hand in hands) == 1:
+        return [1 if hand is not None else 0 for hand in hands]
+    return get_winners([evaluate_hand(hand) if hand is not None else 0 for hand in hands])
+
+def get_winners(strengths):
     '''
-    Find out the winners from those who didn't fold
+    Find out the winners from the hand strengths
     Args:
-        hands(list): cards of those players with same highest hand_catagory.
-        e.g. hands = [['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CJ', 'SJ', 'H9', 'B9', 'C2', 'C8', 'C7'], ['CT', 'ST', 'H9', 'B9', 'C2', 'C8', 'C7']]
-        potential_winner_index(list): index of those with same max card_catagory in all_players
-        all_players(list): a list of all the player's win/lose situation, 0 for lose and 1 for win
+        strengths(list): strength of each player's hand as returned by evaluate_hand, 0 for the players who folded
     Returns:
-        [0, 1, 0]: player1 wins
-        [1, 0, 0]: player0 wins
-        [1, 1, 1]: draw
-        [1, 1, 0]: player1 and player0 draws
-
-    if hands[0] == None:
-        return [0, 1]
-    elif hands[1] == None:
-        return [1, 0]
+        (list): 1 if the player is among the winners and 0 otherwise
     '''
-    if len(potential_winner_index) == 1:
-        all_players[potential_winner_index[0]] = 1
-        return all_players
-    elif len(potential_winner_index) > 1:
-        # compare when having equal max categories
-        equal_hands = []
-        for _ in potential_winner_index:
-            hand = Hand(hands[_])
-            hand.evaluateHand()
-            equal_hands.append(hand)
-        hand = equal_hands[0]
-        if hand.category == 8:
-            return determine_winner_four_of_a_kind(equal_hands, all_players, potential_winner_index)
-        if hand.category == 7:
-            return determine_winner([2, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 4:
-            return determine_winner([2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 3:
-            return determine_winner([4, 2, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 2:
-            return determine_winner([4, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category == 1 or hand.category == 6:
-            return determine_winner([4, 3, 2, 1, 0], equal_hands, all_players, potential_winner_index)
-        if hand.category in [5, 9]:
-            return determine_winner_straight(equal_hands, all_players, potential_winner_index)
+    best = max(strengths)
+    return [1 if strength == best else 0 for strength in strengths]
@@ -0,0 +1,255 @@
+''' Many no limit holdem tables stepped together
+
+BatchNolimitholdemGame holds N independent tables in struct-of-arrays form:
+every field of FlatNolimitholdemState becomes an array with one row per
+table, and a step applies one action per table with array operations instead
+of a Python loop. Finished tables are settled and dealt a new hand in the same
+call, so that the batch can be stepped forever. The betting rules are the ones
+of FlatNolimitholdemState, which can be used to cross-check single tables
+through get_table.
+'''
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import NUM_CARDS, cards_to_mask
+from rlcard_fork.games.limitholdem.evaluator import evaluate_batch
+from rlcard_fork.games.limitholdem.judger import settle_pots
+from rlcard_fork.games.nolimitholdem.flat_state import (
+    ALIVE,
+    ALLIN,
+    FOLDED,
+    NUM_REVEALED,
+    SHOWDOWN,
+    FlatNolimitholdemState,
+)
+from rlcard_fork.games.nolimitholdem.round import Action
+from rlcard_fork.utils import seeding
+
+NUM_ACTIONS = len(Action)
+# Same layout as the observation of NolimitholdemEnv: cards, my chips, max chips
+OBS_SIZE = NUM_CARDS + 2
+
+_FOLD, _CHECK, _CALL, _BET, _RAISE = (action.value for action in Action)
+_NUM_REVEALED = np.array(NUM_REVEALED)
+
+
+class BatchNolimitholdemGame:
+    ''' N tables of no limit holdem with the same number of players and stacks
+    '''
+
+    def __init__(self, num_tables, num_players=2, small_blind=1, big_blind=2, effective_stack=100, seed=None):
+        ''' Create the tables, call init_game to deal the first hands
+
+        Args:
+            num_tables (int): The number of tables
+            num_players (int): The number of players at each table
+            small_blind (int): The small blind, posted by player 0
+            big_blind (int): The big blind, posted by player 1
+            effective_stack (int): The chips of each player at the start of each hand
+            seed (int): Seed of the random state dealing the cards
+        '''
+        self.num_tables = num_tables
+        self.num_players = num_players
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.effective_stack = effective_stack
+        self.np_random, _ = seeding.np_random(seed)
+
+        shape = (num_tables, num_players)
+        self.stacks = np.zeros(shape, dtype=np.int64)
+        self.in_chips = np.zeros(shape, dtype=np.int64)
+        self.raised = np.zeros(shape, dtype=np.int64)
+        self.status = np.zeros(shape, dtype=np.int8)
+        self.hands = np.zeros(shape + (2,), dtype=np.int8)
+        self.board = np.zeros((num_tables, 5), dtype=np.int8)
+        self.game_pointer = np.zeros(num_tables, dtype=np.int64)
+        self.street = np.zeros(num_tables, dtype=np.int64)
+        self.not_raise_num = np.zeros(num_tables, dtype=np.int64)
+        self.not_playing_num = np.zeros(num_tables, dtype=np.int64)
+        # Number of hands finished at each table
+        self.hand_counts = np.zeros(num_tables, dtype=np.int64)
+        self._rows = np.arange(num_tables)
+
+    def init_game(self):
+        ''' Deal a new hand at every table
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): The observations of the players to act, shape (tables, 54)
+                (numpy.array): The legal action masks, shape (tables, number of actions)
+                (numpy.array): The players to act, shape (tables,)
+        '''
+        self.hand_counts[:] = 0
+        self._reset(self._rows)
+        return self.get_observations(), self.get_legal_masks(), self.game_pointer.copy()
+
+    def _reset(self, rows):
+        num_rows = len(rows)
+        self.stacks[rows] = self.effective_stack
+        self.in_chips[rows] = 0
+        self.status[rows] = ALIVE
+        self.street[rows] = 0
+        self.not_raise_num[rows] = 0
+        self.not_playing_num[rows] = 0
+
+        # A random permutation of the deck for each table
+        num_dealt = 2 * self.num_players + 5
+        cards = np.argsort(self.np_random.random_sample((num_rows, NUM_CARDS)), axis=1)[:, :num_dealt]
+        self.hands[rows] = cards[:, :2 * self.num_players].reshape(num_rows, self.num_players, 2)
+        self.board[rows] = cards[:, 2 * self.num_players:]
+
+        for player, blind in ((0, self.small_blind), (1, self.big_blind)):
+            quantity = np.minimum(blind, self.stacks[rows, player])
+            self.in_chips[rows, player] += quantity
+            self.stacks[rows, player] -= quantity
+        self.raised[rows] = self.in_chips[rows]
+        # Heads up the button acts first, otherwise the player after the big blind
+        self.game_pointer[rows] = 1 if self.num_players == 2 else 2
+
+    def get_legal_masks(self):
+        ''' Get the legal actions of the players to act, as NolimitholdemRound does
+
+        Returns:
+            (numpy.array): Boolean masks indexed by Action value, shape (tables, number of actions)
+        '''
+        facing_bet = self.raised.max(axis=1) > 0
+        masks = np.zeros((self.num_tables, NUM_ACTIONS), dtype=bool)
+        masks[:, _FOLD] = True
+        masks[:, _CHECK] = ~facing_bet
+        masks[:, _BET] = ~facing_bet
+        masks[:, _CALL] = facing_bet
+        masks[:, _RAISE] = facing_bet
+        return masks
+
+    def get_observations(self):
+        ''' Get the observations of the players to act, encoded as in NolimitholdemEnv
+
+        Returns:
+            (numpy.array): Revealed board and hole cards one-hot, then the chips of the
+                player and the most chips of a player, shape (tables, 54)
+        '''
+        obs = np.zeros((self.num_tables, OBS_SIZE))
+        hands = self.hands[self._rows, self.game_pointer]
+        obs[self._rows[:, None], hands] = 1
+        revealed = np.arange(5) < _NUM_REVEALED[self.street][:, None]
+        rows, columns = np.nonzero(revealed)
+        obs[rows, self.board[rows, columns]] = 1
+        obs[:, NUM_CARDS] = self.in_chips[self._rows, self.game_pointer]
+        obs[:, NUM_CARDS + 1] = self.in_chips.max(axis=1)
+        return obs
+
+    def get_table(self, table):
+        ''' Get one table as a FlatNolimitholdemState, e.g. to cross-check it
+
+        Args:
+            table (int): The index of the table
+
+        Returns:
+            (FlatNolimitholdemState): An independent copy of the table
+        '''
+        state = FlatNolimitholdemState.__new__(FlatNolimitholdemState)
+        state.num_players = self.num_players
+        state.small_blind = self.small_blind
+        state.big_blind = self.big_blind
+        for name in ('stacks', 'in_chips', 'raised', 'status', 'hands', 'board'):
+            setattr(state, name, getattr(self, name)[table].copy())
+        for name in ('game_pointer', 'street', 'not_raise_num', 'not_playing_num'):
+            setattr(state, name, int(getattr(self, name)[table]))
+        state.board_mask = cards_to_mask(state.get_public_cards())
+        return state
+
+    def is_over(self):
+        ''' Check which tables have finished their hand
+
+        Returns:
+            (numpy.array): Boolean array, True where all players but one folded or the showdown is reached
+        '''
+        return ((self.status != FOLDED).sum(axis=1) == 1) | (self.street == SHOWDOWN)
+
+    def step(self, actions, sizes=None):
+        ''' Apply one action at every table, then settle and deal again the finished tables
+
+        Args:
+            actions (numpy.array): The Action value played at each table, shape (tables,)
+            sizes (numpy.array): The chips added at the tables that bet or raise, shape (tables,)
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): The observations of the players to act, shape (tables, 54)
+                (numpy.array): The legal action masks, shape (tables, number of actions)
+                (numpy.array): The players to act, shape (tables,)
+                (numpy.array): The payoffs of the hands finished by this step, zero at the
+                    other tables, shape (tables, players)
+                (numpy.array): Boolean array, True at the tables whose hand finished and
+                    that were dealt a new one
+        '''
+        actions = np.asarray(actions, dtype=np.int64)
+        sizes = np.zeros(self.num_tables, dtype=np.int64) if sizes is None else np.asarray(sizes, dtype=np.int64)
+        legal = self.get_legal_masks()[self._rows, actions]
+        if not legal.all():
+            raise ValueError('Action not allowed at tables {}'.format(np.flatnonzero(~legal).tolist()))
+
+        rows, pointer = self._rows, self.game_pointer
+        is_call = actions == _CALL
+        is_bet = (actions == _BET) | (actions == _RAISE)
+        is_fold = actions == _FOLD
+
+        raised = self.raised[rows, pointer]
+        added = np.where(is_call, self.raised.max(axis=1) - raised, np.where(is_bet, sizes, 0))
+        self.raised[rows, pointer] = raised + added
+        quantity = np.minimum(added, self.stacks[rows, pointer])
+        self.in_chips[rows, pointer] += quantity
+        self.stacks[rows, pointer] -= quantity
+        self.not_raise_num = np.where(is_bet, 1, self.not_raise_num + ((actions == _CHECK) | is_call))
+        self.status[rows[is_fold], pointer[is_fold]] = FOLDED
+        self.not_playing_num += is_fold
+
+        all_in = (self.stacks[rows, pointer] == 0) & (self.status[rows, pointer] == ALIVE)
+        self.status[rows[all_in], pointer[all_in]] = ALLIN
+        self.not_playing_num += all_in
+        self.not_raise_num -= all_in
+
+        # Skip the players who can not act anymore
+        candidates = (pointer[:, None] + np.arange(1, self.num_players + 1)) % self.num_players
+        can_act = self.status[rows[:, None], candidates] == ALIVE
+        self.game_pointer = np.where(can_act.any(axis=1), candidates[rows, np.argmax(can_act, axis=1)], pointer)
+
+        ended = np.flatnonzero(self.not_raise_num + self.not_playing_num >= self.num_players)
+        if len(ended) > 0:
+            self._end_rounds(ended)
+
+        done = self.is_over()
+        payoffs = np.zeros((self.num_tables, self.num_players), dtype=np.int64)
+        finished = np.flatnonzero(done)
+        if len(finished) > 0:
+            payoffs[finished] = self._settle(finished)
+            self.hand_counts[finished] += 1
+            self._reset(finished)
+        return self.get_observations(), self.get_legal_masks(), self.game_pointer.copy(), payoffs, done
+
+    def _end_rounds(self, rows):
+        in_bypass = self.status[rows] != ALIVE
+        raised = self.raised[rows]
+        # If the last player who can act has put enough chips, he is also bypassed
+        last_player = np.argmin(in_bypass, axis=1)
+        enough = raised[np.arange(len(rows)), last_player] >= raised.max(axis=1)
+        lone = np.flatnonzero((self.num_players - in_bypass.sum(axis=1) == 1) & enough)
+        in_bypass[lone, last_player[lone]] = True
+        self.game_pointer[rows] = np.argmin(in_bypass, axis=1)
+
+        # Move on at the tables where at least two players are left, all at once if nobody can bet anymore
+        going_on = (self.status[rows] != FOLDED).sum(axis=1) > 1
+        can_bet = (~in_bypass[going_on]).sum(axis=1) > 1
+        rows = rows[going_on]
+        self.street[rows] = np.where(can_bet, np.minimum(self.street[rows] + 1, SHOWDOWN), SHOWDOWN)
+        self.raised[rows] = 0
+        self.not_raise_num[rows] = 0
+
+    def _settle(self, rows):
+        live = self.status[rows] != FOLDED
+        cards = np.concatenate([self.hands[rows], np.repeat(self.board[rows, None, :], self.num_players, axis=1)], axis=2)
+        strengths = evaluate_batch(cards.reshape(-1, 7)).reshape(len(rows), self.num_players)
+        # A hand won by folds is not shown down
+        strengths = np.where(live.sum(axis=1, keepdims=True) == 1, 0, strengths)
+        return settle_pots(self.in_chips[rows], np.where(live, strengths, -1), self.np_random)
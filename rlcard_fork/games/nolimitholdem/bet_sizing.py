@@ -0,0 +1,172 @@
+''' Bet size abstraction of no limit holdem
+
+A no limit game lets a player bet any number of chips, which makes the action
+space unbounded. A SizingTree lists the bet sizes allowed on each street and
+at each raise depth (the number of bets and raises already made in the
+betting round), as fractions of the pot, plus all-in. After the last listed
+depth only calling or folding is allowed, so the number of actions at every
+node, and the depth of the tree, are known in advance.
+
+Bets of the opponents that are not in the abstraction are mapped back to the
+two closest abstract actions with the pseudo-harmonic mapping of Ganzfried and
+Sandholm, which randomizes between them so that the mapping can not be easily
+exploited.
+'''
+from collections import namedtuple
+
+import numpy as np
+
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.round import Action
+
+# An action of the abstraction, size is the number of chips added by the player, None for a fold
+AbstractAction = namedtuple('AbstractAction', ['action', 'size'])
+
+STREETS = ('preflop', 'flop', 'turn', 'river')
+
+# Pot fractions of the bets at each raise depth, a bet then a raise on every street
+DEFAULT_SIZING = {
+    'preflop': [[0.75, 1.5], [1.0], [1.0]],
+    'flop': [[0.33, 0.75, 1.5], [0.75]],
+    'turn': [[0.5, 1.0], [0.75]],
+    'river': [[0.5, 1.0, 1.5], [0.75]],
+}
+
+
+def pseudo_harmonic_mapping(x, a, b):
+    ''' Probability of mapping a bet onto the smaller of two abstract bets
+
+    Args:
+        x (float): The observed bet, as a fraction of the pot
+        a (float): The smaller abstract bet, as a fraction of the pot
+        b (float): The larger abstract bet, as a fraction of the pot
+
+    Returns:
+        (float): The probability of playing as if a had been bet, b gets the rest
+    '''
+    return (b - x) * (1 + a) / ((b - a) * (1 + x))
+
+
+class SizingTree:
+    ''' Discrete bet sizes of each street and raise depth
+    '''
+
+    def __init__(self, sizing=None, allin=True):
+        ''' Build the abstraction
+
+        Args:
+            sizing (dict): For each street name of STREETS, a list with one list of
+                pot fractions per raise depth. Missing streets allow no bet
+            allin (boolean): Whether going all-in is allowed at every depth that allows a bet
+        '''
+        sizing = DEFAULT_SIZING if sizing is None else sizing
+        unknown = set(sizing) - set(STREETS)
+        if unknown:
+            raise ValueError('Unknown streets {}, expected some of {}'.format(sorted(unknown), STREETS))
+        self.fractions = []
+        for street in STREETS:
+            levels = [sorted(float(fraction) for fraction in level) for level in sizing.get(street, [])]
+            if any(fraction <= 0 for level in levels for fraction in level):
+                raise ValueError('Pot fractions must be positive')
+            self.fractions.append(levels)
+        self.allin = allin
+
+    def max_raises(self, street):
+        ''' Get the number of bets and raises allowed in a betting round
+
+        Args:
+            street (int): The street, 0 for preflop to 3 for the river
+
+        Returns:
+            (int): The number of raise depths of the street
+        '''
+        return len(self.fractions[street])
+
+    def max_actions(self, street):
+        ''' Get the largest number of abstract actions at a node of a street
+        '''
+        widths = [len(level) for level in self.fractions[street]] or [0]
+        return 2 + max(widths) + int(self.allin)
+
+    def get_bet_sizes(self, state, depth):
+        ''' Get the chips a player may add by betting or raising
+
+        Args:
+            state (FlatNolimitholdemState): The state, with the player to act
+            depth (int): The number of bets and raises already made in the betting round
+
+        Returns:
+            (list): The sorted distinct numbers of chips, all-in included
+        '''
+        levels = self.fractions[min(state.street, len(self.fractions) - 1)]
+        if depth >= len(levels):
+            return []
+        player = state.game_pointer
+        to_call = int(state.raised.max() - state.raised[player])
+        stack = int(state.stacks[player])
+        if stack <= to_call:
+            return []
+        # A raise adds the call then a fraction of the pot after the call, at least a big blind or the last bet
+        pot = state.get_pot() + to_call
+        min_size = to_call + max(state.big_blind, to_call)
+        sizes = {min(stack, max(min_size, to_call + int(round(fraction * pot)))) for fraction in levels[depth]}
+        if self.allin:
+            sizes.add(stack)
+        return sorted(sizes)
+
+    def get_actions(self, state, depth):
+        ''' Get the abstract actions of the player to act
+
+        Folding is left out when checking is free.
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): The state, with the player to act
+            depth (int): The number of bets and raises already made in the betting round
+
+        Returns:
+            (list): The AbstractAction, fold first, then check or call, then bets by increasing size
+        '''
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        legal_actions = state.get_legal_actions()
+        to_call = int(state.raised.max() - state.raised[state.game_pointer])
+        bet = Action.BET if Action.BET in legal_actions else Action.RAISE
+        actions = []
+        if to_call > 0:
+            actions.append(AbstractAction(Action.FOLD, None))
+        if Action.CHECK in legal_actions:
+            actions.append(AbstractAction(Action.CHECK, 0))
+        else:
+            actions.append(AbstractAction(Action.CALL, min(to_call, int(state.stacks[state.game_pointer]))))
+        actions.extend(AbstractAction(bet, size) for size in self.get_bet_sizes(state, depth))
+        return actions
+
+    def translate(self, state, depth, size):
+        ''' Map a bet or raise of any size onto the abstract actions
+
+        The bet is compared to the abstract bets, and to checking or calling, as
+        fractions of the pot after the call, and split between the two closest
+        ones with pseudo_harmonic_mapping.
+
+        Args:
+            state (FlatNolimitholdemState or NolimitholdemGame): The state before the bet
+            depth (int): The number of bets and raises already made in the betting round
+            size (int): The chips added by the player
+
+        Returns:
+            (list): Pairs of AbstractAction and probability, one or two of them
+        '''
+        if not isinstance(state, FlatNolimitholdemState):
+            state = FlatNolimitholdemState.from_game(state)
+        actions = [action for action in self.get_actions(state, depth) if action.action != Action.FOLD]
+        to_call = actions[0].size
+        pot = state.get_pot() + to_call
+        fractions = np.array([(action.size - to_call) / pot for action in actions])
+        x = (size - to_call) / pot
+        upper = int(np.searchsorted(fractions, x))
+        if upper == len(actions):
+            return [(actions[-1], 1.0)]
+        if upper == 0 or fractions[upper] == x:
+            return [(actions[upper], 1.0)]
+        probability = pseudo_harmonic_mapping(x, fractions[upper - 1], fractions[upper])
+        return [(actions[upper - 1], probability), (actions[upper], 1.0 - probability)]
@@ -0,0 +1,215 @@
+''' Hero equity against random or known hands
+
+The equity is the expected share of the pot the hero wins at showdown, ties
+being split. It is computed exactly by enumerating every runout (and every
+hand of a random opponent) when that takes at most `max_exact_evaluations`
+hand evaluations, and estimated with seeded Monte Carlo sampling otherwise.
+'''
+import itertools
+import math
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem import PlayerStatus
+from rlcard_fork.games.limitholdem.card import NUM_CARDS, cards_to_mask
+from rlcard_fork.games.limitholdem.evaluator import evaluate_batch, evaluate_boards
+from rlcard_fork.utils import seeding
+
+MAX_EXACT_EVALUATIONS = 2000000
+
+
+def calculate_equity(hero_hand,
+                     board=(),
+                     villain_hands=(),
+                     num_random_villains=1,
+                     dead_cards=(),
+                     max_exact_evaluations=MAX_EXACT_EVALUATIONS,
+                     confidence=0.95,
+                     ci_half_width=0.005,
+                     max_samples=200000,
+                     seed=None):
+    ''' Compute the equity of the hero against some known and some random hands
+
+    Args:
+        hero_hand (list): The two card codes of the hero
+        board (list): The public card codes, 0 to 5 of them
+        villain_hands (list): Known hands of opponents, two card codes each
+        num_random_villains (int): Number of opponents holding random hands
+        dead_cards (list): Card codes that can not be dealt anymore
+        max_exact_evaluations (int): Enumerate exactly up to this many hand evaluations
+        confidence (float): Confidence level of the Monte Carlo interval
+        ci_half_width (float): Sample until the half width of the interval is below this value
+        max_samples (int): Maximum number of Monte Carlo samples
+        seed (int): Seed of the Monte Carlo sampling
+
+    Returns:
+        (dict): The 'equity', the probabilities to 'win' alone and to 'tie' for the best
+            hand, the 'ci_half_width' of the equity (0 when exact), the number of
+            'samples' (runouts) and whether the result is 'exact'
+    '''
+    hero_hand = list(hero_hand)
+    board = list(board)
+    villain_hands = [list(hand) for hand in villain_hands]
+    used = hero_hand + board + [card for hand in villain_hands for card in hand] + list(dead_cards)
+    used_mask = cards_to_mask(used)
+    if len(hero_hand) != 2 or len(board) > 5 or bin(used_mask).count('1') != len(used):
+        raise ValueError('Invalid or duplicated cards')
+    if len(villain_hands) + num_random_villains == 0:
+        raise ValueError('There must be at least one opponent')
+    deck = [card for card in range(NUM_CARDS) if not used_mask >> card & 1]
+    num_missing = 5 - len(board)
+    if num_missing + 2 * num_random_villains > len(deck):
+        raise ValueError('Not enough cards left in the deck')
+
+    if num_random_villains <= 1:
+        num_hands = 1 + len(villain_hands) + (_comb(len(deck), 2) if num_random_villains else 0)
+        if _comb(len(deck), num_missing) * num_hands <= max_exact_evaluations:
+            return _exact_equity(hero_hand, board, villain_hands, num_random_villains, deck)
+    return _monte_carlo_equity(hero_hand, board, villain_hands, num_random_villains, deck,
+                               confidence, ci_half_width, max_samples, seed)
+
+
+def game_equity(game, villain_hands=None, **kwargs):
+    ''' Compute the equity of the hero in a NolimitholdemGame
+
+    The cards that have been removed from game.deck and are neither the hero's
+    nor public cards are dead. Opponents without a known hand hold random hands.
+
+    Args:
+        game (NolimitholdemGame): The game, with the hero's hand set
+        villain_hands (dict): Known hands by player id, optional
+        kwargs: Other arguments of calculate_equity
+
+    Returns:
+        (dict): See calculate_equity
+    '''
+    villain_hands = villain_hands or {}
+    hero = game.hero()
+    in_hand = [player for player in game.players
+               if player is not hero and player.status in (PlayerStatus.ALIVE, PlayerStatus.ALLIN)]
+    known = [villain_hands[player.player_id] for player in in_hand if player.player_id in villain_hands]
+    deck_mask = cards_to_mask(game.deck)
+    seen_mask = cards_to_mask(hero.hand + game.public_cards + [card for hand in known for card in hand])
+    dead_cards = [card for card in range(NUM_CARDS) if not (deck_mask | seen_mask) >> card & 1]
+    return calculate_equity(hero.hand, game.public_cards, known, len(in_hand) - len(known), dead_cards, **kwargs)
+
+
+def _shares(hero, others):
+    ''' Share of the pot of the hero for each runout
+
+    Args:
+        hero (numpy.array): Strength of the hero for each runout
+        others (numpy.array): Strengths of the opponents, the last axis is the opponent
+
+    Returns:
+        (tuple): The share of the hero, whether the hero won alone and whether
+            the hero tied for the best hand, for each runout
+    '''
+    best_other = others.max(axis=-1)
+    wins = hero > best_other
+    ties = hero == best_other
+    shares = np.where(wins, 1.0, 0.0)
+    shares[ties] = 1.0 / (1 + (others == hero[..., None]).sum(axis=-1)[ties])
+    return shares, wins, ties
+
+
+def _exact_equity(hero_hand, board, villain_hands, num_random_villains, deck):
+    ''' Enumerate every runout, and every hand of the random opponent if any
+    '''
+    runouts = list(itertools.combinations(deck, 5 - len(board)))
+    runouts = np.array(runouts, dtype=np.int8).reshape(len(runouts), 5 - len(board))
+    boards = np.hstack([np.tile(np.array(board, dtype=np.int8), (len(runouts), 1)), runouts])
+    hands = np.array([hero_hand] + villain_hands, dtype=np.int8).reshape(-1, 2)
+    strengths = evaluate_boards(boards, hands)
+    hero, known = strengths[:, 0], strengths[:, 1:]
+
+    if num_random_villains == 0:
+        shares, wins, ties = _shares(hero, known)
+        return _result(shares.mean(), wins.mean(), ties.mean(), 0.0, len(boards), True)
+
+    random_hands = np.array(list(itertools.combinations(deck, 2)), dtype=np.int8)
+    random_strengths = evaluate_boards(boards, random_hands)
+    # A random hand can not hold a card of the runout
+    runout_masks = _masks(runouts)
+    valid = (runout_masks[:, None] & _masks(random_hands)[None, :]) == 0
+    # (runouts, random hands, opponents)
+    others = np.concatenate([np.broadcast_to(known[:, None, :], valid.shape + known.shape[1:]),
+                             random_strengths[:, :, None]], axis=2)
+    shares, wins, ties = _shares(np.broadcast_to(hero[:, None], valid.shape), others)
+    num_valid = valid.sum()
+    return _result(shares[valid].sum() / num_valid, wins[valid].sum() / num_valid,
+                   ties[valid].sum() / num_valid, 0.0, len(boards), True)
+
+
+def _monte_carlo_equity(hero_hand, board, villain_hands, num_random_villains, deck,
+                        confidence, ci_half_width, max_samples, seed):
+    ''' Sample runouts and random hands by batches until the interval is small enough
+    '''
+    np_random, _ = seeding.np_random(seed)
+    z = _normal_quantile((1 + confidence) / 2)
+    deck = np.array(deck, dtype=np.int8)
+    num_missing = 5 - len(board)
+    num_drawn = num_missing + 2 * num_random_villains
+    board = np.array(board, dtype=np.int8)
+    known = [np.array(hand, dtype=np.int8) for hand in [hero_hand] + villain_hands]
+
+    batch_size = 5000
+    num_samples, share_sum, share_square_sum, win_sum, tie_sum = 0, 0.0, 0.0, 0, 0
+    half_width = np.inf
+    while num_samples < max_samples and half_width > ci_half_width:
+        batch_size = min(batch_size, max_samples - num_samples)
+        # The first cards of a random permutation of the deck, for every sample
+        drawn = deck[np_random.random_sample((batch_size, len(deck))).argsort(axis=1)[:, :num_drawn]]
+        boards = np.hstack([np.tile(board, (batch_size, 1)), drawn[:, :num_missing]])
+        hands = [np.tile(hand, (batch_size, 1)) for hand in known]
+        hands += [drawn[:, num_missing + 2 * i:num_missing + 2 * i + 2] for i in range(num_random_villains)]
+        strengths = np.stack([evaluate_batch(np.hstack([boards, hand])) for hand in hands], axis=1)
+        shares, wins, ties = _shares(strengths[:, 0], strengths[:, 1:])
+
+        num_samples += batch_size
+        share_sum += shares.sum()
+        share_square_sum += np.square(shares).sum()
+        win_sum += wins.sum()
+        tie_sum += ties.sum()
+        mean = share_sum / num_samples
+        variance = max(share_square_sum / num_samples - mean * mean, 0.0)
+        half_width = z * np.sqrt(variance / num_samples)
+    return _result(share_sum / num_samples, win_sum / num_samples, tie_sum / num_samples,
+                   half_width, num_samples, False)
+
+
+def _comb(n, k):
+    ''' n choose k, math.comb needs Python 3.8
+    '''
+    return math.factorial(n) // (math.factorial(k) * math.factorial(n - k))
+
+
+def _normal_quantile(p):
+    ''' Inverse of the standard normal distribution function, by bisection on math.erf
+        (statistics.NormalDist needs Python 3.8)
+    '''
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if 0.5 * (1 + math.erf(middle / math.sqrt(2))) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def _masks(cards):
+    ''' 64 bit masks of the rows of an array of card codes
+    '''
+    return np.bitwise_or.reduce(np.left_shift(np.uint64(1), cards.astype(np.uint64)), axis=1)
+
+
+def _result(equity, win, tie, half_width, samples, exact):
+    return {
+        'equity': float(equity),
+        'win': float(win),
+        'tie': float(tie),
+        'ci_half_width': float(half_width),
+        'samples': int(samples),
+        'exact': exact,
+    }
@@ -0,0 +1,320 @@
+''' Compact array-backed state of a no limit holdem hand
+
+FlatNolimitholdemState keeps a whole hand in a few small NumPy arrays and
+integers instead of Player and Round objects, so that it can be cloned,
+hashed and stacked into batches cheaply during rollouts. It follows the
+betting rules of NolimitholdemGame and NolimitholdemRound, except that the
+players who are all-in are skipped instead of being asked to act again. When
+a betting round is over it also moves on to the next street, revealing the
+next cards of the board, until the showdown.
+'''
+import numpy as np
+
+from rlcard_fork.games.limitholdem import PlayerStatus
+from rlcard_fork.games.limitholdem.card import NUM_CARDS, cards_to_mask
+from rlcard_fork.games.limitholdem.evaluator import evaluate_batch
+from rlcard_fork.games.limitholdem.judger import settle_pots
+from rlcard_fork.games.nolimitholdem.round import Action
+
+ALIVE = PlayerStatus.ALIVE.value
+FOLDED = PlayerStatus.FOLDED.value
+ALLIN = PlayerStatus.ALLIN.value
+
+SHOWDOWN = 4
+# Number of board cards revealed on each street, preflop to showdown
+NUM_REVEALED = (0, 3, 4, 5, 5)
+
+
+class FlatNolimitholdemState:
+    ''' Betting state of one no limit holdem hand
+    '''
+    __slots__ = ('num_players', 'small_blind', 'big_blind', 'stacks', 'in_chips', 'raised', 'status',
+                 'hands', 'board', 'board_mask', 'game_pointer', 'street', 'not_raise_num', 'not_playing_num')
+
+    def __init__(self, stacks, small_blind=1, big_blind=2, hands=None, board=None, np_random=None):
+        ''' Start a hand and post the blinds
+
+        Args:
+            stacks (list): The chips of each player before the blinds
+            small_blind (int): The small blind, posted by player 0
+            big_blind (int): The big blind, posted by player 1
+            hands (numpy.array): The hole card codes of each player, shape (players, 2), dealt if None
+            board (list): The five board card codes revealed street by street, dealt if None
+            np_random (numpy.random.RandomState): Random state to deal the missing cards
+        '''
+        self.num_players = len(stacks)
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.stacks = np.array(stacks, dtype=np.int64)
+        self.in_chips = np.zeros(self.num_players, dtype=np.int64)
+        self.raised = np.zeros(self.num_players, dtype=np.int64)
+        self.status = np.full(self.num_players, ALIVE, dtype=np.int8)
+        self.street = 0
+        self.not_raise_num = 0
+        self.not_playing_num = 0
+        self.board_mask = 0
+
+        if hands is None or board is None:
+            np_random = np_random or np.random.RandomState()
+            used = [] if hands is None else np.asarray(hands).ravel().tolist()
+            used += [] if board is None else list(board)
+            deck = np.array([card for card in range(NUM_CARDS) if card not in used], dtype=np.int8)
+            deck = deck[np_random.permutation(len(deck))]
+            if hands is None:
+                hands, deck = deck[:2 * self.num_players].reshape(self.num_players, 2), deck[2 * self.num_players:]
+            if board is None:
+                board = deck[:5]
+        self.hands = np.array(hands, dtype=np.int8).reshape(self.num_players, 2)
+        self.board = np.array(board, dtype=np.int8)
+
+        self._bet(0, small_blind)
+        self._bet(1, big_blind)
+        self.raised[:] = self.in_chips
+        # Heads up the button acts first, otherwise the player after the big blind
+        self.game_pointer = 1 if self.num_players == 2 else 2
+
+    @classmethod
+    def from_game(cls, game):
+        ''' Build the state of a NolimitholdemGame in progress
+
+        Args:
+            game (NolimitholdemGame): A game after init_game, with the hands of the players set
+
+        Returns:
+            (FlatNolimitholdemState): The state, the missing board cards are left as -1
+        '''
+        state = cls.__new__(cls)
+        state.num_players = game.num_players
+        state.small_blind = game.small_blind
+        state.big_blind = game.big_blind
+        state.stacks = np.array([p.remained_chips for p in game.players], dtype=np.int64)
+        state.in_chips = np.array([p.in_chips for p in game.players], dtype=np.int64)
+        state.raised = np.array(game.round.raised, dtype=np.int64)
+        state.status = np.array([p.status.value for p in game.players], dtype=np.int8)
+        state.hands = np.array([p.hand if len(p.hand) == 2 else [-1, -1] for p in game.players], dtype=np.int8)
+        state.board = np.array(list(game.public_cards) + [-1] * (5 - len(game.public_cards)), dtype=np.int8)
+        state.board_mask = cards_to_mask(game.public_cards)
+        state.game_pointer = game.game_pointer
+        state.street = min(game.round_counter, SHOWDOWN)
+        state.not_raise_num = game.round.not_raise_num
+        state.not_playing_num = game.round.not_playing_num
+        return state
+
+    @classmethod
+    def from_spot(cls, stacks, in_chips, board=(), folded=(), small_blind=1, big_blind=2, hands=None):
+        ''' Build the state at the start of the betting round of a street
+
+        Args:
+            stacks (list): The chips left to each player
+            in_chips (list): The chips each player has put in the pot
+            board (list): The board card codes, 0, 3, 4 or 5 of them, which give the street
+            folded (list): The players who have folded
+            small_blind (int): The small blind
+            big_blind (int): The big blind
+            hands (numpy.array): The hole card codes of each player, unknown (-1) if None
+
+        Returns:
+            (FlatNolimitholdemState): The state, with the first player who can act to act
+        '''
+        if len(board) not in (0, 3, 4, 5):
+            raise ValueError('A board has 0, 3, 4 or 5 cards')
+        state = cls.__new__(cls)
+        state.num_players = len(stacks)
+        state.small_blind = small_blind
+        state.big_blind = big_blind
+        state.stacks = np.array(stacks, dtype=np.int64)
+        state.in_chips = np.array(in_chips, dtype=np.int64)
+        state.status = np.where(state.stacks == 0, ALLIN, ALIVE).astype(np.int8)
+        state.status[list(folded)] = FOLDED
+        state.hands = np.full((state.num_players, 2), -1, dtype=np.int8) if hands is None \
+            else np.array(hands, dtype=np.int8).reshape(state.num_players, 2)
+        state.board = np.array(list(board) + [-1] * (5 - len(board)), dtype=np.int8)
+        state.board_mask = cards_to_mask(board)
+        state.street = NUM_REVEALED.index(len(board))
+        state.not_raise_num = 0
+        state.not_playing_num = int((state.status != ALIVE).sum())
+        if state.street == 0:
+            state.raised = state.in_chips.copy()
+            state.game_pointer = 1 if state.num_players == 2 else 2
+        else:
+            # After the flop the first player who can act starts
+            state.raised = np.zeros(state.num_players, dtype=np.int64)
+            state.game_pointer = int(np.argmax(state.status == ALIVE))
+        if (state.status == ALIVE).sum() < 2 and (state.status != FOLDED).sum() > 1:
+            # Nobody can bet anymore, the rest of the board is dealt at once
+            state.street = SHOWDOWN
+        return state
+
+    def clone(self):
+        ''' Get an independent copy of the state
+
+        Returns:
+            (FlatNolimitholdemState): The copy
+        '''
+        state = FlatNolimitholdemState.__new__(FlatNolimitholdemState)
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(state, name, value.copy() if isinstance(value, np.ndarray) else value)
+        return state
+
+    def to_array(self):
+        ''' Get the whole state as one integer vector, e.g. to stack states into a batch
+
+        Returns:
+            (numpy.array): Scalars, then stacks, chips in the pot, chips raised this round,
+                statuses, hole cards and board
+        '''
+        scalars = np.array([self.num_players, self.small_blind, self.big_blind, self.game_pointer, self.street,
+                            self.not_raise_num, self.not_playing_num, self.board_mask], dtype=np.int64)
+        return np.concatenate([scalars, self.stacks, self.in_chips, self.raised, self.status,
+                               self.hands.ravel(), self.board])
+
+    @classmethod
+    def from_array(cls, array):
+        ''' Build a state from the vector of to_array, e.g. sent by another process
+
+        Args:
+            array (list): The integers of to_array
+
+        Returns:
+            (FlatNolimitholdemState): The state
+        '''
+        array = np.asarray(array, dtype=np.int64)
+        num_players = int(array[0])
+        if len(array) != 8 + 6 * num_players + 5:
+            raise ValueError('Expected {} integers for {} players, got {}'.format(
+                8 + 6 * num_players + 5, num_players, len(array)))
+        state = cls.__new__(cls)
+        (state.num_players, state.small_blind, state.big_blind, state.game_pointer, state.street,
+         state.not_raise_num, state.not_playing_num, state.board_mask) = (int(value) for value in array[:8])
+        columns = array[8:8 + 4 * num_players].reshape(4, num_players)
+        state.stacks, state.in_chips, state.raised = columns[0].copy(), columns[1].copy(), columns[2].copy()
+        state.status = columns[3].astype(np.int8)
+        state.hands = array[8 + 4 * num_players:8 + 6 * num_players].astype(np.int8).reshape(num_players, 2)
+        state.board = array[8 + 6 * num_players:].astype(np.int8)
+        return state
+
+    def key(self):
+        ''' Get a bytes key identifying the state
+        '''
+        return self.to_array().tobytes()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __eq__(self, other):
+        return isinstance(other, FlatNolimitholdemState) and self.key() == other.key()
+
+    def get_public_cards(self):
+        ''' Get the board cards revealed so far
+        '''
+        return self.board[:NUM_REVEALED[self.street]].tolist()
+
+    def get_pot(self):
+        ''' Get the chips put in the pot by all players
+        '''
+        return int(self.in_chips.sum())
+
+    def get_legal_actions(self):
+        ''' Get the legal actions of the current player, as NolimitholdemRound does
+
+        Returns:
+            (list): A list of legal actions
+        '''
+        if self.raised.max() == 0:
+            return [Action.FOLD, Action.CHECK, Action.BET]
+        return [Action.FOLD, Action.CALL, Action.RAISE]
+
+    def _bet(self, player, chips):
+        quantity = min(chips, self.stacks[player])
+        self.in_chips[player] += quantity
+        self.stacks[player] -= quantity
+
+    def step(self, action, size=None):
+        ''' Apply the action of the current player, in place
+
+        Args:
+            action (Action): A legal action
+            size (int): The chips added by a bet or a raise
+
+        Returns:
+            (int): The next player to act
+        '''
+        player = self.game_pointer
+        if action == Action.CHECK:
+            self.not_raise_num += 1
+        elif action == Action.CALL:
+            diff = self.raised.max() - self.raised[player]
+            self.raised[player] += diff
+            self._bet(player, diff)
+            self.not_raise_num += 1
+        elif action in (Action.BET, Action.RAISE):
+            self.raised[player] += size
+            self._bet(player, size)
+            self.not_raise_num = 1
+        elif action == Action.FOLD:
+            self.status[player] = FOLDED
+            self.not_playing_num += 1
+
+        if self.stacks[player] == 0 and self.status[player] != FOLDED:
+            self.status[player] = ALLIN
+            self.not_playing_num += 1
+            self.not_raise_num -= 1
+
+        # Skip the players who can not act anymore
+        for _ in range(self.num_players):
+            player = (player + 1) % self.num_players
+            if self.status[player] == ALIVE:
+                break
+        self.game_pointer = player
+
+        if self.not_raise_num + self.not_playing_num >= self.num_players:
+            self._end_round()
+        return self.game_pointer
+
+    def _end_round(self):
+        in_bypass = self.status != ALIVE
+        if self.num_players - in_bypass.sum() == 1:
+            last_player = int(np.argmin(in_bypass))
+            if self.raised[last_player] >= self.raised.max():
+                # If the last player has put enough chips, he is also bypassed
+                in_bypass[last_player] = True
+        self.game_pointer = 0
+        if in_bypass.sum() < self.num_players:
+            while in_bypass[self.game_pointer]:
+                self.game_pointer += 1
+
+        if (self.status != FOLDED).sum() == 1:
+            return
+        # Nobody can bet anymore, the rest of the board is dealt at once
+        self.street = self.street + 1 if in_bypass.sum() < self.num_players - 1 else SHOWDOWN
+        self.street = min(self.street, SHOWDOWN)
+        # Unknown board cards are -1, e.g. in a public game tree
+        self.board_mask = cards_to_mask([card for card in self.get_public_cards() if card >= 0])
+        self.raised[:] = 0
+        self.not_raise_num = 0
+
+    def is_over(self):
+        ''' Check whether the hand is over
+
+        Returns:
+            (boolean): True if all players but one folded or the showdown is reached
+        '''
+        return (self.status != FOLDED).sum() == 1 or self.street == SHOWDOWN
+
+    def get_payoffs(self, np_random=None):
+        ''' Get the chips won or lost by each player
+
+        Args:
+            np_random (numpy.random.RandomState): Random state for the odd chips of split pots
+
+        Returns:
+            (numpy.array): The payoff of each player
+        '''
+        live = self.status != FOLDED
+        if live.sum() == 1:
+            strengths = np.where(live, 0, -1)
+        else:
+            cards = np.concatenate([self.hands, np.tile(self.board, (self.num_players, 1))], axis=1)
+            strengths = np.where(live, evaluate_batch(cards), -1)
+        return settle_pots(self.in_chips[None, :], strengths[None, :], np_random or np.random.RandomState())[0]
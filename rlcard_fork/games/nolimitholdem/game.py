@@ -1,16 +1,15 @@
 from enum import Enum
 
 import numpy as np
-from copy import deepcopy
 from rlcard_fork.games.limitholdem import Game
 from rlcard_fork.games.limitholdem import PlayerStatus
 
-from rlcard_fork.games.base import Card
+from rlcard_fork.games.limitholdem.card import hand_as_string, init_deck
 from rlcard_fork.games.nolimitholdem import Player
 from rlcard_fork.games.nolimitholdem import Judger
 from rlcard_fork.games.nolimitholdem import Round, Action
 from rlcard_fork.games.nolimitholdem.player import Position
-from rlcard_fork.utils.utils import init_standard_deck
+from rlcard_fork.games.nolimitholdem.preflop_equity import DEFAULT_PATH, load_preflop_table
 import json
 
 
@@ -50,7 +49,7 @@ class NolimitholdemGame(Game):
         self.effective_stack = 0
         self.hero_position = hero_position
         self.hero_index = Position.positions(num_players).index(hero_position)
-        self.deck = init_standard_deck()
+        self.deck = init_deck()
 
         # Initialize players to play the game
         positions = Position.positions(self.num_players)
@@ -118,6 +117,19 @@ class NolimitholdemGame(Game):
         '''
         return self.players[self.hero_index]
 
+    def get_preflop_equity(self, villain_hand=None, path=DEFAULT_PATH):
+        '''
+        Return the preflop all-in equity of the hero from the precomputed table
+
+        Args:
+            villain_hand (list): Two card codes of the opponent, a random hand if None
+            path (str): The file written by generate_preflop_table
+
+        Returns:
+            (float): The equity of the hero's hand
+        '''
+        return load_preflop_table(path).equity(self.hero().hand, villain_hand)
+
     def get_legal_actions(self):
         """
         Return the legal actions for current player
@@ -147,14 +159,10 @@ class NolimitholdemGame(Game):
             raise Exception('Action not allowed')
 
         if self.allow_step_back:
-            # First snapshot the current state
-            r = deepcopy(self.round)
-            b = self.game_pointer
-            r_c = self.round_counter
-            d = deepcopy(self.dealer)
-            p = deepcopy(self.public_cards)
-            ps = deepcopy(self.players)
-            self.history.append((r, b, r_c, d, p, ps))
+            # First record what this step can change: the round and the acting player
+            player = self.players[self.game_pointer]
+            self.history.append((self.game_pointer, self.round_counter, self.round.snapshot(), player.in_chips,
+                                 player.remained_chips, player.status))
 
         # Then we proceed to the next round
         self.game_pointer = self.round.proceed_round(self.players, action, size)
@@ -231,7 +239,12 @@ class NolimitholdemGame(Game):
             (bool): True if the game steps back successfully
         """
         if len(self.history) > 0:
-            self.round, self.game_pointer, self.round_counter, self.dealer, self.public_cards, self.players = self.history.pop()
+            self.game_pointer, self.round_counter, round_record, in_chips, remained_chips, status = self.history.pop()
+            self.round.restore(round_record)
+            player = self.players[self.game_pointer]
+            player.in_chips = in_chips
+            player.remained_chips = remained_chips
+            player.status = status
             self.street = Street(self.round_counter)
             return True
         return False
@@ -267,7 +280,7 @@ class NolimitholdemGame(Game):
             "Street": self.street.name,
             "Action on": self.game_pointer,
             "Round Counter": str(self.round_counter),
-            "Public Cards": str(self.public_cards),
+            "Public Cards": hand_as_string(self.public_cards),
             "Players": [],
             "Pot": self.pot
         }
@@ -281,7 +294,7 @@ class NolimitholdemGame(Game):
             }
             if player.position == self.hero_position:
                 player_state["isHero"] = True
-                player_state["hand"] = Card.hand_as_string(player.hand)
+                player_state["hand"] = hand_as_string(player.hand)
             state["Players"].append(player_state)
         
         print(json.dumps(state))
@@ -0,0 +1,271 @@
+''' Public betting tree of a no limit holdem spot
+
+build_game_tree expands every sequence of abstract actions (see bet_sizing)
+from a spot, following the rules of FlatNolimitholdemState, into a PublicTree.
+The tree is public: it does not depend on the cards, the dealing of a street
+is a chance node with a single child, and the solvers handle the cards
+themselves. Nodes are numbered in breadth-first order and stored in a few
+flat arrays, the children of a node being the contiguous block
+first_child[node] to first_child[node] + num_children[node].
+
+A depth-limited tree stops at the end of the street of the spot: the
+dealing of the next street is a leaf node, whose value the solver estimates
+instead of walking the streets to come. It is a much smaller tree, for
+re-solving the current street in real time.
+
+The arrays are written to one binary file, so that a tree of a few million
+nodes is built once and then mapped with np.memmap by every solver run.
+
+File layout, little endian:
+    header (32 bytes): magic, version, number of nodes, number of players
+    int32 [nodes]: parent, first_child, action_size, pot
+    int32 [nodes, players]: in_chips, stacks
+    int16 [nodes]: num_children
+    int8 [nodes]: node_type, player, street, raises, action
+    int8 [nodes, players]: status
+'''
+import os
+from collections import deque
+
+import numpy as np
+
+from rlcard_fork.games.nolimitholdem.bet_sizing import SizingTree
+from rlcard_fork.games.nolimitholdem.flat_state import FOLDED, SHOWDOWN, FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.round import Action
+
+PLAYER_NODE = 0
+CHANCE_NODE = 1
+FOLD_NODE = 2
+SHOWDOWN_NODE = 3
+LEAF_NODE = 4
+
+_MAGIC = b'GAMETREE'
+_VERSION = 1
+_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('num_nodes', '<u4'),
+                    ('num_players', '<u4'), ('reserved', '<u4', (3,))])
+# Name, type and whether there is one column per player, larger types first to keep the arrays aligned
+_FIELDS = [('parent', '<i4', False), ('first_child', '<i4', False), ('action_size', '<i4', False),
+           ('pot', '<i4', False), ('in_chips', '<i4', True), ('stacks', '<i4', True),
+           ('num_children', '<i2', False), ('node_type', '<i1', False), ('player', '<i1', False),
+           ('street', '<i1', False), ('raises', '<i1', False), ('action', '<i1', False),
+           ('status', '<i1', True)]
+
+
+class PublicTree:
+    ''' Flat array storage of a public betting tree
+
+    For each node: node_type, the player to act (-1 if none), the street, the
+    bets and raises already made on the street, the action and the chips that
+    led to it from its parent (-1 and 0 for the root and after chance nodes),
+    the pot, and the chips in the pot, stacks and status of each player.
+    '''
+
+    def __init__(self, num_players, arrays, path=None):
+        ''' Wrap the arrays of a tree, use build_game_tree or load_game_tree instead
+
+        Args:
+            num_players (int): The number of players
+            arrays (dict): One array per field, all with the same number of nodes
+            path (str): The file the arrays are mapped from, if any
+        '''
+        self.num_players = num_players
+        self.path = path
+        for name, _, _ in _FIELDS:
+            setattr(self, name, arrays[name])
+        self.num_nodes = len(self.node_type)
+
+    def children(self, node):
+        ''' Get the children of a node
+
+        Returns:
+            (range): The indexes of the children, empty for a terminal node
+        '''
+        first = int(self.first_child[node])
+        return range(first, first + int(self.num_children[node]))
+
+    def action_label(self, node):
+        ''' Get a short label of the action leading to a node, e.g. 'X', 'C' or 'B12'
+        '''
+        if self.action[node] < 0:
+            return ''
+        action = Action(int(self.action[node]))
+        if action in (Action.BET, Action.RAISE):
+            return '{}{}'.format(action.shorthand(), int(self.action_size[node]))
+        return action.shorthand()
+
+    def action_sequence(self, node):
+        ''' Get the labels of the actions from the root to a node, streets separated by '/'
+        '''
+        labels = []
+        while self.parent[node] >= 0:
+            labels.append(self.action_label(node) + ('/' if self.node_type[node] in (CHANCE_NODE, LEAF_NODE) else ''))
+            node = int(self.parent[node])
+        return ''.join(reversed(labels))
+
+    def nbytes(self):
+        ''' Get the memory used by the arrays
+        '''
+        return sum(getattr(self, name).nbytes for name, _, _ in _FIELDS)
+
+    def stats(self):
+        ''' Get the counts of nodes
+
+        Returns:
+            (dict): The number of nodes, of each type and on each street, the
+                largest number of children and the bytes used
+        '''
+        types = np.bincount(self.node_type, minlength=5)
+        return {
+            'num_nodes': self.num_nodes,
+            'player_nodes': int(types[PLAYER_NODE]),
+            'chance_nodes': int(types[CHANCE_NODE]),
+            'fold_nodes': int(types[FOLD_NODE]),
+            'showdown_nodes': int(types[SHOWDOWN_NODE]),
+            'leaf_nodes': int(types[LEAF_NODE]),
+            'nodes_per_street': np.bincount(self.street, minlength=SHOWDOWN + 1).tolist(),
+            'max_children': int(self.num_children.max()),
+            'nbytes': self.nbytes(),
+        }
+
+    def save(self, path):
+        ''' Write the tree to a file, see load_game_tree
+
+        Args:
+            path (str): The file to write
+        '''
+        header = np.zeros(1, dtype=_HEADER)
+        header['magic'] = _MAGIC
+        header['version'] = _VERSION
+        header['num_nodes'] = self.num_nodes
+        header['num_players'] = self.num_players
+        with open(path, 'wb') as f:
+            f.write(header.tobytes())
+            for name, dtype, _ in _FIELDS:
+                f.write(np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes())
+
+
+def load_game_tree(path, mmap=True):
+    ''' Read a tree written by PublicTree.save
+
+    Args:
+        path (str): The file to read
+        mmap (bool): Whether to map the file read-only instead of reading it in memory
+
+    Returns:
+        (PublicTree): The tree
+    '''
+    if not os.path.exists(path):
+        raise FileNotFoundError('No game tree at {}'.format(path))
+    header = np.fromfile(path, dtype=_HEADER, count=1)[0]
+    if header['magic'] != _MAGIC or header['version'] != _VERSION:
+        raise ValueError('{} is not a game tree'.format(path))
+    num_nodes, num_players = int(header['num_nodes']), int(header['num_players'])
+    arrays = {}
+    offset = _HEADER.itemsize
+    for name, dtype, per_player in _FIELDS:
+        shape = (num_nodes, num_players) if per_player else (num_nodes,)
+        if mmap:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+        offset += np.dtype(dtype).itemsize * int(np.prod(shape))
+    return PublicTree(num_players, arrays, path=path if mmap else None)
+
+
+class _TreeArrays:
+    ''' Node arrays that grow by doubling while the tree is built
+    '''
+
+    def __init__(self, num_players, capacity=1024):
+        self.num_players = num_players
+        self.size = 0
+        self.arrays = {name: self._empty(dtype, per_player, capacity) for name, dtype, per_player in _FIELDS}
+
+    def _empty(self, dtype, per_player, capacity):
+        return np.zeros((capacity, self.num_players) if per_player else (capacity,), dtype=dtype)
+
+    def add(self, node_type, state, parent, action, size, raises):
+        capacity = len(self.arrays['node_type'])
+        if self.size == capacity:
+            for name, dtype, per_player in _FIELDS:
+                grown = self._empty(dtype, per_player, 2 * capacity)
+                grown[:capacity] = self.arrays[name]
+                self.arrays[name] = grown
+        index = self.size
+        self.size += 1
+        row = self.arrays
+        row['node_type'][index] = node_type
+        row['player'][index] = state.game_pointer if node_type == PLAYER_NODE else -1
+        row['street'][index] = state.street
+        row['raises'][index] = raises
+        row['action'][index] = action
+        row['action_size'][index] = size
+        row['parent'][index] = parent
+        row['first_child'][index] = 0
+        row['num_children'][index] = 0
+        row['pot'][index] = state.get_pot()
+        row['in_chips'][index] = state.in_chips
+        row['stacks'][index] = state.stacks
+        row['status'][index] = state.status
+        return index
+
+    def to_tree(self):
+        return PublicTree(self.num_players, {name: array[:self.size].copy() for name, array in self.arrays.items()})
+
+
+def _child_type(parent_state, state):
+    if state.is_over():
+        return FOLD_NODE if (state.status != FOLDED).sum() == 1 else SHOWDOWN_NODE
+    if state.street != parent_state.street:
+        return CHANCE_NODE
+    return PLAYER_NODE
+
+
+def build_game_tree(state, sizing=None, raises=0, max_nodes=10000000, depth_limited=False):
+    ''' Expand all the abstract action sequences from a spot
+
+    Args:
+        state (FlatNolimitholdemState or NolimitholdemGame): The spot, see FlatNolimitholdemState.from_spot
+        sizing (SizingTree): The bet sizes, the default SizingTree if None
+        raises (int): The bets and raises already made on the street of the spot
+        max_nodes (int): Raise a ValueError rather than build a larger tree
+        depth_limited (bool): Whether to stop at the end of the street of the spot, the dealing of
+            the next street being a leaf node
+
+    Returns:
+        (PublicTree): The tree, node 0 is the spot
+    '''
+    if not isinstance(state, FlatNolimitholdemState):
+        state = FlatNolimitholdemState.from_game(state)
+    sizing = SizingTree() if sizing is None else sizing
+    nodes = _TreeArrays(state.num_players)
+    root_type = _child_type(state, state)
+    nodes.add(root_type, state, -1, -1, 0, raises)
+    queue = deque([(0, root_type, state, raises)])
+    while queue:
+        index, node_type, state, raises = queue.popleft()
+        if node_type in (FOLD_NODE, SHOWDOWN_NODE, LEAF_NODE):
+            continue
+        nodes.arrays['first_child'][index] = nodes.size
+        if node_type == CHANCE_NODE:
+            # The state has already moved on to the new street
+            children = [(state, PLAYER_NODE, -1, 0, 0)]
+        else:
+            children = []
+            for action in sizing.get_actions(state, raises):
+                child = state.clone()
+                child.step(action.action, action.size)
+                is_bet = action.action in (Action.BET, Action.RAISE)
+                children.append((child, _child_type(state, child), action.action.value, action.size or 0,
+                                 raises + 1 if is_bet else raises))
+        if nodes.size + len(children) > max_nodes:
+            raise ValueError('The tree has more than {} nodes'.format(max_nodes))
+        nodes.arrays['num_children'][index] = len(children)
+        for child, child_type, action, size, child_raises in children:
+            if child_type == CHANCE_NODE:
+                child_raises = 0
+                if depth_limited:
+                    child_type = LEAF_NODE
+            child_index = nodes.add(child_type, child, index, action, size, child_raises)
+            queue.append((child_index, child_type, child, child_raises))
+    return nodes.to_tree()
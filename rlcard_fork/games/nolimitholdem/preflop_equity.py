@@ -0,0 +1,210 @@
+''' Precomputed preflop all-in equity tables
+
+generate_preflop_table builds, once, the equity of every hand class against
+every other (169x169) and optionally of every combo against every other
+(1326x1326), and writes them to a flat binary file. PreflopEquityTable maps
+the file with np.memmap, so lookups do not compute anything and processes
+loading the same file share its pages instead of copying them.
+
+File layout, little endian:
+    header (32 bytes): magic, version, number of boards, whether the combo table is present
+    float32 [169, 169]: equity of a class against a class
+    float32 [169]: equity of a class against a random hand
+    float32 [1326]: equity of a combo against a random hand
+    float32 [1326, 1326]: equity of a combo against a combo, NaN when they share a card (optional)
+'''
+import itertools
+import os
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import NUM_CARDS
+from rlcard_fork.games.limitholdem.evaluator import evaluate_boards
+from rlcard_fork.games.limitholdem.range import (COMBOS, COMBO_CLASSES, COMBO_INDEX, COMBO_MASKS, NUM_COMBOS,
+                                                  NUM_HAND_CLASSES, class_index, combo_index, get_conflicts)
+from rlcard_fork.utils import seeding
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_equity.bin')
+
+_MAGIC = b'PFEQTBL\0'
+_VERSION = 1
+_HEADER = np.dtype([('magic', 'S8'), ('version', '<u4'), ('num_boards', '<u4'),
+                    ('has_combos', '<u4'), ('reserved', '<u4', (3,))])
+_TABLES = {}
+
+
+def generate_preflop_table(path=DEFAULT_PATH, num_boards=50000, include_combos=True, seed=None, batch_size=250):
+    ''' Estimate the preflop all-in equities and write them to a file
+
+    Boards are sampled uniformly and every pair of combos is compared on every
+    board that shares no card with them. The results are then averaged over
+    the 24 suit permutations, which leaves the equities unchanged, so each
+    pair of combos is effectively compared on about 24 * 0.7 * num_boards
+    boards. 50000 boards take about a minute.
+
+    Args:
+        path (str): The file to write
+        num_boards (int): Number of sampled boards
+        include_combos (bool): Whether to write the 1326x1326 combo table
+        seed (int): Seed of the board sampling
+        batch_size (int): Number of boards evaluated at once
+
+    Returns:
+        (PreflopEquityTable): The table loaded from the new file
+    '''
+    np_random, _ = seeding.np_random(seed)
+    # Twice the share of the pot, so that a tie counts 1 and a win 2
+    double_shares = np.zeros((NUM_COMBOS, NUM_COMBOS), dtype=np.int32)
+    counts = np.zeros((NUM_COMBOS, NUM_COMBOS), dtype=np.float64)
+    for start in range(0, num_boards, batch_size):
+        size = min(batch_size, num_boards - start)
+        boards = np_random.random_sample((size, NUM_CARDS)).argsort(axis=1)[:, :5].astype(np.int8)
+        board_masks = np.bitwise_or.reduce(np.left_shift(np.uint64(1), boards.astype(np.uint64)), axis=1)
+        live = (COMBO_MASKS[None, :] & board_masks[:, None]) == 0
+        # NaN never compares greater or equal, so blocked combos score nothing
+        strengths = np.where(live, evaluate_boards(boards, COMBOS), np.nan).astype(np.float32)
+        for strength in strengths:
+            double_shares += strength[:, None] > strength[None, :]
+            double_shares += strength[:, None] >= strength[None, :]
+        live = live.astype(np.float32)
+        counts += live.T @ live
+
+    double_shares = double_shares.astype(np.float64)
+    symmetric_shares = np.zeros_like(double_shares)
+    symmetric_counts = np.zeros_like(counts)
+    for suits in itertools.permutations(range(4)):
+        codes = np.array([suits[code // 13] * 13 + code % 13 for code in range(NUM_CARDS)])
+        permutation = COMBO_INDEX[codes[COMBOS[:, 0]], codes[COMBOS[:, 1]]]
+        symmetric_shares += double_shares[np.ix_(permutation, permutation)]
+        symmetric_counts += counts[np.ix_(permutation, permutation)]
+    conflicts = get_conflicts()
+    symmetric_shares[conflicts] = 0
+    symmetric_counts[conflicts] = 0
+    symmetric_counts *= 2
+
+    # One-hot class of each combo, to sum the combo pairs of each class pair
+    classes = np.zeros((NUM_COMBOS, NUM_HAND_CLASSES))
+    classes[np.arange(NUM_COMBOS), COMBO_CLASSES] = 1
+    class_table = (classes.T @ symmetric_shares @ classes) / (classes.T @ symmetric_counts @ classes)
+    class_vs_random = (classes.T @ symmetric_shares.sum(axis=1)) / (classes.T @ symmetric_counts.sum(axis=1))
+    combo_vs_random = symmetric_shares.sum(axis=1) / symmetric_counts.sum(axis=1)
+
+    header = np.zeros(1, dtype=_HEADER)
+    header['magic'] = _MAGIC
+    header['version'] = _VERSION
+    header['num_boards'] = num_boards
+    header['has_combos'] = int(include_combos)
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(class_table.astype('<f4').tobytes())
+        f.write(class_vs_random.astype('<f4').tobytes())
+        f.write(combo_vs_random.astype('<f4').tobytes())
+        if include_combos:
+            combo_table = np.full((NUM_COMBOS, NUM_COMBOS), np.nan)
+            np.divide(symmetric_shares, symmetric_counts, out=combo_table, where=~conflicts)
+            f.write(combo_table.astype('<f4').tobytes())
+    _TABLES.pop(os.path.abspath(path), None)
+    return load_preflop_table(path)
+
+
+def load_preflop_table(path=DEFAULT_PATH):
+    ''' Load a preflop equity table, once per path and process
+
+    Args:
+        path (str): The file written by generate_preflop_table
+
+    Returns:
+        (PreflopEquityTable): The memory mapped table
+    '''
+    path = os.path.abspath(path)
+    if path not in _TABLES:
+        _TABLES[path] = PreflopEquityTable(path)
+    return _TABLES[path]
+
+
+class PreflopEquityTable:
+    ''' Read-only view of a preflop equity file
+    '''
+
+    def __init__(self, path=DEFAULT_PATH):
+        ''' Map the tables of a file
+
+        Args:
+            path (str): The file written by generate_preflop_table
+        '''
+        if not os.path.exists(path):
+            raise FileNotFoundError('No preflop equity table at {}, build it with generate_preflop_table'.format(path))
+        header = np.fromfile(path, dtype=_HEADER, count=1)[0]
+        if header['magic'] != _MAGIC.rstrip(b'\0') or header['version'] != _VERSION:
+            raise ValueError('{} is not a preflop equity table'.format(path))
+        self.path = path
+        self.num_boards = int(header['num_boards'])
+
+        offset = _HEADER.itemsize
+        shapes = [('class_table', (NUM_HAND_CLASSES, NUM_HAND_CLASSES)), ('class_vs_random', (NUM_HAND_CLASSES,)),
+                  ('combo_vs_random', (NUM_COMBOS,))]
+        if header['has_combos']:
+            shapes.append(('combo_table', (NUM_COMBOS, NUM_COMBOS)))
+        self.combo_table = None
+        for name, shape in shapes:
+            setattr(self, name, np.memmap(path, dtype='<f4', mode='r', offset=offset, shape=shape))
+            offset += 4 * int(np.prod(shape))
+
+    def class_equity(self, hero_class, villain_class=None):
+        ''' Get the equity of a hand class
+
+        Args:
+            hero_class (str or int): The class of the hero, e.g. 'AKs', or its index
+            villain_class (str or int): The class of the opponent, a random hand if None
+
+        Returns:
+            (float): The all-in equity of the hero, averaged over the combos of the classes
+        '''
+        hero_class = class_index(hero_class) if isinstance(hero_class, str) else hero_class
+        if villain_class is None:
+            return float(self.class_vs_random[hero_class])
+        villain_class = class_index(villain_class) if isinstance(villain_class, str) else villain_class
+        return float(self.class_table[hero_class, villain_class])
+
+    def equity(self, hero_hand, villain_hand=None):
+        ''' Get the equity of a hand
+
+        Without the combo table the equity against a known hand is the one of
+        their classes, which ignores the suits.
+
+        Args:
+            hero_hand (list): Two card codes or 'SA'-style strings
+            villain_hand (list): Two card codes or 'SA'-style strings, a random hand if None
+
+        Returns:
+            (float): The all-in equity of the hero
+        '''
+        hero_combo = combo_index(hero_hand)
+        if villain_hand is None:
+            return float(self.combo_vs_random[hero_combo])
+        villain_combo = combo_index(villain_hand)
+        if COMBO_MASKS[hero_combo] & COMBO_MASKS[villain_combo]:
+            raise ValueError('The hands share a card')
+        if self.combo_table is None:
+            return float(self.class_table[COMBO_CLASSES[hero_combo], COMBO_CLASSES[villain_combo]])
+        return float(self.combo_table[hero_combo, villain_combo])
+
+    def range_equity(self, hero_hand, villain_range):
+        ''' Get the equity of a hand against a range
+
+        Args:
+            hero_hand (list): Two card codes or 'SA'-style strings
+            villain_range (Range): The range of the opponent
+
+        Returns:
+            (float): The all-in equity of the hero against the combos of the range that do not share a card with it
+        '''
+        hero_combo = combo_index(hero_hand)
+        weights = np.where(COMBO_MASKS & COMBO_MASKS[hero_combo], 0.0, villain_range.weights)
+        if weights.sum() == 0:
+            raise ValueError('The range has no combo compatible with the hand')
+        if self.combo_table is None:
+            equities = self.class_table[COMBO_CLASSES[hero_combo]][COMBO_CLASSES]
+        else:
+            equities = np.nan_to_num(self.combo_table[hero_combo])
+        return float(weights @ equities / weights.sum())
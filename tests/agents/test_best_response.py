@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+
+import rlcard_fork
+from rlcard_fork.agents.best_response import LeducBestResponse, leduc_exploitability
+from rlcard_fork.agents.cfr_agent import CFRAgent
+
+def always_fold(state):
+    ''' Fold whenever possible, otherwise take the first legal action
+    '''
+    legal_actions = list(state['legal_actions'].keys())
+    probs = np.zeros(4)
+    probs[2 if 2 in legal_actions else legal_actions[0]] = 1
+    return probs
+
+class TestBestResponse(unittest.TestCase):
+
+    def test_always_fold(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        best_response = LeducBestResponse(env, always_fold)
+        # The small blind raises and wins the big blind, the big blind wins the small blind
+        self.assertAlmostEqual(best_response.value(0), 0.75)
+        self.assertAlmostEqual(best_response.value(1), 0.75)
+        self.assertAlmostEqual(best_response.exploitability(), 750)
+
+    def test_cfr(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True, 'seed':0})
+        eval_env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        agent = CFRAgent(env, model_path='experiments/cfr_model')
+        # An empty average policy is uniform
+        uniform = leduc_exploitability(eval_env, agent)
+        for _ in range(100):
+            agent.train()
+        exploitability = leduc_exploitability(eval_env, agent)
+        self.assertGreater(exploitability, 0)
+        self.assertLess(exploitability, uniform / 2)
+
+        with self.assertRaises(ValueError):
+            LeducBestResponse(rlcard_fork.make('leduc-holdem', config={'allow_step_back':False}), always_fold)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,9 @@ import unittest
 import numpy as np
 
 import rlcard_fork
+from rlcard_fork.agents.best_response import leduc_exploitability
 from rlcard_fork.agents.cfr_agent import CFRAgent
+from rlcard_fork.agents.regret_pruning import RegretPruning
 
 class TestNFSP(unittest.TestCase):
 
@@ -19,6 +21,47 @@ class TestNFSP(unittest.TestCase):
 
         self.assertIn(action, [0, 2])
 
+    def test_rules(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        for rule in ('cfr+', 'linear', 'dcfr'):
+            agent = CFRAgent(env, model_path='experiments/cfr_model', rule=rule)
+            for _ in range(10):
+                agent.train()
+            self.assertEqual(agent.rule.name, rule)
+            for obs, regrets in agent.regrets.items():
+                self.assertTrue(np.isfinite(regrets).all())
+                if rule == 'cfr+':
+                    self.assertTrue((regrets >= 0).all())
+
+        # The rule runs once per iteration over the whole table, so the infosets not visited are discounted too
+        agent = CFRAgent(env, model_path='experiments/cfr_model', rule='dcfr')
+        agent.train()
+        expected = agent.infosets['regrets'].copy()
+        expected[0] += 2.0
+        expected *= np.where(expected > 0, 2 ** 1.5 / (2 ** 1.5 + 1), 0.5)
+        agent.iteration += 1
+        agent.add_regrets(0, np.ones(env.num_actions))
+        agent.add_regrets(0, np.ones(env.num_actions))
+        agent.apply_regrets()
+        np.testing.assert_allclose(agent.infosets['regrets'], expected)
+        self.assertEqual(agent.instant_regrets, {})
+
+    def test_pruning(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True, 'seed':0})
+        agent = CFRAgent(env, model_path='experiments/cfr_model', pruning=RegretPruning(-2, warmup=20))
+        for _ in range(100):
+            agent.train()
+        counters = agent.pruning.counters
+        self.assertGreater(counters['pruned'], 0)
+        self.assertGreater(counters['skipped'], 0)
+        self.assertGreater(agent.pruning.pruned_fraction(), 0)
+        # Pruning trades little convergence for the skipped subtrees
+        eval_env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        unpruned = CFRAgent(env, model_path='experiments/cfr_model')
+        for _ in range(100):
+            unpruned.train()
+        self.assertLess(leduc_exploitability(eval_env, agent), 2 * leduc_exploitability(eval_env, unpruned))
+
     def test_save_and_load(self):
         env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
         agent = CFRAgent(env, model_path='experiments/cfr_model')
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from rlcard_fork.agents.cfr_rules import CFR, CFR_RULES, DCFR, get_cfr_rule
+from rlcard_fork.agents.vector_cfr_solver import VectorCFRSolver
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import Range
+from rlcard_fork.games.nolimitholdem.bet_sizing import SizingTree
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game_tree import build_game_tree
+
+
+class TestCFRRules(unittest.TestCase):
+
+    def test_get_cfr_rule(self):
+        self.assertEqual(sorted(CFR_RULES), ['cfr', 'cfr+', 'dcfr', 'linear'])
+        for name in CFR_RULES:
+            self.assertEqual(get_cfr_rule(name).name, name)
+        rule = DCFR(alpha=1, beta=1, gamma=1)
+        self.assertIs(get_cfr_rule(rule), rule)
+        with self.assertRaises(ValueError):
+            get_cfr_rule('cfr++')
+
+    def test_updates(self):
+        instant_regrets = np.array([2.0, -1.0, 0.0])
+        discount = 2 ** 1.5 / (2 ** 1.5 + 1)
+        expected = {
+            'cfr': [[3, -1.5, 0], [5, -2.5, 0]],
+            'cfr+': [[3, 0, 0], [5, 0, 0]],
+            'linear': [[5, -2.5, 0], [11, -5.5, 0]],
+            'dcfr': [[2.5 * discount, -0.625, 0], [(2.5 * discount + 2) * 27 ** 0.5 / (27 ** 0.5 + 1), -0.8125, 0]],
+        }
+        for name, expected_regrets in expected.items():
+            rule = get_cfr_rule(name)
+            regrets = rule.update_regrets(np.zeros(3), instant_regrets / 2, 1)
+            for iteration, expected_iteration in zip((2, 3), expected_regrets):
+                regrets = rule.update_regrets(regrets, instant_regrets, iteration)
+                self.assertTrue(np.allclose(regrets, expected_iteration), name)
+
+        strategy_sums = np.zeros(2)
+        CFR().update_strategy_sums(strategy_sums, np.array([0.5, 0.5]), 3)
+        self.assertTrue(np.allclose(strategy_sums, [1.5, 1.5]))
+        CFR(linear_averaging=False).update_strategy_sums(strategy_sums, np.array([0.5, 0.5]), 3)
+        self.assertTrue(np.allclose(strategy_sums, [2, 2]))
+        self.assertEqual(DCFR().strategy_weight(3), 9)
+
+    def test_vector_cfr_solver(self):
+        # Every rule solves the polarized river toy of test_vector_cfr
+        board = [card_to_int(card) for card in ('C2', 'D3', 'H7', 'S9', 'CK')]
+        state = FlatNolimitholdemState.from_spot([100, 100], [10, 10], board=board)
+        tree = build_game_tree(state, SizingTree({'river': [[1.0]]}, allin=False))
+        bettor = Range.from_string('77,QJ')
+        bluffs = Range.from_string('QJ').weights > 0
+        bettor.weights[bluffs] = 3 / 16
+        bet = [tree.action_label(child) for child in tree.children(0)].index('B20')
+        for name in CFR_RULES:
+            solver = VectorCFRSolver(tree, board, [bettor, Range.from_string('AK')], rule=name)
+            self.assertEqual(solver.rule.name, name)
+            for _ in range(1000):
+                solver.train()
+            strategy = solver.get_average_strategy(0)
+            self.assertAlmostEqual(strategy[bet, bluffs].mean(), 0.5, delta=0.05, msg=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+from rlcard_fork.agents.infoset_table import InfosetTable, load_infoset_table
+
+
+class TestInfosetTable(unittest.TestCase):
+
+    def test_index_and_grow(self):
+        infosets = InfosetTable(3, {'policy': 1 / 3, 'regrets': 0.0}, chunk_size=2)
+        self.assertEqual([infosets.index(key) for key in (b'a', b'b', b'a', b'c')], [0, 1, 0, 2])
+        self.assertEqual(len(infosets), 3)
+        self.assertEqual(infosets.capacity, 4)
+        for key in (b'd', b'e'):
+            infosets.index(key)
+        self.assertEqual(infosets.capacity, 8)
+        self.assertEqual(infosets['regrets'].shape, (5, 3))
+        self.assertTrue(np.allclose(infosets['policy'], 1 / 3))
+        self.assertIn(b'e', infosets)
+        self.assertNotIn(b'f', infosets)
+        self.assertEqual(infosets.nbytes(), 2 * 8 * 3 * 8)
+
+    def test_views(self):
+        infosets = InfosetTable(2, {'regrets': 0.0}, chunk_size=2)
+        regrets = infosets.view('regrets')
+        positive = infosets.view('regrets', lambda row: np.maximum(row, 0))
+        for key, row in ((b'a', [1.0, -1.0]), (b'b', [-2.0, 3.0]), (b'c', [0.5, 0.5])):
+            index = infosets.index(key)
+            infosets.arrays['regrets'][index] = row
+        self.assertEqual(list(regrets), [b'a', b'b', b'c'])
+        self.assertEqual(len(regrets), 3)
+        self.assertTrue(np.array_equal(regrets[b'b'], [-2, 3]))
+        self.assertTrue(np.array_equal(positive[b'a'], [1, 0]))
+        with self.assertRaises(KeyError):
+            regrets[b'd']
+
+        # A view pickles as the dict it was before the tables, which update reads back
+        loaded = pickle.loads(pickle.dumps(regrets))
+        self.assertIsInstance(loaded, dict)
+        self.assertTrue(np.array_equal(loaded[b'a'], [1, -1]))
+        infosets.clear()
+        self.assertEqual(len(regrets), 0)
+        infosets.update('regrets', {b'c': [4.0, 5.0], b'a': [1.0, 2.0]})
+        self.assertEqual(infosets.keys, [b'c', b'a'])
+        self.assertTrue(np.array_equal(regrets[b'a'], [1, 2]))
+
+    def test_save_and_load(self):
+        infosets = InfosetTable(2, {'policy': 0.5, 'regrets': 0.0}, chunk_size=4)
+        keys = [bytes([i]) * (1 + i % 3) for i in range(10)]
+        for i, key in enumerate(keys):
+            index = infosets.index(key)
+            infosets.arrays['regrets'][index] = [i, -i]
+        with tempfile.TemporaryDirectory() as directory:
+            infosets.save(directory, iteration=3)
+            for mmap in (True, False):
+                loaded = load_infoset_table(directory, mmap=mmap)
+                self.assertEqual(isinstance(loaded.arrays['regrets'], np.memmap), mmap)
+                self.assertEqual(loaded.attributes, {'iteration': 3})
+                self.assertEqual(list(loaded.keys), keys)
+                self.assertEqual(loaded.index(keys[7]), 7)
+                self.assertTrue(np.array_equal(loaded.view('regrets')[keys[7]], [7, -7]))
+                self.assertNotIn(b'missing', loaded)
+                self.assertTrue(np.allclose(loaded['policy'], 0.5))
+
+            # Changed rows are written in place and new infosets appended
+            size = os.path.getsize(os.path.join(directory, 'regrets.bin'))
+            infosets.arrays['regrets'][infosets.index(keys[2])] = [20, 20]
+            index = infosets.index(b'new')
+            infosets.arrays['regrets'][index] = [30, 30]
+            infosets.save(directory, iteration=4)
+            self.assertEqual(os.path.getsize(os.path.join(directory, 'regrets.bin')), size + 2 * 8)
+            loaded = load_infoset_table(directory)
+            self.assertEqual(len(loaded), 11)
+            self.assertTrue(np.array_equal(loaded['regrets'], infosets['regrets']))
+            self.assertEqual(loaded.ids[b'new'], 10)
+
+            # A loaded table keeps growing and saving, without writing to the files it maps
+            loaded.arrays['regrets'][loaded.index(keys[0])] = [1, 1]
+            for i in range(10):
+                loaded.index(b'more' + bytes([i]))
+            self.assertEqual(loaded.keys[-1], b'more' + bytes([9]))
+            self.assertTrue(np.array_equal(load_infoset_table(directory)['regrets'][0], [0, 0]))
+            loaded.save(directory, iteration=5)
+            reloaded = load_infoset_table(directory, mmap=False)
+            self.assertEqual(len(reloaded), 21)
+            self.assertTrue(np.array_equal(reloaded['regrets'], loaded['regrets']))
+            self.assertEqual(reloaded.attributes['iteration'], 5)
+
+            with self.assertRaises(FileNotFoundError):
+                load_infoset_table(os.path.join(directory, 'missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
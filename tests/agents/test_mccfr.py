@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+
+import rlcard_fork
+from rlcard_fork.agents.mccfr_agent import MCCFRAgent
+from rlcard_fork.agents.regret_pruning import RegretPruning
+
+class TestMCCFR(unittest.TestCase):
+
+    def test_train(self):
+        for sampling in ('external', 'outcome'):
+            env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+            agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling=sampling, seed=0)
+
+            for _ in range(100):
+                agent.train()
+            self.assertEqual(agent.iteration, 100)
+            self.assertGreater(len(agent.average_policy), 0)
+
+            state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': {0: None,2: None}, 'raw_legal_actions': ['call', 'fold']}
+            action, _ = agent.eval_step(state)
+            self.assertIn(action, [0, 2])
+
+        with self.assertRaises(ValueError):
+            MCCFRAgent(env, sampling='chance')
+
+    def test_seed(self):
+        agents = []
+        for _ in range(2):
+            env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True, 'seed':0})
+            agent = MCCFRAgent(env, model_path='experiments/mccfr_model', sampling='outcome', rule='dcfr', seed=0)
+            for _ in range(100):
+                agent.train()
+            agents.append(agent)
+        self.assertEqual(agents[0].regrets.keys(), agents[1].regrets.keys())
+        for obs, regrets in agents[0].regrets.items():
+            self.assertTrue(np.array_equal(regrets, agents[1].regrets[obs]))
+
+    def test_pruning(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True, 'seed':0})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', seed=0,
+                           pruning=RegretPruning(-2, warmup=100, full_traversal_every=10))
+        for _ in range(500):
+            agent.train()
+        counters = agent.pruning.counters
+        self.assertGreater(counters['pruned'], 0)
+        self.assertGreater(counters['walked'], counters['nodes'])
+
+    def test_save_and_load(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model')
+
+        for _ in range(100):
+            agent.train()
+
+        agent.save()
+
+        new_agent = MCCFRAgent(env, model_path='experiments/mccfr_model')
+        new_agent.load()
+        self.assertEqual(len(agent.average_policy), len(new_agent.average_policy))
+        self.assertEqual(len(agent.regrets), len(new_agent.regrets))
+        self.assertEqual(agent.iteration, new_agent.iteration)
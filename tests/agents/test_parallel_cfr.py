@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import unittest
+import numpy as np
+
+import rlcard_fork
+from rlcard_fork.agents.mccfr_agent import MCCFRAgent
+from rlcard_fork.agents.parallel_cfr_agent import ParallelMCCFRAgent
+
+@unittest.skipIf(sys.version_info < (3, 8), 'multiprocessing.shared_memory needs Python 3.8')
+class TestParallelMCCFR(unittest.TestCase):
+
+    def test_train(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        with ParallelMCCFRAgent(env, model_path='experiments/parallel_mccfr_model', num_workers=2,
+                                num_traversals=20, seed=0, capacity=4) as agent:
+            for _ in range(5):
+                agent.train()
+            self.assertEqual(agent.iteration, 5)
+            self.assertGreater(agent.infosets.capacity, 4)
+            self.assertEqual(len(agent.regrets), len(agent.infosets))
+            for obs in agent.infosets.keys:
+                self.assertTrue(np.allclose(agent.policy[obs].sum(), 1))
+
+            state = {'obs': np.array([1., 1., 0., 0., 0., 0.]), 'legal_actions': {0: None,2: None}, 'raw_legal_actions': ['call', 'fold']}
+            action, _ = agent.eval_step(state)
+            self.assertIn(action, [0, 2])
+        # The tables stay readable after the workers stopped
+        self.assertEqual(len(agent.average_policy), len(agent.infosets))
+
+    def test_save_and_load(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True})
+        with ParallelMCCFRAgent(env, model_path='experiments/parallel_mccfr_model', num_workers=2, seed=0) as agent:
+            for _ in range(5):
+                agent.train()
+            agent.save()
+
+        with ParallelMCCFRAgent(env, model_path='experiments/parallel_mccfr_model', num_workers=1) as new_agent:
+            new_agent.load()
+            self.assertEqual(new_agent.iteration, agent.iteration)
+            self.assertEqual(len(new_agent.regrets), len(agent.regrets))
+            for obs in agent.regrets:
+                self.assertTrue(np.array_equal(new_agent.regrets[obs], agent.regrets[obs]))
+                self.assertTrue(np.array_equal(new_agent.average_policy[obs], agent.average_policy[obs]))
+            new_agent.train()
+
+    def test_throughput(self):
+        env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True, 'seed':0})
+        agent = MCCFRAgent(env, model_path='experiments/mccfr_model', seed=0)
+        for _ in range(100):
+            agent.train()
+        start = time.perf_counter()
+        for _ in range(200):
+            agent.train()
+        sequential = 200 / (time.perf_counter() - start)
+
+        num_workers, num_traversals = 2, 50
+        with ParallelMCCFRAgent(env, model_path='experiments/parallel_mccfr_model', num_workers=num_workers,
+                                num_traversals=num_traversals, seed=0) as parallel_agent:
+            parallel_agent.train()
+            start = time.perf_counter()
+            for _ in range(2):
+                parallel_agent.train()
+            parallel = 2 * num_workers * num_traversals / (time.perf_counter() - start)
+        # Loose bounds: the merge costs little on one core, and the workers share the cores there are
+        self.assertGreater(parallel, 0.5 * sequential * min(num_workers, os.cpu_count()))
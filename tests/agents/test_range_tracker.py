@@ -0,0 +1,109 @@
+import unittest
+
+import numpy as np
+
+from rlcard_fork.agents.range_tracker import PREFLOP_RANGES, RangeTracker, positional_ranges
+from rlcard_fork.agents.solver_service import SolverService
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import COMBO_CLASSES, Range, class_index
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game import NolimitholdemGame
+from rlcard_fork.games.nolimitholdem.player import Position
+from rlcard_fork.games.nolimitholdem.round import Action
+
+BOARD = [card_to_int(card) for card in ('C2', 'D3', 'H7', 'S9', 'CK')]
+PAIRS = np.isin(COMBO_CLASSES, [class_index(pair) for pair in ('AA', 'KK', 'QQ', '22')])
+
+
+def pairs_raise(state, action, size, raises, ranges):
+    # Some pairs always raise, the other hands raise a quarter of the time
+    frequencies = np.where(PAIRS, 1.0, 0.25)
+    return frequencies if action == Action.RAISE else 1.0 - frequencies
+
+
+class TestRangeTracker(unittest.TestCase):
+
+    def test_positional_ranges(self):
+        ranges = positional_ranges(6)
+        positions = Position.positions(6)
+        self.assertEqual(ranges[positions.index(Position.BB)].num_combos(), 1326)
+        self.assertLess(ranges[positions.index(Position.UTG)].num_combos(),
+                        ranges[positions.index(Position.BTN)].num_combos())
+        self.assertEqual(len(positional_ranges(9)), 9)
+        self.assertTrue(all(position in PREFLOP_RANGES for position in Position))
+        chart = {Position.BTN: 'AA'}
+        self.assertEqual([player_range.num_combos() for player_range in positional_ranges(2, chart)], [1326, 6])
+
+    def test_update(self):
+        tracker = RangeTracker(2, [Range(), 'AA,AK'])
+        tracker.update(0, np.where(PAIRS, 1.0, 0.25))
+        weights = tracker.get_range(0).weights
+        self.assertEqual(weights[PAIRS].tolist(), [1.0] * PAIRS.sum())
+        self.assertTrue(np.allclose(weights[~PAIRS], 0.25))
+        # No combo of the range plays the action, the range is left as it was
+        self.assertFalse(tracker.update(1, np.zeros(1326)))
+        self.assertEqual(tracker.get_range(1).num_combos(), 22)
+        self.assertEqual(tracker.counters['inconsistent'], 1)
+
+        tracker.remove_cards([card_to_int('SA'), -1], seats=[1])
+        self.assertEqual(tracker.get_range(1).num_combos(), 3 + 12)
+        self.assertEqual(tracker.get_range(0).get_weight(['SA', 'HA']), 1.0)
+        with self.assertRaises(ValueError):
+            RangeTracker(3, [Range(), Range()])
+
+    def test_step(self):
+        game = NolimitholdemGame(1, 2, 200, Position.BTN, num_players=6)
+        game.hero().hand = [card_to_int('SA'), card_to_int('HA')]
+        game.init_game()
+        calls = []
+
+        def strategy(state, action, size, raises, ranges):
+            calls.append((state.game_pointer, action, raises, len(ranges)))
+            return pairs_raise(state, action, size, raises, ranges)
+
+        tracker = RangeTracker(6, strategy=strategy)
+        tracker.remove_known_cards(game)
+        seat = game.game_pointer
+        before = tracker.get_range(seat).weights
+        self.assertEqual(tracker.get_range(seat).num_combos(), Range.from_string(PREFLOP_RANGES[Position.UTG])
+                         .remove_cards(game.hero().hand).num_combos())
+        self.assertEqual(tracker.get_range(seat).get_weight(['SA', 'DA']), 0.0)
+        self.assertEqual(tracker.get_range(game.hero_index).get_weight(['SA', 'HA']), 1.0)
+
+        tracker.step(game, Action.RAISE, 6)
+        tracker.step(game, Action.RAISE, 18)
+        self.assertEqual(calls[0][:3], (seat, Action.RAISE, 0))
+        self.assertEqual(calls[1][2], 1)
+        self.assertEqual((tracker.street, tracker.raises), (0, 2))
+        self.assertEqual(calls[0][3], 6)
+        after = tracker.get_range(seat).weights
+        np.testing.assert_allclose(after, before * np.where(PAIRS, 1.0, 0.25))
+        self.assertEqual(tracker.counters['updates'], 2)
+
+    def test_solver_strategy(self):
+        service = SolverService(num_iterations=20)
+        ranges = [Range.from_string('AA,KK,77,AK,KQ,T8'), Range.from_string('QQ,JJ,99,AK,AQ,KJ'), Range()]
+        tracker = RangeTracker(3, ranges, strategy=service.frequencies)
+        state = FlatNolimitholdemState.from_spot([80, 80, 90], [20, 20, 10], board=BOARD, folded=[2])
+        tracker.remove_known_cards(state)
+        self.assertEqual(tracker.get_range(0).num_combos(), Range.from_string('AA,KK,77,AK,KQ,T8')
+                         .remove_cards(BOARD).num_combos())
+
+        checks = service.frequencies(state, Action.CHECK, ranges=tracker.get_ranges())
+        bets = [service.frequencies(state, Action.BET, size, ranges=tracker.get_ranges()) for size in (25, 50)]
+        live = tracker.weights[0] > 0
+        self.assertTrue(((checks + bets[0] + bets[1])[live] <= 1 + 1e-6).all())
+        # A bet between the abstract sizes mixes their frequencies
+        between = service.frequencies(state, Action.BET, 35, ranges=tracker.get_ranges())
+        low, high = np.minimum(*bets), np.maximum(*bets)
+        self.assertTrue(((between >= low - 1e-9) & (between <= high + 1e-9)).all())
+
+        before = tracker.weights[0].copy()
+        self.assertTrue(tracker.observe(state, Action.CHECK))
+        np.testing.assert_allclose(tracker.weights[0], before * checks)
+        # Preflop or with more than two players left, the service has no strategy
+        self.assertIsNone(service.frequencies(FlatNolimitholdemState([100, 100, 100]), Action.CALL))
+
+
+if __name__ == '__main__':
+    unittest.main()
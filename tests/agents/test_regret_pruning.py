@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+
+import rlcard_fork
+from rlcard_fork.agents.cfr_agent import CFRAgent
+from rlcard_fork.agents.regret_pruning import RegretPruning
+from rlcard_fork.agents.vector_cfr_solver import VectorCFRSolver
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import Range
+from rlcard_fork.games.nolimitholdem.bet_sizing import SizingTree
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game_tree import build_game_tree
+
+
+class TestRegretPruning(unittest.TestCase):
+
+    def test_schedule(self):
+        pruning = RegretPruning(-10, warmup=2, full_traversal_every=4)
+        self.assertEqual([pruning.prunes(iteration) for iteration in range(1, 10)],
+                         [False, False, True, False, True, True, True, False, True])
+        self.assertFalse(RegretPruning().prunes(1))
+        self.assertEqual(pruning.pruned_fraction(), 0)
+        pruning.counters.update(walked=6, pruned=1, skipped=1)
+        self.assertEqual(pruning.pruned_fraction(), 0.25)
+        pruning.reset_counters()
+        self.assertEqual(pruning.counters['walked'], 0)
+        with self.assertRaises(ValueError):
+            RegretPruning(1)
+
+    def test_vector_solver(self):
+        board = [card_to_int(card) for card in ('C2', 'D3', 'H7', 'S9', 'CK')]
+        state = FlatNolimitholdemState.from_spot([100, 100], [10, 10], board=board)
+        tree = build_game_tree(state, SizingTree({'river': [[0.5, 1.0]]}))
+        ranges = [Range.from_string('77,AK,KQ,QJ,JT'), Range.from_string('99,AK,AQ,KJ')]
+        solvers = [VectorCFRSolver(tree, board, ranges, pruning=pruning)
+                   for pruning in (None, RegretPruning(-5000, warmup=50, full_traversal_every=10))]
+        for solver in solvers:
+            for _ in range(300):
+                solver.train()
+        unpruned, pruned = solvers
+        self.assertEqual(unpruned.pruning.counters['pruned'], 0)
+        self.assertGreater(unpruned.pruning.counters['walked'], 0)
+
+        self.assertGreater(pruned.pruning.counters['pruned'], 0)
+        self.assertLess(pruned.pruning.counters['walked'], unpruned.pruning.counters['walked'])
+        self.assertLess(pruned.exploitability(), 1.5 * unpruned.exploitability())
+
+        # A set against air leaves lines that neither player reaches, skipping them changes nothing
+        ranges = [Range.from_string('77'), Range.from_string('QJ')]
+        solvers = [VectorCFRSolver(tree, board, ranges, pruning=pruning)
+                   for pruning in (RegretPruning(None, skip_unreached=False), None)]
+        for solver in solvers:
+            for _ in range(300):
+                solver.train()
+        walking, skipping = solvers
+        self.assertEqual(walking.pruning.counters['skipped'], 0)
+        self.assertGreater(skipping.pruning.counters['skipped'], 0)
+        self.assertEqual(walking.infosets.keys(), skipping.infosets.keys())
+        for node, (regrets, strategy_sums) in walking.infosets.items():
+            self.assertTrue(np.array_equal(regrets, skipping.infosets[node][0]))
+            self.assertTrue(np.array_equal(strategy_sums, skipping.infosets[node][1]))
+
+    def test_cfr_agent(self):
+        agents = []
+        for pruning in (RegretPruning(None, skip_unreached=False), None):
+            env = rlcard_fork.make('leduc-holdem', config={'allow_step_back':True, 'seed':0})
+            agent = CFRAgent(env, model_path='experiments/cfr_model', pruning=pruning)
+            for _ in range(50):
+                agent.train()
+            agents.append(agent)
+
+        # Skipping the unreached subtrees changes nothing
+        walking, skipping = agents
+        self.assertEqual(walking.pruning.counters['skipped'], 0)
+        self.assertGreater(skipping.pruning.counters['skipped'], 0)
+        self.assertEqual(walking.infosets.keys, skipping.infosets.keys)
+        for name in ('regrets', 'average_policy'):
+            self.assertTrue(np.array_equal(walking.infosets.arrays[name][:len(walking.infosets)],
+                                           skipping.infosets.arrays[name][:len(skipping.infosets)]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from rlcard_fork.agents.solver_service import (SolverClient, SolverService, heads_up_spot, load_solved_spot,
+                                               start_server)
+from rlcard_fork.agents.spot_cache import SpotCache
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import Range
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.round import Action
+
+BOARD = [card_to_int(card) for card in ('C2', 'D3', 'H7', 'S9', 'CK')]
+RANGES = ['AA,KK,77,AK,KQ,T8', 'QQ,JJ,99,AK,AQ,KJ']
+
+
+def river_state(hero_hand=None, board=BOARD):
+    # Three players saw the river, the third one has folded
+    hands = [[-1, -1]] * 3
+    if hero_hand is not None:
+        hands = [[card_to_int(card) for card in hero_hand]] + hands[1:]
+    return FlatNolimitholdemState.from_spot([80, 80, 90], [20, 20, 10], board=board, folded=[2], hands=hands)
+
+
+def swap_suits(strings):
+    return [string.translate(str.maketrans('SHDC', 'DCSH')) for string in strings]
+
+
+async def shutdown(server):
+    server.close()
+    await server.wait_closed()
+    # The connections end once their client has closed
+    await asyncio.gather(*(task for task in asyncio.all_tasks() if task is not asyncio.current_task()))
+
+
+class TestSolverService(unittest.TestCase):
+
+    def test_heads_up_spot(self):
+        state = river_state()
+        spot, seats = heads_up_spot(state)
+        self.assertEqual(seats.tolist(), [0, 1])
+        self.assertEqual(spot.in_chips.tolist(), [25, 25])
+        self.assertEqual(spot.get_pot(), state.get_pot())
+        self.assertEqual(spot.get_public_cards(), BOARD)
+        with self.assertRaises(ValueError):
+            heads_up_spot(FlatNolimitholdemState.from_spot([80, 80, 90], [20, 20, 20], board=BOARD))
+        with self.assertRaises(ValueError):
+            heads_up_spot(FlatNolimitholdemState([100, 100]))
+
+    def test_query(self):
+        service = SolverService(num_iterations=30)
+        state = river_state(['SK', 'HK'])
+        answer = service.query(state, RANGES)
+        self.assertFalse(answer['cached'])
+        self.assertEqual(answer['seat'], 0)
+        self.assertEqual(answer['actions'][0], 'X')
+        self.assertAlmostEqual(sum(answer['frequencies']), 1.0)
+        # The strategy sums are float32
+        self.assertAlmostEqual(answer['ev'], np.dot(answer['frequencies'], answer['action_evs']), places=4)
+        # Top set is the nuts, it wins at least the whole pot
+        self.assertGreaterEqual(min(answer['action_evs']), 50 - 1e-9)
+
+        again = service.query(state, RANGES)
+        self.assertTrue(again['cached'])
+        self.assertEqual(again['frequencies'], answer['frequencies'])
+        self.assertEqual(service.stats()['solves'], 1)
+
+        # A state along the tree is answered from the same solve, for the range of the player to act
+        state.step(Action.CHECK)
+        answer = service.query(state)
+        self.assertTrue(answer['cached'])
+        self.assertEqual(answer['seat'], 1)
+        self.assertEqual(answer['line'], 'X')
+        self.assertIsNone(answer['hand'])
+        self.assertAlmostEqual(sum(answer['frequencies']), 1.0)
+
+        # Other ranges at the root are solved again
+        service.query(river_state(), ['AA', 'KK'])
+        self.assertEqual(service.stats()['spots'], 2)
+
+    def test_stacks(self):
+        service = SolverService(num_iterations=10)
+        answer = service.query(FlatNolimitholdemState.from_spot([30, 30], [20, 20], board=BOARD))
+        self.assertEqual(answer['actions'], ['X', 'B20', 'B30'])
+        # The same bets at another depth are not answered from the shallow tree
+        deep = FlatNolimitholdemState.from_spot([2000, 2000], [20, 20], board=BOARD)
+        deep.step(Action.CHECK)
+        answer = service.query(deep)
+        self.assertFalse(answer['cached'])
+        self.assertGreater(len(answer['actions']), 3)
+        shallow = FlatNolimitholdemState.from_spot([30, 30], [20, 20], board=BOARD)
+        shallow.step(Action.CHECK)
+        self.assertTrue(service.query(shallow)['cached'])
+        self.assertEqual(service.stats()['solves'], 2)
+
+    def test_max_bytes(self):
+        # Every turn and river of a deep flop with wide ranges, about 15 GB of regrets
+        state = FlatNolimitholdemState.from_spot([9500, 9500], [100, 100], board=BOARD[:3])
+        ranges = ['22+,A2s+,KTo+'] * 2
+        service = SolverService(num_iterations=10)
+        with self.assertRaises(ValueError):
+            service.query(state, ranges)
+        self.assertEqual(service.stats()['solves'], 0)
+        self.assertEqual(service.stats()['spots'], 0)
+        service = SolverService(num_iterations=1, depth_limited=True)
+        self.assertAlmostEqual(sum(service.query(state, ranges)['frequencies']), 1.0)
+
+    def test_cache(self):
+        directory = tempfile.mkdtemp()
+        service = SolverService(num_iterations=20, cache=SpotCache(directory=directory, load=load_solved_spot))
+        answer = service.query(river_state(['SK', 'HK']), RANGES)
+
+        # The same spot with other suits is not solved again
+        board = [card_to_int(card) for card in swap_suits(['C2', 'D3', 'H7', 'S9', 'CK'])]
+        isomorphic = service.query(river_state(swap_suits(['SK', 'HK']), board), RANGES)
+        self.assertTrue(isomorphic['cached'])
+        self.assertEqual(isomorphic['signature'], answer['signature'])
+        self.assertEqual(isomorphic['frequencies'], answer['frequencies'])
+        self.assertEqual(isomorphic['action_evs'], answer['action_evs'])
+        stats = service.stats()
+        self.assertEqual((stats['solves'], stats['hits'], stats['misses']), (1, 1, 1))
+
+        # Another service finds it on disk
+        service = SolverService(num_iterations=20, cache=SpotCache(directory=directory, load=load_solved_spot))
+        again = service.query(river_state(['SK', 'HK']), RANGES)
+        self.assertTrue(again['cached'])
+        np.testing.assert_allclose(again['frequencies'], answer['frequencies'])
+        self.assertEqual(service.stats()['disk_hits'], 1)
+
+    def test_depth_limited(self):
+        service = SolverService(num_iterations=30, depth_limited=True)
+        hands = [[card_to_int('SK'), card_to_int('HK')], [-1, -1]]
+        turn = FlatNolimitholdemState.from_spot([80, 80], [20, 20], board=BOARD[:4], hands=hands)
+        # Out of time at once, the strategy is the uniform one and the next query trains it
+        answer = service.query(turn, RANGES, time_budget=0)
+        self.assertTrue(answer['signature'].endswith(' dl'))
+        self.assertEqual(answer['iterations'], 0)
+        self.assertIsNone(answer['exploitability'])
+        self.assertTrue(np.allclose(answer['frequencies'], 1 / len(answer['actions'])))
+        answer = service.query(turn, RANGES)
+        self.assertTrue(answer['cached'])
+        self.assertEqual(answer['iterations'], 30)
+        self.assertIsNotNone(answer['exploitability'])
+        self.assertEqual(service.stats()['cut_short'], 1)
+
+        # The river after check check starts from the ranges reaching the leaf of the turn
+        river = FlatNolimitholdemState.from_spot([80, 80], [20, 20], board=BOARD)
+        ranges = service.propagate_ranges(heads_up_spot(river)[0])
+        for player_range, hand_classes in zip(ranges, RANGES):
+            weights = Range.from_string(hand_classes).remove_cards(BOARD).weights
+            self.assertTrue((player_range.weights <= weights + 1e-9).all())
+            self.assertTrue(player_range.weights.any())
+        answer = service.query(river)
+        self.assertTrue(answer['propagated'])
+        self.assertFalse(answer['cached'])
+        self.assertEqual(answer['line'], '')
+        self.assertEqual(service.stats()['solves'], 2)
+
+    def test_server(self):
+        service = SolverService(num_iterations=10)
+        path = os.path.join(tempfile.mkdtemp(), 'solver.sock')
+        loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(start_server(service, path))
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            with SolverClient(path, timeout=60) as client:
+                answer = client.query(river_state(['SA', 'HA']), RANGES)
+                self.assertEqual(answer['hand'], [card_to_int('SA'), card_to_int('HA')])
+                self.assertTrue(client.query(river_state(['SA', 'HA']), RANGES)['cached'])
+                with self.assertRaises(RuntimeError):
+                    client.query(FlatNolimitholdemState([100, 100]))
+                self.assertEqual(client.stats()['queries'], 2)
+        finally:
+            asyncio.run_coroutine_threadsafe(shutdown(server), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
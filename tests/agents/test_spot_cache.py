@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from rlcard_fork.agents.spot_cache import (SpotCache, canonical_spot, permute_range, permute_suits, seat_positions,
+                                           spot_signature)
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import Range
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+
+
+def cards(*strings):
+    return [card_to_int(string) for string in strings]
+
+
+class _Value:
+    ''' A cached value of a given size, saved as a text file
+    '''
+
+    def __init__(self, name, size=1):
+        self.name = name
+        self.size = size
+
+    def nbytes(self):
+        return self.size
+
+    def save(self, directory):
+        with open(os.path.join(directory, 'value.txt'), 'w') as f:
+            f.write(self.name)
+
+
+def load_value(directory):
+    with open(os.path.join(directory, 'value.txt')) as f:
+        return _Value(f.read())
+
+
+class TestSpotCache(unittest.TestCase):
+
+    def test_canonical_board(self):
+        def canonical_board(*strings):
+            spot, permutation = canonical_spot(FlatNolimitholdemState.from_spot([100, 100], [10, 10],
+                                                                                board=cards(*strings)))
+            return spot.get_public_cards(), permutation
+
+        board, permutation = canonical_board('H7', 'C2', 'D3')
+        self.assertEqual(canonical_board('S2', 'H3', 'D7')[0], board)
+        self.assertEqual(sorted(permute_suits(cards('H7', 'C2', 'D3'), permutation).tolist()), board)
+        self.assertEqual(permute_suits([[-1, cards('H7')[0]]], permutation).tolist(), [[-1, board[2]]])
+        # A two tone flop is not a rainbow one, nor a turn of a flop suit one of a new suit
+        self.assertNotEqual(canonical_board('H7', 'H2', 'D3')[0], board)
+        self.assertNotEqual(canonical_board('H7', 'C2', 'D3', 'H9')[0], canonical_board('H7', 'C2', 'D3', 'S9')[0])
+        self.assertEqual(canonical_board('H7', 'C2', 'D3', 'H9')[0], canonical_board('S7', 'D2', 'C3', 'S9')[0])
+
+    def test_permute_range(self):
+        weights = np.random.RandomState(0).rand(1326)
+        permutation = (1, 2, 3, 0)
+        permuted = Range(permute_range(weights, permutation))
+        self.assertEqual(permuted.get_weight(cards('HA', 'DK')), Range(weights).get_weight(cards('SA', 'HK')))
+        inverse = tuple(np.argsort(permutation))
+        self.assertTrue(np.array_equal(permute_range(permuted.weights, inverse), weights))
+        # The hand classes do not depend on the suits
+        suited = Range.from_string('AKs,QQ').weights
+        self.assertTrue(np.array_equal(permute_range(suited, permutation), suited))
+
+    def test_signature(self):
+        ranges = [Range.from_string('AA,KQ'), Range.from_string('QQ')]
+        positions = seat_positions([5, 1], 6)
+
+        def signature(stacks, board, stack_bucket=None):
+            spot = FlatNolimitholdemState.from_spot(stacks, [7, 7], board=cards(*board))
+            canonical, permutation = canonical_spot(spot, stack_bucket=stack_bucket)
+            permuted = [Range(permute_range(player_range.weights, permutation)) for player_range in ranges]
+            return spot_signature(canonical, positions, permuted)
+
+        base = signature([193, 193], ['H7', 'C2', 'D3'])
+        self.assertTrue(base.startswith('BTN-BB 100bb pot 14'))
+        # The extra chips of the deeper stack are not in play
+        self.assertEqual(signature([193, 300], ['S2', 'D7', 'H3']), base)
+        self.assertNotEqual(signature([183, 193], ['H7', 'C2', 'D3']), base)
+        self.assertEqual(signature([189, 193], ['H7', 'C2', 'D3'], stack_bucket=10),
+                         signature([193, 199], ['H7', 'C2', 'D3'], stack_bucket=10))
+
+    def test_lru(self):
+        cache = SpotCache(capacity=2, max_bytes=10)
+        cache.put('a', _Value('a'))
+        cache.put('b', _Value('b'))
+        self.assertEqual(cache.get('a').name, 'a')
+        cache.put('c', _Value('c'))
+        # b was the least recently used
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual([signature for signature, _ in cache.items()], ['a', 'c'])
+        cache.put('d', _Value('d', size=10))
+        self.assertEqual([signature for signature, _ in cache.items()], ['d'])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 1, 3))
+        self.assertAlmostEqual(stats['hit_rate'], 0.5)
+
+    def test_disk(self):
+        directory = tempfile.mkdtemp()
+        cache = SpotCache(capacity=1, directory=directory, disk_capacity=2, load=load_value)
+        for name in 'abc':
+            cache.put(name, _Value(name))
+        self.assertEqual(cache.stats()['disk_evictions'], 1)
+        self.assertEqual(cache.get('b').name, 'b')
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+        self.assertIsNone(cache.get('a'))
+
+        # Another process finds the spots
+        cache = SpotCache(directory=directory, load=load_value)
+        self.assertEqual(cache.stats()['disk_spots'], 2)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.get('c').name, 'c')
+        self.assertEqual(cache.get('c').name, 'c')
+        self.assertEqual((cache.counters['disk_hits'], cache.counters['hits']), (1, 1))
+        with self.assertRaises(ValueError):
+            SpotCache(directory=directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
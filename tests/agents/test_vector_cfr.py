@@ -0,0 +1,237 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from rlcard_fork.agents.vector_cfr_solver import HOLDING, VectorCFRSolver, compatible_reach, load_vector_cfr_solver
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.range import Range, get_conflicts, range_vs_range_equity
+from rlcard_fork.games.nolimitholdem.bet_sizing import SizingTree
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game_tree import LEAF_NODE, SHOWDOWN_NODE, build_game_tree
+
+
+def cards(*strings):
+    return [card_to_int(string) for string in strings]
+
+
+class TestVectorCFRSolver(unittest.TestCase):
+
+    def test_compatible_reach(self):
+        reach = np.random.RandomState(0).rand(2, 1326)
+        expected = reach @ ~get_conflicts()
+        self.assertTrue(np.allclose(compatible_reach(reach), expected))
+
+    def test_polarized_river(self):
+        # Sets against a bluff catcher, the classic bet pot with half as many bluffs as value hands
+        board = cards('C2', 'D3', 'H7', 'S9', 'CK')
+        state = FlatNolimitholdemState.from_spot([100, 100], [10, 10], board=board)
+        tree = build_game_tree(state, SizingTree({'river': [[1.0]]}, allin=False))
+        bettor = Range.from_string('77,QJ')
+        bluffs = Range.from_string('QJ').weights > 0
+        bettor.weights[bluffs] = 3 / 16
+        catcher = Range.from_string('AK')
+        solver = VectorCFRSolver(tree, board, [bettor, catcher])
+        for _ in range(2000):
+            solver.train()
+        self.assertEqual(solver.iteration, 2000)
+
+        bet = [tree.action_label(child) for child in tree.children(0)].index('B20')
+        strategy = solver.get_average_strategy(0)
+        sets = solver.live_combos[0][~bluffs[solver.live_combos[0]]]
+        self.assertTrue((strategy[bet, sets] > 0.99).all())
+        self.assertAlmostEqual(strategy[bet, bluffs].mean(), 0.5, delta=0.03)
+        facing_bet = tree.children(0)[bet]
+        call = [tree.action_label(child) for child in tree.children(facing_bet)].index('C')
+        calls = solver.get_average_strategy(facing_bet)[call, solver.live_combos[1]]
+        self.assertAlmostEqual(calls.mean(), 0.5, delta=0.03)
+
+        values = solver.get_expected_values()
+        self.assertAlmostEqual((values[0] * solver.ranges[0][0]).sum() + (values[1] * solver.ranges[1][0]).sum(), 0)
+
+    def test_turn_spot(self):
+        board = cards('C2', 'D3', 'H7', 'S9')
+        state = FlatNolimitholdemState.from_spot([30, 30], [10, 10], board=board)
+        tree = build_game_tree(state, SizingTree({'turn': [[1.0]], 'river': [[1.0]]}))
+        ranges = [Range.from_string('AA,KK,77,AK,QJ'), Range.from_string('99,88,AQ,KQ,T8')]
+        solver = VectorCFRSolver(tree, board, ranges)
+        estimate = solver.estimate_nbytes()
+        for _ in range(3):
+            solver.train()
+        self.assertEqual(solver.nbytes(), estimate)
+        river_node = next(node for node in range(tree.num_nodes) if tree.street[node] == 3 and tree.player[node] >= 0)
+        self.assertEqual(solver.get_boards(river_node).shape, (48, 5))
+        strategy = solver.get_average_strategy(river_node, board + cards('HK'))
+        self.assertTrue(np.allclose(strategy.sum(axis=0), 1))
+        with self.assertRaises(ValueError):
+            solver.get_average_strategy(river_node, board + cards('C2'))
+
+        # The runouts of an all-in on the turn are enumerated, as range_vs_range_equity does
+        tree = build_game_tree(FlatNolimitholdemState.from_spot([0, 0], [40, 40], board=board))
+        self.assertEqual(tree.node_type[0], SHOWDOWN_NODE)
+        solver = VectorCFRSolver(tree, board, ranges)
+        values = solver.get_expected_values()[0]
+        equities = range_vs_range_equity(ranges[0], ranges[1], board)
+        expected = 40 * (2 * equities - 1) * compatible_reach(solver.ranges[1][0])
+        live = solver.live_combos[0]
+        self.assertTrue(np.allclose(values[live], expected[live]))
+
+    def test_exploitability(self):
+        board = cards('C2', 'D3', 'H7', 'S9', 'CK')
+        state = FlatNolimitholdemState.from_spot([100, 100], [10, 10], board=board)
+        tree = build_game_tree(state, SizingTree({'river': [[0.5, 1.0]]}))
+        ranges = [Range.from_string('77,AK,KQ,QJ,JT'), Range.from_string('99,AK,AQ,KJ')]
+        solver = VectorCFRSolver(tree, board, ranges, rule='dcfr')
+        exploitabilities = []
+        for iteration in range(1, 201):
+            solver.train()
+            if iteration in (10, 200):
+                exploitabilities.append(solver.exploitability())
+        self.assertGreater(exploitabilities[0], 10 * exploitabilities[1])
+        self.assertLess(exploitabilities[1], 50)
+
+        # A best response wins at least what the average strategy does
+        values = solver.get_expected_values()
+        best_response_values = solver.get_best_response_values()
+        for player in range(2):
+            weights = solver.ranges[player][0]
+            self.assertGreaterEqual((weights * best_response_values[player]).sum(), (weights * values[player]).sum())
+
+        # Nobody acts after an all-in
+        tree = build_game_tree(FlatNolimitholdemState.from_spot([0, 0], [40, 40], board=board[:4]))
+        solver = VectorCFRSolver(tree, board[:4], ranges)
+        self.assertAlmostEqual(solver.exploitability(), 0)
+
+    def test_action_values(self):
+        board = cards('C2', 'D3', 'H7', 'S9')
+        state = FlatNolimitholdemState.from_spot([40, 40], [10, 10], board=board)
+        tree = build_game_tree(state, SizingTree({'turn': [[1.0]], 'river': [[1.0]]}))
+        ranges = [Range.from_string('AA,77,KQ'), Range.from_string('99,AK,QJ')]
+        solver = VectorCFRSolver(tree, board, ranges, rule='dcfr')
+        for _ in range(20):
+            solver.train()
+
+        # The strategy over the action values gives back the values at the root
+        action_values = solver.get_action_values(0)
+        opponent_reach = compatible_reach(solver.ranges[1][0])
+        live = solver.ranges[0][0] > 0
+        values = (solver.get_average_strategy(0) * action_values).sum(axis=0) * opponent_reach
+        np.testing.assert_allclose(values[live], solver.get_expected_values()[0][live], atol=1e-6)
+        self.assertTrue(np.isnan(action_values[:, HOLDING[board[0]]]).all())
+
+        # Below a check, a check and a river card, the first player reaches with its checking frequency
+        river = tree.children(tree.children(tree.children(0)[0])[0])[0]
+        river_board = board + cards('SK')
+        expected = solver.ranges[0][0] * solver.get_average_strategy(0)[0] * ~HOLDING[river_board[-1]]
+        np.testing.assert_allclose(solver.get_reaches(river, river_board)[0], expected)
+        self.assertEqual(solver.get_action_values(river, river_board).shape, (tree.num_children[river], 1326))
+
+    def test_depth_limited(self):
+        board = cards('C2', 'D3', 'H7', 'S9')
+        state = FlatNolimitholdemState.from_spot([30, 30], [10, 10], board=board)
+        # Without river bets, checking down the leaves is exact
+        sizing = SizingTree({'turn': [[1.0]]}, allin=False)
+        ranges = [Range.from_string('AA,77,KQ,T8'), Range.from_string('99,AK,QJ')]
+        solvers = [VectorCFRSolver(build_game_tree(state, sizing, depth_limited=depth_limited), board, ranges)
+                   for depth_limited in (False, True)]
+        for solver in solvers:
+            for _ in range(10):
+                solver.train()
+        self.assertEqual(solvers[1].tree.stats()['leaf_nodes'], 3)
+        np.testing.assert_allclose(solvers[0].get_average_strategy(0), solvers[1].get_average_strategy(0))
+        for full, depth_limited in zip(solvers[0].get_expected_values(), solvers[1].get_expected_values()):
+            np.testing.assert_allclose(full, depth_limited, atol=1e-9)
+
+        # A value model where the second player wins every leaf, the first one can only check and fold
+        calls = []
+
+        def leaf_values(tree, node, boards, player, reaches):
+            calls.append((tree.node_type[node], boards.shape))
+            payoff = tree.in_chips[node][0] * (1 if player == 1 else -1)
+            return payoff * compatible_reach(reaches[1 - player])
+
+        tree = build_game_tree(state, sizing, depth_limited=True)
+        solver = VectorCFRSolver(tree, board, ranges, leaf_values=leaf_values)
+        solver.train()
+        self.assertEqual(set(calls), {(LEAF_NODE, (1, 4))})
+        expected = -10 * compatible_reach(solver.ranges[1][0])
+        live = solver.live_combos[0]
+        np.testing.assert_allclose(solver.get_best_response_values()[0][live], expected[live])
+
+    def test_flop_runouts(self):
+        # The all-ins and checked down leaves of the flop are valued from the turns and rivers averaged once
+        board = cards('C2', 'D3', 'H7')
+        ranges = [Range.from_string('AA,KK,77,AK,QJ'), Range.from_string('99,88,AQ,KQ,T8')]
+        solver = VectorCFRSolver(build_game_tree(FlatNolimitholdemState.from_spot([0, 0], [40, 40], board=board)),
+                                 board, ranges)
+        values = solver.get_expected_values()
+        equities = range_vs_range_equity(ranges[0], ranges[1], board)
+        expected = 40 * (2 * equities - 1) * compatible_reach(solver.ranges[1][0])
+        live = solver.live_combos[0]
+        np.testing.assert_allclose(values[0][live], expected[live])
+        self.assertEqual(solver.nbytes(), solver.estimate_nbytes())
+
+        state = FlatNolimitholdemState.from_spot([9500, 9500], [100, 100], board=board)
+        tree = build_game_tree(state, depth_limited=True)
+        wide = Range.from_string('22+,A2s+,KTo+')
+        solver = VectorCFRSolver(tree, board, [wide, wide])
+        self.assertGreater(solver.solve(1000, time_budget=3.0), 100)
+
+    def test_time_budget(self):
+        board = cards('C2', 'D3', 'H7', 'S9')
+        tree = build_game_tree(FlatNolimitholdemState.from_spot([100, 100], [10, 10], board=board))
+        solver = VectorCFRSolver(tree, board, [Range(), Range()])
+        start = time.time()
+        completed = solver.solve(10000, time_budget=1.0)
+        self.assertLess(time.time() - start, 1.2)
+        self.assertLess(completed, 10000)
+        # An iteration cut short is not counted
+        self.assertEqual(completed, solver.iteration)
+
+        # Out of time before the first iteration, the strategy is uniform
+        solver = VectorCFRSolver(tree, board, [Range(), Range()])
+        self.assertEqual(solver.solve(10, time_budget=0), 0)
+        self.assertFalse(solver.train(deadline=time.time() - 1))
+        self.assertEqual(solver.iteration, 0)
+        strategy = solver.get_average_strategy(0)
+        np.testing.assert_allclose(strategy, 1 / len(tree.children(0)))
+        self.assertEqual(solver.solve(2), 2)
+        self.assertEqual(solver.iteration, 2)
+
+    def test_save_and_load(self):
+        board = cards('C2', 'D3', 'H7', 'S9')
+        tree = build_game_tree(FlatNolimitholdemState.from_spot([30, 30], [10, 10], board=board),
+                               SizingTree({'turn': [[1.0]], 'river': [[1.0]]}))
+        solver = VectorCFRSolver(tree, board, [Range.from_string('AA,KQ'), Range.from_string('99,AK')], board[:0])
+        for _ in range(5):
+            solver.train()
+        path = os.path.join(tempfile.mkdtemp(), 'solver.npz')
+        solver.save(path)
+        loaded = load_vector_cfr_solver(path, tree)
+        self.assertEqual(loaded.iteration, 5)
+        self.assertEqual(set(loaded.infosets), set(solver.infosets))
+        for node, (regrets, strategy_sums) in solver.infosets.items():
+            self.assertTrue(np.array_equal(loaded.infosets[node][0], regrets))
+            self.assertTrue(np.array_equal(loaded.infosets[node][1], strategy_sums))
+        loaded.train()
+        solver.train()
+        self.assertTrue(np.array_equal(loaded.get_average_strategy(0), solver.get_average_strategy(0)))
+        with self.assertRaises(FileNotFoundError):
+            load_vector_cfr_solver(path + '.missing', tree)
+
+    def test_errors(self):
+        board = cards('C2', 'D3', 'H7')
+        tree = build_game_tree(FlatNolimitholdemState.from_spot([30, 30], [10, 10], board=board))
+        with self.assertRaises(ValueError):
+            VectorCFRSolver(tree, board[:2], [Range(), Range()])
+        with self.assertRaises(ValueError):
+            VectorCFRSolver(tree, board, [Range(), Range()], dead_cards=board[:1])
+        three_players = build_game_tree(FlatNolimitholdemState.from_spot([30] * 3, [10] * 3, board=board))
+        with self.assertRaises(ValueError):
+            VectorCFRSolver(three_players, board, [Range()] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
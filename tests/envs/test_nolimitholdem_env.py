@@ -1,7 +1,10 @@
 import unittest
 
+import numpy as np
+
 import rlcard_fork
 from rlcard_fork.agents.random_agent import RandomAgent
+from rlcard_fork.games.limitholdem.isomorphism import canonical_index
 from rlcard_fork.games.nolimitholdem.round import Action
 from .determism_util import is_deterministic
 
@@ -13,6 +16,20 @@ class TestNolimitholdemEnv(unittest.TestCase):
         state, _ = env.reset()
         self.assertEqual(state['obs'].size, 54)
 
+    def test_canonical_suits(self):
+        state = {'legal_actions': [Action.FOLD], 'hand_codes': [0, 14], 'public_codes': [27, 40, 5],
+                 'my_chips': 2, 'all_chips': [1, 2]}
+        env = rlcard_fork.make('no-limit-holdem')
+        extracted_state = env._extract_state(state)
+        self.assertNotIn('canonical_index', extracted_state)
+        self.assertEqual(sorted(np.flatnonzero(extracted_state['obs'][:52])), [0, 5, 14, 27, 40])
+        env = rlcard_fork.make('no-limit-holdem', config={'canonical_suits': True})
+        extracted_state = env._extract_state(state)
+        index, permutation = canonical_index([0, 14], [27, 40, 5])
+        self.assertEqual(extracted_state['canonical_index'], index)
+        self.assertEqual(extracted_state['suit_permutation'], permutation)
+        self.assertEqual(extracted_state['obs'][:52].sum(), 5)
+
     def test_is_deterministic(self):
         self.assertTrue(is_deterministic('no-limit-holdem'))
 
@@ -8,12 +8,12 @@ from .determism_util import is_deterministic
 class TestRegistration(unittest.TestCase):
 
     def test_register(self):
-        register(env_id='test_reg', entry_point='rlcard.envs.blackjack:BlackjackEnv')
+        register(env_id='test_reg', entry_point='rlcard_fork.envs.blackjack:BlackjackEnv')
         with self.assertRaises(ValueError):
-            register(env_id='test_reg', entry_point='rlcard.envs.blackjack:BlackjackEnv')
+            register(env_id='test_reg', entry_point='rlcard_fork.envs.blackjack:BlackjackEnv')
 
     def test_make(self):
-        register(env_id='test_make', entry_point='rlcard.envs.blackjack:BlackjackEnv')
+        register(env_id='test_make', entry_point='rlcard_fork.envs.blackjack:BlackjackEnv')
         env = rlcard_fork.make('test_make')
         _, player = env.reset()
         self.assertEqual(player, 0)
@@ -21,7 +21,7 @@ class TestRegistration(unittest.TestCase):
             make('test_random_make')
 
     def test_make_modes(self):
-        register(env_id='test_env', entry_point='rlcard.envs.blackjack:BlackjackEnv')
+        register(env_id='test_env', entry_point='rlcard_fork.envs.blackjack:BlackjackEnv')
 
 if __name__ == '__main__':
     unittest.main()
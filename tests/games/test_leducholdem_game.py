@@ -66,26 +66,26 @@ class TestLeducholdemMethods(unittest.TestCase):
         players[1].in_chips = 10
 
         # Test hand is equal
-        players[0].hand = Card('S', 'J')
-        players[1].hand = Card('H', 'J')
-        public_card = Card('S', 'Q')
+        players[0].hand = Card('J', 'S')
+        players[1].hand = Card('J', 'H')
+        public_card = Card('Q', 'S')
         payoffs = Judger.judge_game(players, public_card)
         self.assertEqual(payoffs[0], 0)
         self.assertEqual(payoffs[1], 0)
 
         # Test one player get a pair
-        players[0].hand = Card('S', 'J')
-        players[1].hand = Card('S', 'Q')
-        public_card = Card('H', 'J')
+        players[0].hand = Card('J', 'S')
+        players[1].hand = Card('Q', 'S')
+        public_card = Card('J', 'H')
         payoffs = Judger.judge_game(players, public_card)
         self.assertEqual(payoffs[0], 10.0)
         self.assertEqual(payoffs[1], -10.0)
 
         # Other cases
         # Test one player get a pair
-        players[0].hand = Card('S', 'J')
-        players[1].hand = Card('S', 'Q')
-        public_card = Card('H', 'K')
+        players[0].hand = Card('J', 'S')
+        players[1].hand = Card('Q', 'S')
+        public_card = Card('K', 'H')
         payoffs = Judger.judge_game(players, public_card)
         self.assertEqual(payoffs[0], -10.0)
         self.assertEqual(payoffs[1], 10.0)
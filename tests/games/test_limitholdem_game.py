@@ -99,6 +99,28 @@ class TestLimitHoldemMethods(unittest.TestCase):
             action = np.random.choice(legal_actions)
             game.step(action)
 
+    def test_step_back_restores_state(self):
+        def snapshot(game):
+            return (game.game_pointer, game.round_counter, list(game.public_cards), list(game.dealer.deck),
+                    list(game.history_raise_nums), game.round.game_pointer, list(game.round.raised),
+                    game.round.have_raised, game.round.not_raise_num, game.round.raise_amount,
+                    [(p.in_chips, p.status) for p in game.players])
+
+        def traverse(game, depth):
+            if depth == 0 or game.is_over():
+                return
+            for action in game.get_legal_actions():
+                before = snapshot(game)
+                game.step(action)
+                traverse(game, depth - 1)
+                self.assertTrue(game.step_back())
+                self.assertEqual(snapshot(game), before)
+
+        game = Game(allow_step_back=True, num_players=3)
+        game.init_game()
+        traverse(game, 6)
+        self.assertEqual(len(game.history), 0)
+
     def test_payoffs(self):
         game = Game()
         np.random.seed(0)
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+
+from rlcard_fork.games.nolimitholdem.batch_game import BatchNolimitholdemGame, NUM_ACTIONS, OBS_SIZE
+from rlcard_fork.games.nolimitholdem.round import Action
+
+
+class TestBatchNolimitholdemGame(unittest.TestCase):
+
+    def test_init_game(self):
+        game = BatchNolimitholdemGame(8, num_players=3, seed=0)
+        obs, masks, pointers = game.init_game()
+        self.assertEqual(obs.shape, (8, OBS_SIZE))
+        self.assertEqual(masks.shape, (8, NUM_ACTIONS))
+        self.assertEqual(pointers.tolist(), [2] * 8)
+        self.assertTrue((obs[:, :52].sum(axis=1) == 2).all())
+        self.assertTrue((obs[:, 53] == 2).all())
+        self.assertEqual(masks[0].tolist(), [True, False, True, False, True])
+        for hands, board in zip(game.hands, game.board):
+            cards = hands.ravel().tolist() + board.tolist()
+            self.assertEqual(len(set(cards)), len(cards))
+
+    def test_same_as_flat_state(self):
+        np_random = np.random.RandomState(0)
+        game = BatchNolimitholdemGame(50, num_players=3, effective_stack=40, seed=0)
+        game.init_game()
+        states = [game.get_table(i) for i in range(game.num_tables)]
+        for _ in range(50):
+            masks = game.get_legal_masks()
+            actions = np.array([np_random.choice(np.flatnonzero(mask)) for mask in masks])
+            sizes = np_random.randint(1, 20, game.num_tables)
+            for state, action, size in zip(states, actions, sizes):
+                state.step(Action(action), int(size))
+            _, _, _, payoffs, done = game.step(actions, sizes)
+            for i, state in enumerate(states):
+                self.assertEqual(state.is_over(), done[i])
+                if done[i]:
+                    self.assertEqual(payoffs[i].sum(), 0)
+                    self.assertEqual(payoffs[i].tolist(), state.get_payoffs().tolist())
+                    states[i] = game.get_table(i)
+                else:
+                    self.assertEqual(state, game.get_table(i))
+                    self.assertFalse(payoffs[i].any())
+
+    def test_auto_reset(self):
+        game = BatchNolimitholdemGame(4, seed=0)
+        game.init_game()
+        _, _, _, payoffs, done = game.step([Action.FOLD.value, Action.CALL.value, Action.RAISE.value, Action.CALL.value],
+                                           [0, 0, 10, 0])
+        self.assertEqual(done.tolist(), [True, False, False, False])
+        self.assertEqual(payoffs[0].tolist(), [1, -1])
+        self.assertEqual(game.hand_counts.tolist(), [1, 0, 0, 0])
+        self.assertEqual(game.in_chips[0].tolist(), [1, 2])
+        self.assertEqual(game.street.tolist(), [0, 0, 0, 0])
+        self.assertEqual(game.in_chips[2].tolist(), [1, 12])
+        with self.assertRaises(ValueError):
+            game.step([Action.CHECK.value] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+
+from rlcard_fork.games.nolimitholdem.bet_sizing import AbstractAction, SizingTree, pseudo_harmonic_mapping
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState
+from rlcard_fork.games.nolimitholdem.game import NolimitholdemGame as Game
+from rlcard_fork.games.nolimitholdem.round import Action
+
+
+class TestSizingTree(unittest.TestCase):
+
+    def setUp(self):
+        self.state = FlatNolimitholdemState([100, 100], np_random=np.random.RandomState(0))
+
+    def test_get_actions(self):
+        tree = SizingTree()
+        self.assertEqual(tree.get_actions(self.state, 0), [
+            AbstractAction(Action.CALL, 0), AbstractAction(Action.RAISE, 2),
+            AbstractAction(Action.RAISE, 4), AbstractAction(Action.RAISE, 98)])
+        self.state.step(Action.CALL)
+        self.state.step(Action.CALL)
+        self.assertEqual(self.state.street, 1)
+        self.assertEqual([action.size for action in tree.get_actions(self.state, 0)], [0, 2, 3, 6, 98])
+        self.assertEqual(tree.get_actions(self.state, 2), [AbstractAction(Action.CHECK, 0)])
+        self.state.step(Action.BET, 6)
+        actions = tree.get_actions(self.state, 1)
+        self.assertEqual(actions[:2], [AbstractAction(Action.FOLD, None), AbstractAction(Action.CALL, 6)])
+        self.assertEqual([action.size for action in actions[2:]], [6 + 12, 98])
+
+    def test_config(self):
+        tree = SizingTree({'flop': [[0.5]]}, allin=False)
+        self.assertEqual(tree.max_raises(0), 0)
+        self.assertEqual(tree.max_actions(1), 3)
+        self.assertEqual([action.action for action in tree.get_actions(self.state, 0)], [Action.CALL])
+        with self.assertRaises(ValueError):
+            SizingTree({'showdown': [[1.0]]})
+        with self.assertRaises(ValueError):
+            SizingTree({'flop': [[0]]})
+
+    def test_bounded_tree(self):
+        tree = SizingTree()
+        np_random = np.random.RandomState(0)
+        for _ in range(200):
+            state = FlatNolimitholdemState([100, 100, 100], np_random=np_random)
+            depth, street = 0, 0
+            while not state.is_over():
+                actions = tree.get_actions(state, depth)
+                self.assertLessEqual(len(actions), tree.max_actions(state.street))
+                action = actions[np_random.randint(len(actions))]
+                if action.action in (Action.BET, Action.RAISE):
+                    depth += 1
+                    self.assertLessEqual(depth, tree.max_raises(state.street))
+                state.step(action.action, action.size)
+                if state.street != street:
+                    depth, street = 0, state.street
+
+    def test_translate(self):
+        tree = SizingTree()
+        self.state.step(Action.CALL)
+        self.state.step(Action.CALL)
+        self.assertEqual(tree.translate(self.state, 0, 3), [(AbstractAction(Action.BET, 3), 1.0)])
+        self.assertEqual(tree.translate(self.state, 0, 200), [(AbstractAction(Action.BET, 98), 1.0)])
+        (low, p_low), (high, p_high) = tree.translate(self.state, 0, 4)
+        self.assertEqual((low.size, high.size), (3, 6))
+        self.assertAlmostEqual(p_low, pseudo_harmonic_mapping(1.0, 0.75, 1.5))
+        self.assertAlmostEqual(p_low + p_high, 1.0)
+        self.assertAlmostEqual(pseudo_harmonic_mapping(0.5, 0.5, 1.0), 1.0)
+        self.assertAlmostEqual(pseudo_harmonic_mapping(1.0, 0.5, 1.0), 0.0)
+
+    def test_game(self):
+        game = Game(1, 2, 100, num_players=2)
+        game.init_game()
+        tree = SizingTree()
+        self.assertEqual(tree.get_actions(game, 0), tree.get_actions(FlatNolimitholdemState.from_game(game), 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
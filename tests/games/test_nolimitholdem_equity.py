@@ -0,0 +1,59 @@
+import unittest
+
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.nolimitholdem.equity import _normal_quantile, calculate_equity
+
+
+def cards(*strings):
+    return [card_to_int(string) for string in strings]
+
+
+class TestNolimitholdemEquity(unittest.TestCase):
+
+    def test_exact_known_hands(self):
+        # The aces win unless the board makes a king, a straight or a flush
+        result = calculate_equity(cards('SA', 'HA'), cards('D2', 'C7', 'HT'), [cards('SK', 'HK')], num_random_villains=0)
+        self.assertTrue(result['exact'])
+        self.assertEqual(result['samples'], 990)
+        self.assertAlmostEqual(result['equity'], 907 / 990)
+
+        # Chopped on a royal flush board
+        result = calculate_equity(cards('S2', 'H3'), cards('ST', 'SJ', 'SQ', 'SK', 'SA'), [cards('D2', 'C3')], num_random_villains=0)
+        self.assertEqual(result['equity'], 0.5)
+        self.assertEqual(result['tie'], 1.0)
+        self.assertEqual(result['win'], 0.0)
+
+    def test_exact_random_hand(self):
+        result = calculate_equity(cards('SA', 'HA'), cards('D2', 'C7', 'HT', 'S3', 'S4'))
+        self.assertTrue(result['exact'])
+        # Only the sets, the straights and the flushes beat the aces
+        self.assertGreater(result['equity'], 0.85)
+        self.assertLess(result['equity'], 0.9)
+        self.assertAlmostEqual(result['equity'], result['win'] + result['tie'] / 2)
+
+    def test_monte_carlo(self):
+        result = calculate_equity(cards('SA', 'HA'), villain_hands=[cards('SK', 'HK')], num_random_villains=0, seed=1)
+        self.assertFalse(result['exact'])
+        self.assertLessEqual(result['ci_half_width'], 0.005)
+        # Exact value is 0.8236
+        self.assertAlmostEqual(result['equity'], 0.8236, delta=0.015)
+        self.assertEqual(calculate_equity(cards('SA', 'HA'), villain_hands=[cards('SK', 'HK')], num_random_villains=0, seed=1), result)
+
+        result = calculate_equity(cards('SA', 'HA'), num_random_villains=5, seed=3)
+        self.assertFalse(result['exact'])
+        self.assertAlmostEqual(result['equity'], 0.49, delta=0.03)
+
+        # The z of a 95% interval
+        self.assertAlmostEqual(_normal_quantile(0.975), 1.959963984540054, places=12)
+
+    def test_invalid_cards(self):
+        with self.assertRaises(ValueError):
+            calculate_equity(cards('SA', 'SA'))
+        with self.assertRaises(ValueError):
+            calculate_equity(cards('SA', 'HA'), cards('SA', 'C7', 'HT'))
+        with self.assertRaises(ValueError):
+            calculate_equity(cards('SA', 'HA'), num_random_villains=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
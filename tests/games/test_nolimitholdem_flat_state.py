@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState, ALLIN, FOLDED, SHOWDOWN
+from rlcard_fork.games.nolimitholdem.game import NolimitholdemGame as Game
+from rlcard_fork.games.nolimitholdem.player import Position
+from rlcard_fork.games.nolimitholdem.round import Action
+
+
+def cards(*strings):
+    return [card_to_int(string) for string in strings]
+
+
+class TestFlatNolimitholdemState(unittest.TestCase):
+
+    def test_same_betting_as_game(self):
+        game = Game(1, 2, 100, Position.SB, num_players=3)
+        game.init_game()
+        state = FlatNolimitholdemState([100] * 3, 1, 2, np_random=np.random.RandomState(0))
+        for action, size in [(Action.RAISE, 6), (Action.CALL, None), (Action.FOLD, None)]:
+            self.assertEqual(state.get_legal_actions(), game.get_legal_actions())
+            game.step(action, size)
+            state.step(action, size)
+            self.assertEqual(state.in_chips.tolist(), [p.in_chips for p in game.players])
+            self.assertEqual(state.stacks.tolist(), [p.remained_chips for p in game.players])
+            self.assertEqual(state.status.tolist(), [p.status.value for p in game.players])
+        self.assertEqual(state.get_pot(), 14)
+
+    def test_play_to_showdown(self):
+        hands = [cards('SA', 'HA'), cards('SK', 'HK')]
+        board = cards('D2', 'C7', 'HT', 'S3', 'S4')
+        state = FlatNolimitholdemState([50, 50], hands=hands, board=board)
+        state.step(Action.CALL)
+        self.assertEqual(state.street, 0)
+        state.step(Action.CALL)
+        self.assertEqual(state.street, 1)
+        self.assertEqual(state.get_public_cards(), board[:3])
+        self.assertEqual(state.get_legal_actions(), [Action.FOLD, Action.CHECK, Action.BET])
+        state.step(Action.BET, 100)
+        self.assertEqual(state.status[state.game_pointer ^ 1], ALLIN)
+        self.assertFalse(state.is_over())
+        state.step(Action.CALL)
+        self.assertTrue(state.is_over())
+        self.assertEqual(state.street, SHOWDOWN)
+        self.assertEqual(state.get_payoffs().tolist(), [50, -50])
+
+    def test_fold(self):
+        state = FlatNolimitholdemState([50, 50, 50], np_random=np.random.RandomState(0))
+        state.step(Action.FOLD)
+        state.step(Action.FOLD)
+        self.assertTrue(state.is_over())
+        self.assertEqual(state.status.tolist(), [FOLDED, 0, FOLDED])
+        self.assertEqual(state.get_payoffs().tolist(), [-1, 1, 0])
+
+    def test_clone_and_hash(self):
+        state = FlatNolimitholdemState([100, 100], np_random=np.random.RandomState(0))
+        clone = state.clone()
+        self.assertEqual(state, clone)
+        self.assertEqual(hash(state), hash(clone))
+        clone.step(Action.RAISE, 4)
+        self.assertNotEqual(state, clone)
+        self.assertEqual(state.in_chips.tolist(), [1, 2])
+        batch = np.stack([state.to_array(), clone.to_array()])
+        self.assertEqual(batch.shape[0], 2)
+
+    def test_from_array(self):
+        state = FlatNolimitholdemState([100, 100, 100], np_random=np.random.RandomState(0))
+        state.step(Action.RAISE, 6)
+        copy = FlatNolimitholdemState.from_array(state.to_array().tolist())
+        self.assertEqual(copy, state)
+        self.assertEqual(copy.hands.tolist(), state.hands.tolist())
+        self.assertEqual(copy.step(Action.CALL), state.step(Action.CALL))
+        self.assertEqual(copy, state)
+        with self.assertRaises(ValueError):
+            FlatNolimitholdemState.from_array(state.to_array()[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -204,6 +204,27 @@ class TestNolimitholdemMethods(unittest.TestCase):
         game.step(Action.CHECK_CALL)
         self.assertTrue(game.is_over())
 
+    def test_step_back_restores_state(self):
+        game = Game(effective_stack=20, allow_step_back=True, num_players=3)
+        game.init_game()
+
+        def snapshot():
+            return (game.game_pointer, game.round_counter, game.round.game_pointer, list(game.round.raised),
+                    game.round.not_raise_num, game.round.not_playing_num,
+                    [(p.in_chips, p.remained_chips, p.status) for p in game.players])
+
+        before = snapshot()
+        game.step(Action.RAISE, 6)
+        after_raise = snapshot()
+        game.step(Action.CALL)
+        game.step(Action.FOLD)
+        self.assertTrue(game.step_back())
+        self.assertTrue(game.step_back())
+        self.assertEqual(snapshot(), after_raise)
+        self.assertTrue(game.step_back())
+        self.assertEqual(snapshot(), before)
+        self.assertFalse(game.step_back())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from rlcard_fork.games.nolimitholdem.bet_sizing import SizingTree
+from rlcard_fork.games.nolimitholdem.flat_state import FlatNolimitholdemState, ALLIN, FOLDED
+from rlcard_fork.games.nolimitholdem.game_tree import (CHANCE_NODE, FOLD_NODE, LEAF_NODE, PLAYER_NODE,
+                                                       SHOWDOWN_NODE, build_game_tree, load_game_tree)
+
+
+class TestGameTree(unittest.TestCase):
+
+    def setUp(self):
+        self.state = FlatNolimitholdemState.from_spot([90, 90], [10, 10], board=[0, 1, 2])
+
+    def test_from_spot(self):
+        self.assertEqual(self.state.street, 1)
+        self.assertEqual(self.state.game_pointer, 0)
+        self.assertEqual(self.state.get_pot(), 20)
+        state = FlatNolimitholdemState.from_spot([0, 50, 50], [100, 50, 50], board=[0, 1, 2, 3], folded=[1])
+        self.assertEqual(state.status.tolist(), [ALLIN, FOLDED, 0])
+        self.assertEqual(state.game_pointer, 2)
+        with self.assertRaises(ValueError):
+            FlatNolimitholdemState.from_spot([90, 90], [10, 10], board=[0, 1])
+
+    def test_build(self):
+        tree = build_game_tree(self.state, SizingTree({'flop': [[1.0]], 'turn': [[1.0]], 'river': [[1.0]]}))
+        stats = tree.stats()
+        self.assertEqual(stats['num_nodes'], tree.num_nodes)
+        self.assertEqual(stats['player_nodes'] + stats['chance_nodes'] + stats['fold_nodes'] + stats['showdown_nodes'],
+                         tree.num_nodes)
+        self.assertEqual(stats['max_children'], 3)
+        self.assertEqual([tree.action_label(child) for child in tree.children(0)], ['X', 'B20', 'B90'])
+        for node in range(tree.num_nodes):
+            children = tree.children(node)
+            if tree.node_type[node] in (FOLD_NODE, SHOWDOWN_NODE):
+                self.assertEqual(len(children), 0)
+            elif tree.node_type[node] == CHANCE_NODE:
+                self.assertEqual(len(children), 1)
+                self.assertEqual(tree.street[children[0]], tree.street[node])
+            for child in children:
+                self.assertEqual(tree.parent[child], node)
+                self.assertGreaterEqual(tree.pot[child], tree.pot[node])
+            self.assertEqual(tree.pot[node], tree.in_chips[node].sum())
+            self.assertEqual(tree.in_chips[node].sum() + tree.stacks[node].sum(), 200)
+        river_check = [node for node in range(tree.num_nodes) if tree.action_sequence(node) == 'XX/XX/XX']
+        self.assertEqual(len(river_check), 1)
+        self.assertEqual(tree.node_type[river_check[0]], SHOWDOWN_NODE)
+        self.assertEqual(tree.node_type[tree.children(1)[0]], CHANCE_NODE)
+        self.assertEqual(tree.player[tree.children(1)[0]], -1)
+        self.assertEqual(tree.node_type[0], PLAYER_NODE)
+
+    def test_depth_limited(self):
+        sizing = SizingTree({'flop': [[1.0]], 'turn': [[1.0]], 'river': [[1.0]]})
+        tree = build_game_tree(self.state, sizing, depth_limited=True)
+        stats = tree.stats()
+        self.assertEqual(stats['chance_nodes'], 0)
+        self.assertEqual(stats['nodes_per_street'][2:4], [stats['leaf_nodes'], 0])
+        self.assertLess(tree.num_nodes, build_game_tree(self.state, sizing).num_nodes)
+        check_check = tree.children(1)[0]
+        self.assertEqual(tree.node_type[check_check], LEAF_NODE)
+        self.assertEqual(len(tree.children(check_check)), 0)
+        self.assertEqual(tree.action_sequence(check_check), 'XX/')
+        # An all-in called on the flop is still a showdown
+        allin_call = tree.children(tree.children(0)[2])[1]
+        self.assertEqual(tree.action_sequence(allin_call), 'B90C')
+        self.assertEqual(tree.node_type[allin_call], SHOWDOWN_NODE)
+
+    def test_max_nodes(self):
+        with self.assertRaises(ValueError):
+            build_game_tree(self.state, max_nodes=100)
+
+    def test_save_and_load(self):
+        tree = build_game_tree(self.state)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tree.bin')
+            tree.save(path)
+            for mmap in (True, False):
+                loaded = load_game_tree(path, mmap=mmap)
+                self.assertEqual(loaded.num_nodes, tree.num_nodes)
+                self.assertEqual(isinstance(loaded.pot, np.memmap), mmap)
+                for name in ('pot', 'in_chips', 'status', 'first_child', 'num_children', 'action'):
+                    self.assertTrue(np.array_equal(getattr(loaded, name), getattr(tree, name)))
+                self.assertEqual(loaded.action_sequence(tree.num_nodes - 1), tree.action_sequence(tree.num_nodes - 1))
+                del loaded
+            with self.assertRaises(FileNotFoundError):
+                load_game_tree(os.path.join(directory, 'missing.bin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
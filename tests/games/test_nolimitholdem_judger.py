@@ -1,8 +1,9 @@
 import unittest
 import numpy as np
-from rlcard_fork.games.nolimitholdem.player import NolimitholdemPlayer as Player
+from rlcard_fork.games.nolimitholdem.player import NolimitholdemPlayer as Player, Position
 from rlcard_fork.games.base import Card
-from rlcard_fork.games.limitholdem.judger import LimitHoldemJudger as Judger
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.limitholdem.judger import LimitHoldemJudger as Judger, settle_pots
 from rlcard_fork.games.limitholdem.utils import Hand 
 
 
@@ -14,7 +15,7 @@ class TestNolimitholdemGame(unittest.TestCase):
         players = []
         
         for i in range(num_players):
-            players.append(Player(i, 100 + 100*i, rand_state))
+            players.append(Player(i, Position.positions(num_players)[i], 100 + 100*i, rand_state))
             players[i].bet(players[i].remained_chips) # All in
             
         return players
@@ -34,21 +35,21 @@ class TestNolimitholdemGame(unittest.TestCase):
         players = self.get_players(4)
         
         
-        public_card = [Card('S', 'A'), Card('S', 'K'), Card('S', 'Q'), Card('S', '2'), Card('S', '3')]
-        hands = [[Card('S', 'J'), Card('S', 'T')],
-                 [Card('S', '4'), Card('S', '5')], 
-                 [Card('S', '9'), Card('C', 'T')], 
-                 [Card('H', 'T'), Card('C', 'J')]]
+        public_card = [Card('A', 'S'), Card('K', 'S'), Card('Q', 'S'), Card('2', 'S'), Card('3', 'S')]
+        hands = [[Card('J', 'S'), Card('T', 'S')],
+                 [Card('4', 'S'), Card('5', 'S')], 
+                 [Card('9', 'S'), Card('T', 'C')], 
+                 [Card('T', 'H'), Card('J', 'C')]]
         
         payoffs = Judger(rand_state).judge_game(players, self.get_hands(hands, public_card))
         self.assertEqual(payoffs, [300, 100, -100, -300])
         
-        public_card = [Card('H', 'A'), Card('H', 'K'), Card('S', 'Q'), Card('S', 'T'), Card('S', '9')]
+        public_card = [Card('A', 'H'), Card('K', 'H'), Card('Q', 'S'), Card('T', 'S'), Card('9', 'S')]
         
-        hands = [[Card('S', 'A'), Card('H', '4')], 
-                 [Card('D', 'A'), Card('H', '5')], 
-                 [Card('D', 'K'), Card('H', '6')], 
-                 [Card('S', 'K'), Card('H', '7')]]
+        hands = [[Card('A', 'S'), Card('4', 'H')], 
+                 [Card('A', 'D'), Card('5', 'H')], 
+                 [Card('K', 'D'), Card('6', 'H')], 
+                 [Card('K', 'S'), Card('7', 'H')]]
         
         payoffs = Judger(rand_state).judge_game(players, self.get_hands(hands, public_card))
         self.assertEqual(payoffs, [100, 300, -200, -200])
@@ -56,19 +57,60 @@ class TestNolimitholdemGame(unittest.TestCase):
     def test_judge_with_6_players(self):
         rand_state = np.random.RandomState()
         
-        public_card = [Card('S', 'A'), Card('S', 'K'), Card('D', 'Q'), Card('D', 'T'), Card('C', '9')]
+        public_card = [Card('A', 'S'), Card('K', 'S'), Card('Q', 'D'), Card('T', 'D'), Card('9', 'C')]
         players = self.get_players(6)
         
-        hands = [[Card('C', 'A'), Card('H', '2')], 
-                 [Card('D', 'A'), Card('H', '3')], 
-                 [Card('C', 'K'), Card('C', '2')], 
-                 [Card('D', 'K'), Card('C', '3')],
-                 [Card('C', 'Q'), Card('S', '2')], 
-                 [Card('D', 'Q'), Card('S', '3')]]
+        hands = [[Card('A', 'C'), Card('2', 'H')], 
+                 [Card('A', 'D'), Card('3', 'H')], 
+                 [Card('K', 'C'), Card('2', 'C')], 
+                 [Card('K', 'D'), Card('3', 'C')],
+                 [Card('Q', 'C'), Card('2', 'S')], 
+                 [Card('Q', 'D'), Card('3', 'S')]]
 
         payoffs = Judger(rand_state).judge_game(players, self.get_hands(hands, public_card))
         self.assertEqual(payoffs, [200, 600, -100, 100, -400, -400])
 
+    def test_judge_with_folded_players(self):
+        players = self.get_players(3)
+        public_card = [Card('A', 'S'), Card('K', 'S'), Card('Q', 'D'), Card('T', 'D'), Card('9', 'C')]
+        hands = self.get_hands([[Card('A', 'C'), Card('2', 'H')],
+                                [Card('A', 'D'), Card('3', 'H')],
+                                [Card('J', 'C'), Card('2', 'C')]], public_card)
+        # The straight folded: the aces split the main pot, the second one wins
+        # the side pot and the chips nobody else matched go back to the folder
+        hands[2] = None
+        payoffs = Judger(rand_state).judge_game(players, hands)
+        self.assertEqual(payoffs, [50, 150, -200])
+
+    def test_settle_pots(self):
+        in_chips = np.array([[100, 200, 300, 400],
+                             [50, 50, 50, 50],
+                             [100, 100, 100, 0]])
+        strengths = np.array([[4, 3, 2, 1],
+                              [1, 1, -1, -1],
+                              [-1, -1, -1, -1]])
+        payoffs = settle_pots(in_chips, strengths, np.random.RandomState(0))
+        self.assertEqual(payoffs.tolist(), [[300, 100, -100, -300], [50, 50, -50, -50], [0, 0, 0, 0]])
+
+        # The odd chip goes to one of the winners
+        payoffs = settle_pots(np.array([[3, 3, 3]]), np.array([[1, 1, 0]]), np.random.RandomState(0))
+        self.assertIn(payoffs[0].tolist(), [[2, 1, -3], [1, 2, -3]])
+
+    def test_judge_games(self):
+        board = [card_to_int(card) for card in ('SA', 'SK', 'DQ', 'DT', 'C9')]
+        hands = [[card_to_int(card) for card in hand] + board
+                 for hand in (('CJ', 'H2'), ('CA', 'D3'), ('CK', 'C2'))]
+        # The short stack's straight wins the main pot, the aces the side pot and the kings get back
+        # the chips nobody matched. In the second game the straight folded and the aces win everything
+        players = self.get_players(3)
+        in_chips = np.array([[player.in_chips for player in players]] * 2)
+        folded = np.array([[False, False, False], [True, False, False]])
+        payoffs = Judger(rand_state).judge_games(in_chips, np.array([hands, hands]), folded)
+        self.assertEqual(payoffs.tolist(), [[200, 0, -200], [-100, 300, -200]])
+        for game in range(2):
+            single = Judger(rand_state).judge_game(players, [None if folded[game][i] else hands[i] for i in range(3)])
+            self.assertEqual(payoffs[game].tolist(), single)
+
 
 if __name__ == '__main__':
     unittest.main()
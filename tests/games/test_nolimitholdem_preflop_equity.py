@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from rlcard_fork.games.limitholdem.range import Range
+from rlcard_fork.games.nolimitholdem.preflop_equity import PreflopEquityTable, generate_preflop_table, load_preflop_table
+
+
+class TestPreflopEquity(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'preflop_equity.bin')
+        cls.table = generate_preflop_table(cls.path, num_boards=2000, seed=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_class_equity(self):
+        self.assertAlmostEqual(self.table.class_equity('AA', 'KK'), 0.82, delta=0.02)
+        self.assertAlmostEqual(self.table.class_equity('AA'), 0.85, delta=0.02)
+        self.assertAlmostEqual(self.table.class_equity('AKo', 'KAo'), 0.5)
+        class_table = np.array(self.table.class_table)
+        self.assertTrue(np.allclose(class_table + class_table.T, 1, atol=1e-6))
+
+    def test_equity(self):
+        self.assertAlmostEqual(self.table.equity(['SA', 'HA'], ['SK', 'HK']), 0.82, delta=0.02)
+        self.assertEqual(self.table.equity(['SA', 'HA']), self.table.equity(['CA', 'DA']))
+        self.assertAlmostEqual(self.table.range_equity(['SA', 'HA'], Range()), self.table.equity(['SA', 'HA']), places=4)
+        with self.assertRaises(ValueError):
+            self.table.equity(['SA', 'HA'], ['SA', 'SK'])
+
+    def test_load(self):
+        self.assertIs(load_preflop_table(self.path), load_preflop_table(self.path))
+        self.assertIsInstance(self.table.combo_table, np.memmap)
+        classes_path = os.path.join(self.directory.name, 'classes.bin')
+        table = generate_preflop_table(classes_path, num_boards=500, include_combos=False, seed=0)
+        self.assertIsNone(table.combo_table)
+        self.assertEqual(os.path.getsize(classes_path), 32 + 4 * (169 * 169 + 169 + 1326))
+        self.assertAlmostEqual(table.equity(['SA', 'HA'], ['SK', 'HK']), table.class_equity('AA', 'KK'), places=6)
+        with self.assertRaises(FileNotFoundError):
+            PreflopEquityTable(os.path.join(self.directory.name, 'missing.bin'))
+
+
+if __name__ == '__main__':
+    unittest.main()
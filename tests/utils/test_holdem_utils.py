@@ -4,6 +4,11 @@ import unittest
 from rlcard_fork.games.limitholdem.judger import LimitHoldemJudger
 from rlcard_fork.games.limitholdem.utils import compare_hands
 from rlcard_fork.games.limitholdem.utils import Hand as Hand
+from rlcard_fork.games.limitholdem.card import card_to_int, int_to_card, cards_to_mask, mask_to_cards
+from rlcard_fork.utils.utils import init_standard_deck
+from rlcard_fork.games.limitholdem.evaluator import evaluate_hand, evaluate_batch, get_category
+from rlcard_fork.games.limitholdem.isomorphism import canonicalize, canonical_index, index_to_cards, permute_cards
+from rlcard_fork.games.limitholdem.range import Range, COMBOS, combo_index, range_vs_range_equity
 import numpy as np
 ''' Combinations selected for testing compare_hands function
 Royal straight flush ['CJ', 'CT', 'CQ', 'CK', 'C9', 'C8', 'CA']
@@ -31,6 +36,115 @@ class TestHoldemUtils(unittest.TestCase):
         hand.product = 20
         self.assertEqual(hand._has_high_card(), False)
 
+    def test_card_codes(self):
+        deck = init_standard_deck()
+        for code, card in enumerate(deck):
+            self.assertEqual(card_to_int(card), code)
+            self.assertEqual(card_to_int(card.get_index()), code)
+            self.assertEqual(int_to_card(code), card)
+        mask = cards_to_mask([51, 0, 13])
+        self.assertEqual(mask, (1 << 51) | (1 << 13) | 1)
+        self.assertEqual(mask_to_cards(mask), [0, 13, 51])
+        # Card objects can be evaluated as well
+        self.assertEqual(evaluate_hand(deck[:5]), evaluate_hand([0, 1, 2, 3, 4]))
+
+    def test_evaluate_hand(self):
+        # Integer codes and strings describe the same cards
+        royal_flush = evaluate_hand([48, 49, 50, 51, 39, 47, 46])
+        self.assertEqual(royal_flush, evaluate_hand(['CT', 'CJ', 'CQ', 'CK', 'CA', 'C9', 'C8']))
+        self.assertEqual(get_category(royal_flush), 9)
+        # 5 and 6 card hands
+        self.assertEqual(get_category(evaluate_hand(['SA', 'HA', 'DA', 'CA', 'S2'])), 8)
+        self.assertEqual(get_category(evaluate_hand(['SA', 'S2', 'S3', 'S4', 'H5', 'D9'])), 5)
+        # The wheel is the lowest straight
+        self.assertLess(evaluate_hand(['SA', 'S2', 'S3', 'H4', 'H5']), evaluate_hand(['S2', 'S3', 'H4', 'H5', 'D6']))
+        # Kickers break ties and suits never do
+        self.assertGreater(evaluate_hand(['SA', 'HA', 'DK', 'C7', 'S5']), evaluate_hand(['DA', 'CA', 'DQ', 'CJ', 'ST']))
+        self.assertEqual(evaluate_hand(['SA', 'HK', 'DQ', 'CJ', 'S9', 'H2', 'D3']),
+                         evaluate_hand(['HA', 'DK', 'CQ', 'SJ', 'H9', 'D4', 'C2']))
+
+    def test_evaluate_hand_categories(self):
+        deck = [suit + rank for suit in 'SHDC' for rank in 'A23456789TJQK']
+        randstate = np.random.RandomState(seed=7)
+        for _ in range(2000):
+            cards = [deck[i] for i in randstate.choice(52, 7, replace=False)]
+            hand = Hand(cards)
+            hand.evaluateHand()
+            self.assertEqual(get_category(evaluate_hand(cards)), hand.category)
+
+    def test_evaluate_batch(self):
+        randstate = np.random.RandomState(seed=7)
+        cards = np.array([randstate.choice(52, 7, replace=False) for _ in range(2000)], dtype=np.int8)
+        for num_cards in (5, 6, 7):
+            strengths = evaluate_batch(cards[:, :num_cards])
+            self.assertEqual(strengths.shape, (2000,))
+            self.assertEqual(strengths.tolist(), [evaluate_hand(hand[:num_cards].tolist()) for hand in cards])
+
+    def test_range(self):
+        self.assertEqual(Range().num_combos(), 1326)
+        self.assertEqual(Range.from_string('AA').num_combos(), 6)
+        self.assertEqual(Range.from_string('AKs, AKo').num_combos(), 16)
+        self.assertEqual(Range.from_string('KA').weights.tolist(), Range.from_string('AK').weights.tolist())
+        self.assertEqual(Range.from_string('QQ+, K9s+').weights.tolist(),
+                         Range.from_string('AA,KK,QQ,KQs,KJs,KTs,K9s').weights.tolist())
+        self.assertEqual(Range.from_string('22+,AKo+').num_combos(), 78 + 12)
+        self.assertEqual(combo_index(['SA', 'HA']), combo_index([card_to_int('HA'), card_to_int('SA')]))
+        self.assertEqual(COMBOS[combo_index(['HK', 'SA'])].tolist(), [card_to_int('SA'), card_to_int('HK')])
+        hand_range = Range.from_string('AA').remove_cards([card_to_int('SA')])
+        self.assertEqual(hand_range.num_combos(), 3)
+        self.assertEqual(hand_range.get_weight(['HA', 'DA']), 1.0)
+        self.assertAlmostEqual(hand_range.normalize().weights.sum(), 1.0)
+        with self.assertRaises(ValueError):
+            Range.from_string('AXs')
+
+    def test_range_vs_range_equity(self):
+        board = [card_to_int(card) for card in ['D2', 'C7', 'HT', 'S3', 'S4']]
+        hero_range = Range.from_string('AA,TT,65s')
+        villain_range = Range.from_string('AA,KK')
+        equities = range_vs_range_equity(hero_range, villain_range, board)
+        # The set of tens and the straights beat both, the aces chop with the
+        # one other combo of aces and beat the kings
+        self.assertEqual(equities[combo_index(['ST', 'CT'])], 1.0)
+        self.assertEqual(equities[combo_index(['H6', 'H5'])], 1.0)
+        self.assertAlmostEqual(equities[combo_index(['SA', 'HA'])], (6 * 1 + 1 * 0.5) / 7)
+        # Blocked by the board or out of the range
+        self.assertEqual(equities[combo_index(['HT', 'ST'])], 0.0)
+        self.assertEqual(equities[combo_index(['SK', 'HK'])], 0.0)
+
+        # Against a uniform range, same as enumerating the hands of the opponent
+        equities = range_vs_range_equity(Range(), Range(), board[:4])
+        hero_hand = [card_to_int('SK'), card_to_int('DQ')]
+        river_equities = []
+        for river in range(52):
+            if river in board[:4] + hero_hand:
+                continue
+            full_board = board[:4] + [river]
+            hands = [hand for hand in itertools.combinations(range(52), 2) if not set(hand) & set(full_board + hero_hand)]
+            hero = evaluate_hand(full_board + hero_hand)
+            strengths = [evaluate_hand(full_board + list(hand)) for hand in hands]
+            river_equities.append(np.mean([1.0 if hero > strength else 0.5 if hero == strength else 0.0 for strength in strengths]))
+        self.assertAlmostEqual(equities[combo_index(hero_hand)], np.mean(river_equities))
+
+    def test_canonicalize(self):
+        self.assertEqual(len({canonical_index(hand)[0] for hand in itertools.combinations(range(52), 2)}), 169)
+        self.assertEqual(len({canonical_index([], flop)[0] for flop in itertools.combinations(range(52), 3)}), 1755)
+        hand, board, permutation = canonicalize([card_to_int('DA'), card_to_int('DK')], [card_to_int('HK'), card_to_int('D2'), card_to_int('C9')])
+        self.assertEqual(hand, [card_to_int('SA'), card_to_int('SK')])
+        self.assertEqual(board, [card_to_int('S2'), card_to_int('H9'), card_to_int('DK')])
+        self.assertEqual(permutation, (3, 2, 0, 1))
+
+        randstate = np.random.RandomState(seed=3)
+        for _ in range(200):
+            cards = randstate.choice(52, 7, replace=False).tolist()
+            hand, board = cards[:2], cards[2:2 + randstate.choice([0, 3, 4, 5])]
+            index, permutation = canonical_index(hand, board)
+            suits = tuple(randstate.permutation(4).tolist())
+            self.assertEqual(canonical_index(permute_cards(hand, suits), permute_cards(board, suits))[0], index)
+            original_hand, original_board = index_to_cards(index, 2, len(board), permutation)
+            self.assertEqual(sorted(original_hand), sorted(hand))
+            self.assertEqual(sorted(original_board[:3]), sorted(board[:3]))
+            self.assertEqual(original_board[3:], board[3:])
+
     def test_compare_hands(self):
 
         winner = compare_hands( [['CJ', 'SJ', 'H9', 'B3', 'C2', 'C8', 'C7'], ['CQ', 'SQ', 'H9', 'B3', 'C2', 'C8', 'C6']])
@@ -336,7 +450,8 @@ class TestHoldemUtils(unittest.TestCase):
                     # because there is at least one winner so a loser who bet must lose at least one chip
 
         randstate = np.random.RandomState(seed=7)
-        j = LimitHoldemJudger(randstate)
+        # The odd chips draw from their own random state, the cases do not depend on how many are drawn
+        j = LimitHoldemJudger(np.random.RandomState(seed=7))
 
         # test many random cases from 2 to 6 players with all winners combinations
         nb_cases = 0
@@ -351,7 +466,7 @@ class TestHoldemUtils(unittest.TestCase):
                     allocated = j.split_pots_among_players(in_chips, winners)
                     nb_cases += 1
                     check_result(in_chips, winners, allocated)
-        self.assertEqual(nb_cases, 34954)  # to check that correct number of cases have been tested
+        self.assertEqual(nb_cases, 34919)  # to check that correct number of cases have been tested
 
 
 if __name__ == '__main__':
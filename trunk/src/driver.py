@@ -2,11 +2,33 @@ import os
 import sys
 
 sys.path.append('/Users/arthurshi/SolverBuddy')
+from rlcard_fork.agents.range_tracker import RangeTracker
+from rlcard_fork.agents.solver_service import DEFAULT_SOCKET, SolverClient
+from rlcard_fork.games.limitholdem import PlayerStatus
 from rlcard_fork.games.nolimitholdem.player import Position
-from rlcard_fork.games.nolimitholdem.game import Card, NolimitholdemGame as Game
+from rlcard_fork.games.base import Card
+from rlcard_fork.games.limitholdem.card import card_to_int
+from rlcard_fork.games.nolimitholdem.bet_sizing import SizingTree
+from rlcard_fork.games.nolimitholdem.equity import game_equity
+from rlcard_fork.games.nolimitholdem.game import NolimitholdemGame as Game
 from rlcard_fork.games.nolimitholdem.round import Action
 
 
+def print_strategy(solver, game, tracker):
+    # The solver only knows heads up flop, turn and river spots
+    if tracker.street == 0 or sum(p.status != PlayerStatus.FOLDED for p in game.players) != 2:
+        return
+    ranges = [tracker.get_range(p.player_id) for p in game.players if p.status != PlayerStatus.FOLDED]
+    try:
+        answer = solver.query(game, ranges=ranges, raises=tracker.raises)
+    except RuntimeError as e:
+        print(f"solver: {e}")
+        return
+    print(f"strategy ({'cached' if answer['cached'] else 'solved'}, {answer['elapsed_ms']:.0f} ms): " + ", ".join(
+        f"{label} {frequency:.2f} (ev {ev:.1f})"
+        for label, frequency, ev in zip(answer['actions'], answer['frequencies'], answer['action_evs'])))
+
+
 def main():
     print(sys.path)
     game = None
@@ -36,17 +58,46 @@ def main():
     print(f"hero position: {hero_position}")
     print(f"hero index: {game.hero_index}")
     game.hero().hand = [
-        Card(cards[0].upper(), cards[1].upper()),
-        Card(cards[2].upper(), cards[3].upper())]
+        card_to_int(Card(cards[0].upper(), cards[1].upper())),
+        card_to_int(Card(cards[2].upper(), cards[3].upper()))]
     for card in game.hero().hand:
         game.deck.remove(card)
+    try:
+        print(f"hero preflop equity vs a random hand: {game.get_preflop_equity():.3f}")
+    except FileNotFoundError as e:
+        print(e)
     
     # start the hand, beginning with posting for the blinds
     game.init_game()
 
     player_to_act = Position.positions(num_players)[game.game_pointer]
 
+    # Strategies from a running solver service, see examples/run_solver_service.py
+    try:
+        solver = SolverClient(os.environ.get("SOLVER_SOCKET", DEFAULT_SOCKET))
+    except OSError:
+        solver = None
+        print("no solver service running, strategies are not shown")
+
+    def strategy(state, action, size, raises, ranges):
+        # Without a strategy for the state, the action narrows no range
+        if solver is None:
+            return None
+        try:
+            return solver.frequencies(state, action, size, raises, ranges)
+        except RuntimeError as e:
+            print(f"solver: {e}")
+            return None
+
+    # The villain ranges, from the positional preflop ranges narrowed by every action. The tracker
+    # also counts the bets and raises of the current betting round, to map the observed sizes onto the abstraction
+    tracker = RangeTracker(num_players, strategy=strategy)
+    tracker.remove_known_cards(game)
+    sizing = SizingTree()
+
     while not game.round.is_over():
+        if solver is not None:
+            print_strategy(solver, game, tracker)
         legal_actions = game.get_legal_actions()
         actions_string = \
             ",".join([f"{action.name.lower()}/{action.shorthand().lower()}" for action in legal_actions])
@@ -56,9 +107,15 @@ def main():
         if action == Action.BET or action == Action.RAISE:
             size = input("Bet size: (total number or 'allin')")
             size = game.players[game.game_pointer].remained_chips if size == "allin" else int(size)
-        state, next_player_idx = game.step(action, size)
+            translated = sizing.translate(game, tracker.raises, size)
+            print("abstract actions: " + ", ".join(
+                f"{abstract.action.name.lower()} {abstract.size} ({probability:.2f})" for abstract, probability in translated))
+        seat = game.game_pointer
+        state, next_player_idx = tracker.step(game, action, size)
+        print(f"{player_to_act} range: {tracker.get_range(seat).weights.sum():.1f} combos")
         # print(state)
         game.dump()
+        print(f"hero equity: {game_equity(game)['equity']:.3f}")
         player_to_act = Position.positions(num_players)[next_player_idx]
     
     game.dump()